@@ -0,0 +1,325 @@
+import argparse
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+
+from extract_transform import (
+    get_sentiment_data,
+    get_correlation_data,
+    get_coins_data,
+    get_technical_indicators,
+    warm_up_indicator_engine,
+    get_crypto_info,
+    apply_sentiment_analysis,
+    transforme_date_dimensions
+)
+from etl import data_warehouse_loaders, data_warehouse_pool, data_warehouse_range_delete
+from stages import Stage, run_stages
+from connections import ConnectionPool, connect_mysql, mysql_is_alive
+from indicators import IndicatorEngine
+from sentiment import SentimentScorer
+
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BACKFILL_PATH = os.path.join(current_dir, 'backfill_checkpoints.json')
+
+# Days of 1 minute bars read before a chunk to warm up its indicator engine
+INDICATOR_WARM_UP_DAYS = 1
+
+
+#=======================================chunk checkpoints========================================================
+
+class BackfillCheckpoints:
+    """
+    Persistent progress of a backfill: the stages done for each chunk of a run, keyed by the run
+    (range and chunk size), so the same command started again skips what was already loaded.
+    """
+
+    def __init__(self, run, path=None):
+        self.path = path or os.getenv('backfill_checkpoint_path', DEFAULT_BACKFILL_PATH)
+        self.run = run
+        self.runs = self._read()
+        self.lock = threading.Lock()
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r') as checkpoint_file:
+                return json.load(checkpoint_file)
+        except (OSError, ValueError) as e:
+            print(f"Error reading backfill checkpoints from {self.path}: {e}")
+            return {}
+
+    def done_stages(self, chunk):
+        return set(self.runs.get(self.run, {}).get(chunk, []))
+
+    def record(self, chunk, stages):
+        with self.lock:
+            done = self.runs.setdefault(self.run, {}).setdefault(chunk, [])
+            done.extend(stage for stage in stages if stage not in done)
+            # Write to a temporary file first so a crash never leaves a truncated checkpoint file
+            temporary_path = f"{self.path}.tmp"
+            with open(temporary_path, 'w') as checkpoint_file:
+                json.dump(self.runs, checkpoint_file, indent=2)
+            os.replace(temporary_path, self.path)
+
+
+#=======================================backfill stages========================================================
+# Same extracts, transforms and loaders as the ETL cycle, on the staging rows of one time chunk.
+# A stage raises when its extract, delete or load fails so it is not checkpointed; it returns the rows it loaded.
+# Each stage first deletes the rows of its time span from its table, so running it again after a
+# partial load (or over rows loaded by the ETL cycle) replaces them instead of duplicating them.
+
+def _replace(chunk, table, data, DWcursor, span, id_range=None):
+    # Nothing is deleted unless the extract succeeded: the extractors return None when MySQL failed,
+    # and no rows from a non-empty id range means they could not be read
+    if data is None:
+        raise RuntimeError(f"extracting the rows of {table} failed")
+    if id_range and id_range[1] > id_range[0] and not len(data):
+        raise RuntimeError(f"no rows of {table} extracted from the ids {id_range[0]} - {id_range[1]}")
+    # Hive rewrites whole 'dt' partitions to delete: the delete and load of a table must not
+    # interleave with those of a chunk of the same day, or the rows it just inserted are dropped
+    with chunk['write_locks'].get(table) or nullcontext():
+        if not chunk['range_delete'](DWcursor, table, *span):
+            raise RuntimeError(f"deleting {span[0]} - {span[1]} from {table} failed")
+        if len(data) and not chunk['loaders'][table](data, DWcursor):
+            raise RuntimeError(f"loading {table} failed")
+
+
+def backfill_sentiment_dim(DWcursor, mysqlCursor, chunk):
+    id_range = chunk['id_ranges']['sentiment']
+    sentiment_data = get_sentiment_data(mysqlCursor, id_range=id_range)
+    if sentiment_data is None:
+        raise RuntimeError("extracting the sentiment rows failed")
+    processed_sentiment = apply_sentiment_analysis(sentiment_data, chunk['sentiment_scorer']) if sentiment_data else []
+    if len(processed_sentiment) < len(sentiment_data):
+        raise RuntimeError(f"sentiment analysis scored {len(processed_sentiment)} of {len(sentiment_data)} rows")
+    _replace(chunk, 'sentiment_dim', processed_sentiment, DWcursor, (chunk['start'], chunk['end']), id_range)
+    return len(sentiment_data)
+
+
+def backfill_correlations_dim(DWcursor, mysqlCursor, chunk):
+    # Periods without economic bars (weekends, holidays) are legitimately empty
+    correlation_data = get_correlation_data(mysqlCursor, period=(chunk['start'], chunk['end']))
+    _replace(chunk, 'correlations_dim', correlation_data, DWcursor, (chunk['start'], chunk['end']))
+    return len(correlation_data)
+
+
+def backfill_crypto_dim(DWcursor, mysqlCursor, chunk):
+    id_range = chunk['id_ranges']['crypto_data']
+    coins_data = get_coins_data(mysqlCursor, id_range=id_range)
+    _replace(chunk, 'crypto_dim', coins_data, DWcursor, (chunk['start'], chunk['end']), id_range)
+    return len(coins_data)
+
+
+def backfill_technical_indicators(DWcursor, mysqlCursor, chunk):
+    # Each chunk warms up its own engine on the bars before it, the bar open at the end
+    # of a chunk is emitted by the next one
+    engine = IndicatorEngine(length=4, bar_minutes=4)
+    low_id, high_id = chunk['id_ranges']['crypto_data']
+    warm_up = (chunk['start'] - timedelta(days=INDICATOR_WARM_UP_DAYS), chunk['start'])
+    if not warm_up_indicator_engine(mysqlCursor, engine, up_to_id=low_id, period=warm_up):
+        raise RuntimeError("indicator warm-up failed")
+    indicators_data = get_technical_indicators(mysqlCursor, engine, id_range=(low_id, high_id))
+    if indicators_data is None:
+        raise RuntimeError("extracting the technical indicators failed")
+    # No bar closed (or not enough look-back yet) is not a failure: nothing to replace
+    if not indicators_data.empty:
+        # The first bar emitted (open at the end of the previous chunk) starts before the chunk
+        _replace(chunk, 'technical_indicators', indicators_data, DWcursor,
+                 (indicators_data['Timestamp'].min().to_pydatetime(), chunk['end']))
+    return len(indicators_data)
+
+
+def backfill_date_dim(DWcursor, mysqlCursor, chunk):
+    # The date of the last row of the chunk, as the ETL cycle loads the date of the last row
+    id_range = chunk['id_ranges']['crypto_data']
+    mysqlCursor.execute("SELECT MAX(created_at) FROM crypto_data WHERE id > %s AND id <= %s", tuple(id_range))
+    last_timestamp = mysqlCursor.fetchone()[0]
+    date_dimensions = transforme_date_dimensions(last_timestamp) if last_timestamp is not None else {}
+    _replace(chunk, 'date_dim', date_dimensions, DWcursor, (chunk['start'], chunk['end']), id_range)
+    return 1 if date_dimensions else 0
+
+
+def backfill_fact_table(DWcursor, mysqlCursor, chunk):
+    id_range = chunk['id_ranges']['crypto_data']
+    fact_data = get_crypto_info(mysqlCursor, id_range=id_range)
+    _replace(chunk, 'fact_table', fact_data, DWcursor, (chunk['start'], chunk['end']), id_range)
+    return len(fact_data)
+
+
+# The blockchain and metadata dimensions are snapshots without history and are left to the ETL cycle
+BACKFILL_STAGES = [
+    Stage("sentiment dim", backfill_sentiment_dim),
+    Stage("correlation dim", backfill_correlations_dim),
+    Stage("coins dim", backfill_crypto_dim),
+    Stage("indicators dim", backfill_technical_indicators),
+    Stage("date dim", backfill_date_dim),
+    Stage("fact table", backfill_fact_table, depends_on=["coins dim", "date dim"])
+]
+
+# Staging tables whose rows are read by id range
+ID_RANGE_TABLES = ["sentiment", "crypto_data"]
+
+
+#=======================================worker processes========================================================
+
+_worker = {}
+
+
+def _init_worker(DW, write_locks):
+    # One MySQL connection, one data warehouse connection and one sentiment scorer per process
+    _worker['write_locks'] = write_locks
+    _worker['mysql'] = ConnectionPool('mysql', connect_mysql, size=1, health_check=mysql_is_alive)
+    _worker['dw'] = data_warehouse_pool(DW, size=1)
+    _worker['loaders'] = data_warehouse_loaders(DW)
+    _worker['range_delete'] = data_warehouse_range_delete(DW)
+    _worker['sentiment_scorer'] = SentimentScorer()
+
+
+def _last_id_before(cursor, table, moment):
+    # Backward scan of the created_at index: the id of the last row created before 'moment'
+    cursor.execute(f"SELECT id FROM {table} WHERE created_at < %s ORDER BY created_at DESC, id DESC LIMIT 1", (moment,))
+    row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+def run_chunk(start, end, done_stages):
+    """
+    Extract, transform and load the staging rows created in [start, end), skipping the stages
+    already done for this chunk. Runs in a worker process.
+
+    Returns:
+        dict: Per stage name, {'status': ..., 'seconds': ..., 'rows': ...}.
+    """
+    with _worker['mysql'].cursor() as mysqlCursor:
+        id_ranges = {
+            table: (_last_id_before(mysqlCursor, table, start), _last_id_before(mysqlCursor, table, end))
+            for table in ID_RANGE_TABLES
+        }
+    chunk = {
+        'start': start,
+        'end': end,
+        'id_ranges': id_ranges,
+        'loaders': _worker['loaders'],
+        'range_delete': _worker['range_delete'],
+        'write_locks': _worker['write_locks'],
+        'sentiment_scorer': _worker['sentiment_scorer']
+    }
+    stages = [
+        Stage(stage.name, stage.function, [name for name in stage.depends_on if name not in done_stages])
+        for stage in BACKFILL_STAGES if stage.name not in done_stages
+    ]
+    rows = {}
+
+    def run_stage(stage):
+        with _worker['mysql'].cursor() as mysqlCursor, _worker['dw'].cursor() as DWcursor:
+            rows[stage.name] = stage.function(DWcursor, mysqlCursor, chunk)
+
+    # The chunks run in parallel processes, the stages of a chunk one after the other
+    report = run_stages(stages, run_stage, max_workers=1)
+    for name, result in report.items():
+        result['rows'] = rows.get(name, 0)
+    return report
+
+
+#=======================================backfill========================================================
+
+def split_chunks(start, end, chunk_hours):
+    chunks = []
+    chunk_start = start
+    while chunk_start < end:
+        chunk_end = min(chunk_start + timedelta(hours=chunk_hours), end)
+        chunks.append((chunk_start, chunk_end))
+        chunk_start = chunk_end
+    return chunks
+
+
+def _write_locks(DW):
+    # Per table lock shared by the worker processes, serializing the delete and load of the chunks
+    # on Hive (partition rewrites); extraction and transformation still run in parallel
+    if DW != 'hive':
+        return {}
+    return {table: multiprocessing.Lock() for table in data_warehouse_loaders(DW)}
+
+
+def backfill(DW, start, end, chunk_hours=6, workers=4, checkpoint_path=None):
+    """
+    Rebuild the data warehouse tables from the staging rows created in [start, end), split into
+    chunks of 'chunk_hours' hours run in parallel by 'workers' processes.
+
+    Every stage done for a chunk is checkpointed, so running the same command again after a failure
+    or an interruption resumes with the stages and chunks left. A stage deletes the rows of its chunk
+    from its warehouse table before loading them, so a stage run again and rows already loaded by the
+    ETL cycle in the range are replaced, not duplicated. On Hive, where deleting rewrites the day
+    partitions, the deletes and loads of a table are run one chunk at a time.
+
+    Returns:
+        dict: Per chunk start, the report of its stages.
+    """
+    run = f"{DW}|{start:%Y-%m-%d %H:%M:%S}|{end:%Y-%m-%d %H:%M:%S}|{chunk_hours}h"
+    checkpoints = BackfillCheckpoints(run, checkpoint_path)
+    stage_names = {stage.name for stage in BACKFILL_STAGES}
+    chunks = split_chunks(start, end, chunk_hours)
+    pending = [(s, e) for s, e in chunks if checkpoints.done_stages(f"{s:%Y-%m-%d %H:%M:%S}") < stage_names]
+    print(f"Backfill {run}: {len(chunks)} chunks, {len(chunks) - len(pending)} already done, {workers} workers.")
+    if not pending:
+        return {}
+
+    reports = {}
+    total_rows, failed = 0, 0
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(DW, _write_locks(DW))) as executor:
+        futures = {
+            executor.submit(run_chunk, s, e, checkpoints.done_stages(f"{s:%Y-%m-%d %H:%M:%S}")): (s, e)
+            for s, e in pending
+        }
+        for future in as_completed(futures):
+            chunk_start, chunk_end = futures[future]
+            key = f"{chunk_start:%Y-%m-%d %H:%M:%S}"
+            try:
+                report = future.result()
+            except Exception as e:
+                print(f"Chunk {key} failed: {e}")
+                failed += 1
+                continue
+            reports[key] = report
+            checkpoints.record(key, [name for name, result in report.items() if result['status'] == 'done'])
+            rows = sum(result['rows'] for result in report.values())
+            total_rows += rows
+            if any(result['status'] != 'done' for result in report.values()):
+                failed += 1
+            elapsed = time.perf_counter() - started
+            print(f"Chunk {key} -> {chunk_end:%Y-%m-%d %H:%M:%S}: {rows} rows loaded "
+                  f"({len(reports)}/{len(pending)} chunks, {total_rows / elapsed:.0f} rows/s).")
+
+    elapsed = time.perf_counter() - started
+    print(f"Backfill finished in {elapsed:.1f}s: {len(pending) - failed} chunks done, {failed} failed, "
+          f"{total_rows} rows loaded ({total_rows / elapsed:.0f} rows/s, {len(pending) / elapsed * 60:.1f} chunks/min).")
+    if failed:
+        print("Run the same command again to resume the failed chunks.")
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the data warehouse from a range of staging rows.")
+    parser.add_argument("--start", required=True, help="first creation time, YYYY-MM-DD[ HH:MM:SS]")
+    parser.add_argument("--end", required=True, help="creation time after the last row, YYYY-MM-DD[ HH:MM:SS]")
+    parser.add_argument("--dw", choices=["snowflake", "hive", "fake-snowflake"], default="snowflake")
+    parser.add_argument("--chunk-hours", type=int, default=6)
+    parser.add_argument("--workers", type=int, default=int(os.getenv('backfill_workers') or 4))
+    args = parser.parse_args()
+    start, end = datetime.fromisoformat(args.start), datetime.fromisoformat(args.end)
+    if end <= start:
+        parser.error("--end must be after --start")
+    backfill(args.dw, start, end, args.chunk_hours, args.workers)
+
+
+if __name__ == "__main__":
+    main()
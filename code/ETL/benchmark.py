@@ -0,0 +1,223 @@
+import sys
+import time
+import random
+import os
+from datetime import datetime, timedelta
+from decimal import Decimal
+from dotenv import load_dotenv
+import mysql.connector
+
+from extract_transform import get_coins_data
+from sentiment import SentimentScorer
+
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+env_path = os.path.join(current_dir, '../../.env')
+load_dotenv(env_path)
+
+# Scratch database used for the benchmarks, never the real staging database
+BENCH_DATABASE = os.getenv('SQLbenchdatabase', 'crypto_bench')
+
+
+#=======================================scratch database ========================================================
+
+def connect_bench_database():
+    """
+    Connect to MySQL and (re)create the scratch benchmark database with an empty crypto_data table.
+
+    Returns:
+        tuple: (connection, cursor) positioned on the scratch database.
+    """
+    connection = mysql.connector.connect(
+        host=os.getenv('SQLhost'),
+        user=os.getenv('SQLuser'),
+        password=os.getenv('SQLpassword')
+    )
+    cursor = connection.cursor()
+    cursor.execute(f"CREATE DATABASE IF NOT EXISTS {BENCH_DATABASE}")
+    cursor.execute(f"USE {BENCH_DATABASE}")
+    return connection, cursor
+
+
+def seed_crypto_data(cursor, connection, coin_count, history_hours, step_minutes=1):
+    """
+    Fill the scratch crypto_data table with synthetic rows ending now.
+
+    Args:
+        coin_count (int): Number of distinct coins to generate.
+        history_hours (int): Hours of history generated for every coin.
+        step_minutes (int): Minutes between two rows of the same coin.
+    """
+    cursor.execute("DROP TABLE IF EXISTS crypto_data")
+    cursor.execute("""
+        CREATE TABLE crypto_data (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            Coin VARCHAR(50),
+            Open DECIMAL(20, 8),
+            High DECIMAL(20, 8),
+            Low DECIMAL(20, 8),
+            Close DECIMAL(20, 8),
+            Volume DECIMAL(20, 8),
+            Market_Cap DECIMAL(30,10),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            INDEX idx_crypto_coin_created (Coin, created_at)
+        );
+    """)
+    insert_query = """
+        INSERT INTO crypto_data (Coin, Open, High, Low, Close, Volume, Market_Cap, created_at)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    """
+    now = datetime.now().replace(microsecond=0)
+    steps = int(history_hours * 60 / step_minutes)
+    for coin_index in range(coin_count):
+        coin = f"C{coin_index:04d}"
+        price = random.uniform(1, 1000)
+        rows = []
+        for step in range(steps, -1, -1):
+            price *= random.uniform(0.99, 1.01)
+            rows.append((
+                coin, price, price * 1.01, price * 0.99, price,
+                random.uniform(1, 1000), price * 1e6,
+                now - timedelta(minutes=step * step_minutes)
+            ))
+        cursor.executemany(insert_query, rows)
+    connection.commit()
+
+
+#=======================================24h change extraction ========================================================
+
+def per_row_coins_data(cursor, interval=4):
+    """
+    Reference implementation of the former N+1 extraction: one 24h history query per window row.
+    """
+    past_time = (datetime.now() - timedelta(minutes=interval)).strftime('%Y-%m-%d %H:%M:%S')
+    cursor.execute("""
+        SELECT created_at, Coin, Close, Market_Cap
+        FROM crypto_data
+        WHERE created_at >= %s;
+    """, (past_time,))
+    data = []
+    for time_stamp, coin, close_price, market_cap in cursor.fetchall():
+        cursor.execute("""
+            SELECT Close, Market_Cap
+            FROM crypto_data
+            WHERE Coin = %s AND created_at >= %s AND created_at <= %s
+            ORDER BY created_at ASC;
+        """, (coin, time_stamp - timedelta(hours=24), time_stamp))
+        data_24h = cursor.fetchall()
+        if data_24h:
+            first_close_price, first_market_cap = data_24h[0]
+            data.append((coin, time_stamp, close_price - first_close_price, market_cap - first_market_cap))
+    return data
+
+
+def benchmark_coins_data(coin_counts=(6, 50, 200), history_hours=(1, 6, 24)):
+    """
+    Compare the per-row and the set-based 24h change extraction for growing coin counts and history depths.
+
+    Returns:
+        list: One dict per (coins, history) combination with the timings in seconds.
+    """
+    connection, cursor = connect_bench_database()
+    report = []
+    try:
+        for coin_count in coin_counts:
+            for hours in history_hours:
+                seed_crypto_data(cursor, connection, coin_count, hours)
+
+                start = time.perf_counter()
+                reference = per_row_coins_data(cursor)
+                per_row_seconds = time.perf_counter() - start
+
+                start = time.perf_counter()
+                result = get_coins_data(connection.cursor()) or []
+                set_based_seconds = time.perf_counter() - start
+
+                # Both paths must agree on the computed price changes
+                expected = {(coin, ts): change for coin, ts, change, _ in reference}
+                mismatches = sum(
+                    1 for record in result
+                    if abs(Decimal(expected.get((record['coin'], record['time_stamp']), 0)) - Decimal(record['price_change'])) > Decimal('1e-6')
+                )
+
+                report.append({
+                    "coins": coin_count,
+                    "history_hours": hours,
+                    "window_rows": len(result),
+                    "per_row_seconds": per_row_seconds,
+                    "set_based_seconds": set_based_seconds,
+                    "mismatches": mismatches
+                })
+                print(f"coins={coin_count:<5} history={hours:>3}h rows={len(result):<6} "
+                      f"per-row={per_row_seconds:.3f}s set-based={set_based_seconds:.3f}s mismatches={mismatches}")
+    finally:
+        cursor.execute(f"DROP DATABASE IF EXISTS {BENCH_DATABASE}")
+        cursor.close()
+        connection.close()
+    return report
+
+
+#=======================================sentiment scoring========================================================
+
+SENTIMENT_WORDS = ["great", "terrible", "bullish", "crash", "love", "hate", "good", "bad", "surge", "fear",
+                   "win", "loss", "amazing", "awful", "happy", "worried"]
+NEUTRAL_WORDS = ["bitcoin", "ethereum", "market", "price", "today", "traders", "the", "is", "a", "after",
+                 "news", "exchange", "blockchain", "week", "coin", "rally"]
+
+
+def generate_texts(count, distinct, seed=42):
+    """
+    Synthetic headlines: 'count' texts drawn from 'distinct' different ones, as repeated news and retweets are.
+    """
+    rng = random.Random(seed)
+    pool = [
+        " ".join(rng.choice(SENTIMENT_WORDS if rng.random() < 0.3 else NEUTRAL_WORDS) for _ in range(rng.randint(8, 25)))
+        for _ in range(distinct)
+    ]
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def benchmark_sentiment(text_count=20000, distinct=15000, processes=4):
+    """
+    Texts/sec of the sentiment scorer: cold cache in one process, cold cache across a process pool,
+    and warm cache (the same texts scored again).
+
+    Returns:
+        dict: Texts per second of each run.
+    """
+    texts = generate_texts(text_count, distinct)
+    report = {}
+
+    start = time.perf_counter()
+    scorer = SentimentScorer()
+    print(f"lexicon loaded in {time.perf_counter() - start:.3f}s")
+
+    start = time.perf_counter()
+    cold = scorer.score_batch(texts)
+    report["cold"] = text_count / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    warm = scorer.score_batch(texts)
+    report["warm"] = text_count / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    pooled = SentimentScorer().score_batch(texts, processes=processes)
+    report[f"cold, {processes} processes"] = text_count / (time.perf_counter() - start)
+
+    # Every run must give the same scores
+    mismatches = sum(1 for a, b, c in zip(cold, warm, pooled) if not a == b == c)
+    for run, texts_per_second in report.items():
+        print(f"{run:<22} {texts_per_second:12.0f} texts/sec")
+    print(f"cache hits {scorer.hits}, misses {scorer.misses}, mismatches {mismatches}")
+    return report
+
+
+if __name__ == "__main__":
+    # python benchmark.py [coins|sentiment]
+    target = sys.argv[1] if len(sys.argv) > 1 else "coins"
+    if target == "sentiment":
+        print("sentiment scoring: cold vs warm cache".center(160, '='))
+        benchmark_sentiment()
+    else:
+        print("24h change extraction: per-row vs set-based".center(160, '='))
+        benchmark_coins_data()
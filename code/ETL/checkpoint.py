@@ -0,0 +1,119 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CHECKPOINT_PATH = os.path.join(current_dir, 'etl_checkpoints.json')
+
+
+class CheckpointStore:
+    """
+    Persistent high-water marks of the staging rows already moved to the data warehouse.
+
+    Every warehouse table fed from a staging table has its own checkpoint, keyed by the
+    auto-increment `id` of the last staging row loaded (and its `created_at` for reporting).
+    A cycle reads the rows between the checkpoint and the current maximum id with `begin`,
+    and only moves the checkpoint forward with `commit` once the load succeeded, so a slow
+    cycle never drops rows, an early cycle never re-reads them and a restart catches up in one pass.
+    """
+
+    def __init__(self, path=None, initial_interval=4):
+        """
+        Args:
+            path (str): JSON file holding the checkpoints (default: etl_checkpoints.json next to this module).
+            initial_interval (int): Minutes of history read the first time a table is extracted.
+        """
+        self.path = path or os.getenv('etl_checkpoint_path', DEFAULT_CHECKPOINT_PATH)
+        self.initial_interval = initial_interval
+        self.checkpoints = self._read()
+        self.pending = {}
+        # ETL stages run in parallel threads and share the store
+        self.lock = threading.Lock()
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r') as checkpoint_file:
+                return json.load(checkpoint_file)
+        except (OSError, ValueError) as e:
+            print(f"Error reading checkpoints from {self.path}: {e}")
+            return {}
+
+    def _write(self):
+        # Write to a temporary file first so a crash never leaves a truncated checkpoint file
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, 'w') as checkpoint_file:
+            json.dump(self.checkpoints, checkpoint_file, indent=2)
+        os.replace(temporary_path, self.path)
+
+    def get(self, name):
+        """
+        Return the stored checkpoint of a warehouse table, or None if it was never loaded.
+
+        Returns:
+            dict: {'table': ..., 'last_id': ..., 'last_created_at': ...}
+        """
+        return self.checkpoints.get(name)
+
+    def begin(self, cursor, name, table):
+        """
+        Compute the id range of the staging rows not yet moved for a warehouse table.
+
+        Args:
+            cursor: MySQL cursor on the staging database.
+            name (str): Warehouse table fed by the rows (the checkpoint key).
+            table (str): Staging table the rows are read from.
+
+        Returns:
+            tuple: (low_id, high_id), rows to extract satisfy low_id < id <= high_id.
+        """
+        checkpoint = self.checkpoints.get(name)
+        if checkpoint:
+            low_id = checkpoint['last_id']
+        else:
+            # First run: start from the rows of the last 'initial_interval' minutes
+            cursor.execute(
+                f"SELECT COALESCE(MAX(id), 0) FROM {table} WHERE created_at < NOW() - INTERVAL %s MINUTE",
+                (self.initial_interval,)
+            )
+            low_id = cursor.fetchone()[0]
+
+        # Freeze the upper bound so rows arriving during the cycle are left for the next one
+        cursor.execute(f"SELECT id, created_at FROM {table} ORDER BY id DESC LIMIT 1")
+        last_row = cursor.fetchone()
+        if last_row is None or last_row[0] <= low_id:
+            high_id, high_created_at = low_id, checkpoint['last_created_at'] if checkpoint else None
+        else:
+            high_id, high_created_at = last_row
+            if isinstance(high_created_at, datetime):
+                high_created_at = high_created_at.strftime('%Y-%m-%d %H:%M:%S')
+
+        with self.lock:
+            self.pending[name] = {'table': table, 'last_id': high_id, 'last_created_at': high_created_at}
+        return low_id, high_id
+
+    def commit(self, name):
+        """
+        Advance the checkpoint of a warehouse table to the range returned by the last `begin`.
+        Must only be called once the rows of that range are loaded.
+        """
+        with self.lock:
+            pending = self.pending.pop(name, None)
+            if pending is None:
+                return
+            self.checkpoints[name] = pending
+            try:
+                self._write()
+                print(f"Checkpoint of {name} advanced to id {pending['last_id']} ({pending['last_created_at']}).")
+            except OSError as e:
+                print(f"Error writing checkpoints to {self.path}: {e}")
+
+    def rollback(self, name):
+        """
+        Discard the range returned by the last `begin`, its rows will be read again next cycle.
+        """
+        with self.lock:
+            self.pending.pop(name, None)
@@ -0,0 +1,207 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pyhive import hive
+import snowflake.connector
+import mysql.connector
+
+
+#=======================================connection factories========================================================
+
+def connect_mysql():
+    """
+    Open a connection to the MySQL staging database.
+    Autocommit keeps a long-lived connection from reading an old snapshot of the staging tables.
+    """
+    connection = mysql.connector.connect(
+        host=os.getenv('SQLhost'),
+        user=os.getenv('SQLuser'),
+        password=os.getenv('SQLpassword'),
+        database=os.getenv('SQLdatabase')
+    )
+    connection.autocommit = True
+    return connection
+
+
+def connect_snowflake():
+    """
+    Open a connection to the Snowflake data warehouse, with the warehouse, database and schema selected.
+    """
+    connection = snowflake.connector.connect(
+        user=os.getenv('user_snowflake'),
+        password=os.getenv('password_snowflake'),
+        account=os.getenv('snowflake_account')
+    )
+    cursor = connection.cursor()
+    # Set up your Snowflake context
+    cursor.execute("USE WAREHOUSE COMPUTE_WH;")
+    cursor.execute("USE DATABASE CRYPTODW;")
+    cursor.execute("USE SCHEMA CRYPTOS;")
+    cursor.close()
+    return connection
+
+
+def connect_hive():
+    """
+    Open a connection to the Hive data warehouse.
+    """
+    return hive.connect(
+        host=os.getenv('hive_host'),
+        port=os.getenv('hive_port'),
+        database=os.getenv('hive_database')
+    )
+
+
+#=======================================health checks========================================================
+
+def mysql_is_alive(connection):
+    try:
+        connection.ping(reconnect=False)
+        return True
+    except Exception:
+        return False
+
+
+def snowflake_is_alive(connection):
+    return not connection.is_closed()
+
+
+def ping_is_alive(connection):
+    """
+    Generic health check running a trivial query (used for Hive).
+    """
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SELECT 1")
+        cursor.fetchall()
+        cursor.close()
+        return True
+    except Exception:
+        return False
+
+
+#=======================================pool========================================================
+
+class ConnectionPool:
+    """
+    Pool of long-lived connections to one database.
+
+    Connections are opened on demand up to 'size', handed out one at a time, checked before reuse and
+    replaced when they are dead or older than 'max_age' seconds, so connection setup (a Snowflake login
+    takes seconds) happens once instead of every ETL cycle. Every caller gets its own cursor, closed
+    when it is done, so no stage ever runs on a cursor closed by another one.
+    """
+
+    def __init__(self, name, factory, size=4, max_age=3600, health_check=None):
+        """
+        Args:
+            name (str): Name used in the logs.
+            factory: Function opening a new connection.
+            size (int): Maximum number of connections open at the same time.
+            max_age (int): Seconds after which a connection is recycled.
+            health_check: Function telling whether a connection is still usable.
+        """
+        self.name = name
+        self.factory = factory
+        self.size = size
+        self.max_age = max_age
+        self.health_check = health_check
+        self.idle = []  # (connection, opened_at)
+        self.open_count = 0
+        self.condition = threading.Condition()
+
+    def _close(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def acquire(self):
+        """
+        Take a healthy connection from the pool, opening one if needed.
+
+        Returns:
+            tuple: (connection, opened_at), to give back with `release`.
+        """
+        with self.condition:
+            while True:
+                if self.idle:
+                    connection, opened_at = self.idle.pop()
+                    break
+                if self.open_count < self.size:
+                    self.open_count += 1
+                    connection, opened_at = None, None
+                    break
+                self.condition.wait()
+
+        if connection is not None:
+            too_old = time.monotonic() - opened_at > self.max_age
+            if not too_old and (self.health_check is None or self.health_check(connection)):
+                return connection, opened_at
+            print(f"Recycling {'stale' if too_old else 'dead'} {self.name} connection.")
+            self._close(connection)
+
+        try:
+            connection = self.factory()
+        except Exception:
+            with self.condition:
+                self.open_count -= 1
+                self.condition.notify()
+            raise
+        print(f"Opened a new {self.name} connection.")
+        return connection, time.monotonic()
+
+    def release(self, connection, opened_at, broken=False):
+        """
+        Give a connection back to the pool, or close it if it is broken.
+        """
+        with self.condition:
+            if broken:
+                self.open_count -= 1
+            else:
+                self.idle.append((connection, opened_at))
+            self.condition.notify()
+        if broken:
+            self._close(connection)
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a connection for the duration of a `with` block.
+        """
+        connection, opened_at = self.acquire()
+        broken = False
+        try:
+            yield connection
+        except Exception:
+            # The connection may be in an unknown state after a failure, check it before reuse
+            broken = self.health_check is not None and not self.health_check(connection)
+            raise
+        finally:
+            self.release(connection, opened_at, broken)
+
+    @contextmanager
+    def cursor(self):
+        """
+        Borrow a connection and get a new cursor on it for the duration of a `with` block.
+        """
+        with self.connection() as connection:
+            cursor = connection.cursor()
+            try:
+                yield cursor
+            finally:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+
+    def close_all(self):
+        """
+        Close every idle connection of the pool.
+        """
+        with self.condition:
+            idle, self.idle = self.idle, []
+            self.open_count -= len(idle)
+        for connection, _ in idle:
+            self._close(connection)
@@ -1,10 +1,7 @@
 import time
-from pyhive import hive
 from datetime import datetime
-import snowflake.connector
 import os
 from dotenv import load_dotenv
-import mysql.connector
 
 
 # Import functions from the provided modules
@@ -14,6 +11,7 @@ from extract_transform import (
     get_coins_data,
     get_last_timestamp,
     get_technical_indicators, 
+    warm_up_indicator_engine,
     get_crypto_info, 
     cryptoinfo,
     blockchaininf,
@@ -30,83 +28,218 @@ from load import (
     insert_results_into_fact_table,
     insert_metadata_into_hive,
     insert_blockchain_info_into_hive,
-    insert_date_dimensions_to_hive
+    insert_date_dimensions_to_hive,
+    delete_time_range_from_hive
 )
 
+from snowflake_load import (
+    insert_sentiment_data_to_snowflake,
+    insert_correlation_data_to_snowflake,
+    insert_coins_data_to_snowflake,
+    insert_technical_indicators_to_snowflake,
+    insert_results_into_snowflake_fact_table,
+    insert_metadata_into_snowflake,
+    insert_blockchain_info_into_snowflake,
+    insert_date_dimensions_to_snowflake,
+    delete_time_range_from_snowflake
+)
+from fake_snowflake import FakeSnowflakeConnection
+
+from checkpoint import CheckpointStore
+from stages import Stage, run_stages, print_stage_report
+from connections import (
+    ConnectionPool,
+    connect_mysql,
+    connect_snowflake,
+    connect_hive,
+    mysql_is_alive,
+    snowflake_is_alive,
+    ping_is_alive
+)
+from indicators import IndicatorEngine
+from sentiment import SentimentScorer
+
+
+# Loader of each data warehouse table, for each supported data warehouse
+HIVE_LOADERS = {
+    'sentiment_dim': insert_sentiment_data_to_hive,
+    'correlations_dim': insert_correlation_data_to_hive,
+    'crypto_dim': insert_coins_data_to_hive,
+    'technical_indicators': insert_technical_indicators_to_hive,
+    'date_dim': insert_date_dimensions_to_hive,
+    'blockchain_info': insert_blockchain_info_into_hive,
+    'fact_table': insert_results_into_fact_table,
+    'crypto_info': insert_metadata_into_hive
+}
+
+SNOWFLAKE_LOADERS = {
+    'sentiment_dim': insert_sentiment_data_to_snowflake,
+    'correlations_dim': insert_correlation_data_to_snowflake,
+    'crypto_dim': insert_coins_data_to_snowflake,
+    'technical_indicators': insert_technical_indicators_to_snowflake,
+    'date_dim': insert_date_dimensions_to_snowflake,
+    'blockchain_info': insert_blockchain_info_into_snowflake,
+    'fact_table': insert_results_into_snowflake_fact_table,
+    'crypto_info': insert_metadata_into_snowflake
+}
+
+
+#=======================================ETL stages========================================================
+# Each stage extracts, transforms and loads one data warehouse table with its own cursors.
+# 'context' holds the state kept between cycles: checkpoints, indicator engine, sentiment scorer and loaders.
+
+def etl_sentiment_dim(DWcursor, mysqlCursor, context):
+    # 1. Sentiment Analysis
+    checkpoints, loaders = context['checkpoints'], context['loaders']
+    id_range = checkpoints.begin(mysqlCursor, 'sentiment_dim', 'sentiment')
+    sentiment_data = get_sentiment_data(mysqlCursor, id_range=id_range)
+    if sentiment_data is None:
+        # Extract failed: the rows are read again next cycle
+        checkpoints.rollback('sentiment_dim')
+    elif sentiment_data:
+        processed_sentiment = apply_sentiment_analysis(sentiment_data, context['sentiment_scorer'])
+        if len(processed_sentiment) < len(sentiment_data):
+            # Scoring failed: the rows are read again next cycle instead of being skipped
+            print(f"Sentiment analysis scored {len(processed_sentiment)} of {len(sentiment_data)} rows, checkpoint kept.")
+            checkpoints.rollback('sentiment_dim')
+        elif loaders['sentiment_dim'](processed_sentiment,DWcursor):
+            checkpoints.commit('sentiment_dim')
+        else:
+            checkpoints.rollback('sentiment_dim')
+
+
+def etl_correlations_dim(DWcursor, mysqlCursor, context):
+    # 2. Correlation Data
+    correlation_data = get_correlation_data(mysqlCursor)
+    if correlation_data:
+        context['loaders']['correlations_dim'](correlation_data,DWcursor)
+
+
+def etl_crypto_dim(DWcursor, mysqlCursor, context):
+    # 3. Coins Data
+    checkpoints, loaders = context['checkpoints'], context['loaders']
+    id_range = checkpoints.begin(mysqlCursor, 'crypto_dim', 'crypto_data')
+    coins_data = get_coins_data(mysqlCursor, id_range=id_range)
+    if coins_data:
+        if loaders['crypto_dim'](coins_data,DWcursor):
+            checkpoints.commit('crypto_dim')
+
+
+def etl_technical_indicators(DWcursor, mysqlCursor, context):
+    # 4. Technical Indicators
+    checkpoints, loaders = context['checkpoints'], context['loaders']
+    indicator_engine = context['indicator_engine']
+    id_range = checkpoints.begin(mysqlCursor, 'technical_indicators', 'crypto_data')
+    if not indicator_engine.warmed:
+        warm_up_indicator_engine(mysqlCursor, indicator_engine, up_to_id=id_range[0])
+    if indicator_engine.warmed:
+        # Keep the engine state to replay the same rows next cycle if the load fails
+        engine_snapshot = indicator_engine.snapshot()
+        indicators_data = get_technical_indicators(mysqlCursor, indicator_engine, id_range=id_range)
+        if indicators_data is not None and not indicators_data.empty and loaders['technical_indicators'](indicators_data,DWcursor):
+            checkpoints.commit('technical_indicators')
+        else:
+            indicator_engine.restore(engine_snapshot)
+            checkpoints.rollback('technical_indicators')
 
-def perform_etl_cycle(DWcursor, mysqlCursor):
+
+def etl_date_dim(DWcursor, mysqlCursor, context):
+    # 5. Last Timestamp and Date Dimensions
+    last_timestamp = get_last_timestamp(mysqlCursor)
+    if last_timestamp:
+        transformed_timestamp = transforme_date_dimensions(last_timestamp)
+        context['loaders']['date_dim'](transformed_timestamp,DWcursor)
+
+
+def etl_blockchain_info(DWcursor, mysqlCursor, context):
+    # 6. Blockchain Information
+    # Note: You might need to modify blockchaininf function to match your exact requirements
+    blockchain_data = blockchaininf()
+    if blockchain_data:
+        context['loaders']['blockchain_info'](blockchain_data,DWcursor)
+
+
+def etl_fact_table(DWcursor, mysqlCursor, context):
+    # 7. Crypto Info Fact Table
+    checkpoints, loaders = context['checkpoints'], context['loaders']
+    id_range = checkpoints.begin(mysqlCursor, 'fact_table', 'crypto_data')
+    fact_data = get_crypto_info(mysqlCursor, id_range=id_range)
+    if fact_data is None:
+        # Extract failed: the rows are read again next cycle
+        checkpoints.rollback('fact_table')
+    elif fact_data:
+        if loaders['fact_table'](fact_data,DWcursor):
+            checkpoints.commit('fact_table')
+        else:
+            checkpoints.rollback('fact_table')
+
+
+def etl_crypto_info(DWcursor, mysqlCursor, context):
+    # 8. Metadata
+    metadata = cryptoinfo()
+    if metadata:
+        context['loaders']['crypto_info'](metadata,DWcursor)
+
+
+# The dimensions are independent of each other; the fact table is loaded once the dimensions it refers to are
+ETL_STAGES = [
+    Stage("sentiment dim", etl_sentiment_dim),
+    Stage("correlation dim", etl_correlations_dim),
+    Stage("coins dim", etl_crypto_dim),
+    Stage("indicators dim", etl_technical_indicators),
+    Stage("date dim", etl_date_dim),
+    Stage("blockchain dim", etl_blockchain_info),
+    Stage("metadata dim", etl_crypto_info),
+    Stage("fact table", etl_fact_table, depends_on=["coins dim", "date dim", "metadata dim"])
+]
+
+
+def perform_etl_cycle(DWpool, mysqlPool, context, max_workers=4):
     """
-    Perform a complete ETL cycle for different data sources
+    Perform a complete ETL cycle for different data sources.
+    Staging rows are read from the checkpoint of each warehouse table, which is only
+    advanced once its load succeeded. Independent stages run concurrently on up to
+    'max_workers' threads, each with its own cursors borrowed from the long-lived
+    connection pools of the data warehouse and of the MySQL staging database.
+
+    Returns:
+        dict: Status and wall time of each stage.
     """
-    try:
-        # 1. Sentiment Analysis
-        print("loading sentiment dim".center(160, '='))
-        sentiment_data = get_sentiment_data(mysqlCursor)
-        if sentiment_data:
-            processed_sentiment = apply_sentiment_analysis(sentiment_data)
-            insert_sentiment_data_to_hive(processed_sentiment,DWcursor)
-    except Exception as e:
-        print(f"Error in ETL Cycle:there is a probleme when trying to handle sentiment dim")
-    try:
-        # 2. Correlation Data
-        print("loading correlation dim".center(160, '='))
-        correlation_data = get_correlation_data(mysqlCursor)
-        if correlation_data:
-            insert_correlation_data_to_hive(correlation_data,DWcursor)
-    except Exception as e:
-        print(f"Error in ETL Cycle:there is a probleme when trying to handle correlation dim")
-    try: 
-        # 3. Coins Data
-        print("loading coins dim".center(160, '='))
-        coins_data = get_coins_data(mysqlCursor)
-        if coins_data:
-            insert_coins_data_to_hive(coins_data,DWcursor)
-    except Exception as e:
-        
-        print(f"Error in ETL Cycle:there is a probleme when trying to handle coins dim")
-    try:
-        # 4. Technical Indicators
-        print("loading indicators dim".center(160, '='))
-        indicators_data = get_technical_indicators(mysqlCursor)
-        if not indicators_data.empty:
-            insert_technical_indicators_to_hive(indicators_data,DWcursor)
-    except Exception as e:
-        print(f"Error in ETL Cycle:there is a probleme when trying to handle indicators dim")
-    try:
-        # 5. Last Timestamp and Date Dimensions
-        print("loading date dim".center(160, '='))
-        last_timestamp = get_last_timestamp(mysqlCursor)
-        if last_timestamp:
-            transformed_timestamp = transforme_date_dimensions(last_timestamp)
-            insert_date_dimensions_to_hive(transformed_timestamp,DWcursor)
-    except Exception as e:
-        print(f"Error in ETL Cycle:there is a probleme when trying to handle date dim")
-    try:
-        # 6. Blockchain Information
-        # Note: You might need to modify blockchaininf function to match your exact requirements
-        print("loading blockchain dim".center(160, '='))
-        blockchain_data = blockchaininf()
-        if blockchain_data:
-            insert_blockchain_info_into_hive(blockchain_data,DWcursor)
-    except Exception as e:
-        print(f"Error in ETL Cycle:there is a probleme when trying to handle blockchain dim")
-    try:
-        # 7. Crypto Info Fact Table
-        print("loading fact table".center(160, '='))
-        fact_data = get_crypto_info()
-        if fact_data:
-            insert_results_into_fact_table(fact_data,DWcursor)
-    except Exception as e:
-        print(f"Error in ETL Cycle:there is a probleme when trying to handle fact table")
-    try:
-        # 8. Metadata
-        print("loading metadata dim".center(160, '='))
-        metadata = cryptoinfo()
-        if metadata:
-            insert_metadata_into_hive(metadata,DWcursor)
-    
-    except Exception as e:
-        print(f"Error in ETL Cycle:there is a probleme when trying to handle metadata dim")
+    def run_stage(stage):
+        print(f"loading {stage.name}".center(160, '='))
+        with mysqlPool.cursor() as mysqlCursor, DWpool.cursor() as DWcursor:
+            stage.function(DWcursor, mysqlCursor, context)
+
+    start = time.perf_counter()
+    report = run_stages(ETL_STAGES, run_stage, max_workers=max_workers)
+    print_stage_report(report, time.perf_counter() - start)
+    return report
+
+
+def data_warehouse_loaders(DW):
+    return HIVE_LOADERS if DW == 'hive' else SNOWFLAKE_LOADERS
+
+
+def data_warehouse_range_delete(DW):
+    """
+    Function removing the rows of a time range from a data warehouse table, called with (cursor, table, start, end).
+    """
+    return delete_time_range_from_hive if DW == 'hive' else delete_time_range_from_snowflake
+
+
+def data_warehouse_pool(DW, size):
+    """
+    Pool of connections to the data warehouse: 'snowflake', 'hive' or 'fake-snowflake' (offline).
+    """
+    if DW == 'snowflake':
+        return ConnectionPool('snowflake', connect_snowflake, size=size, health_check=snowflake_is_alive)
+    if DW == 'fake-snowflake':
+        # Offline stand-in recording the PUT / COPY INTO statements of each cycle
+        return ConnectionPool(
+            'fake-snowflake', lambda: FakeSnowflakeConnection(stage_dir=os.getenv('snowflake_load_dir')), size=size
+        )
+    return ConnectionPool('hive', connect_hive, size=size, health_check=ping_is_alive)
+
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 env_path = os.path.join(current_dir, '../../.env')
@@ -120,48 +253,31 @@ def main():
     cycle_interval = 4 * 60  # 4 minutes 
     max_runtime_hours = 24  # Run for 24 hours maximum
     load_dotenv()
-    DW = input('please provide the data warehouse used *snowflake* or *hive* :')
+    DW = input('please provide the data warehouse used *snowflake*, *hive* or *fake-snowflake* (offline) :')
+    loaders = data_warehouse_loaders(DW)
     print("Starting Continuous ETL Process")
     start_time = datetime.now()
+    context = {
+        'checkpoints': CheckpointStore(),
+        'indicator_engine': IndicatorEngine(length=4, bar_minutes=4),
+        'sentiment_scorer': SentimentScorer(),
+        'loaders': loaders
+    }
+
+    # Number of ETL stages running at the same time
+    max_workers = int(os.getenv('etl_workers') or 4)
+
+    # Long-lived connections, opened once and recycled when dead or older than an hour
+    DWpool = data_warehouse_pool(DW, size=max_workers)
+    mysqlPool = ConnectionPool('mysql', connect_mysql, size=max_workers, health_check=mysql_is_alive)
+
     counter = 1
     try:
         while True:
-            if DW == 'snowflake':
-                # Establish connection to datawarehouse
-                conn = snowflake.connector.connect(
-                    user=os.getenv('user_snowflake'),
-                    password=os.getenv('password_snowflake'),
-                    account=os.getenv('snowflake_account')
-                )
-                cursor = conn.cursor()
-
-                # Set up your Snowflake context
-                cursor.execute("USE WAREHOUSE COMPUTE_WH;")
-                cursor.execute("USE DATABASE CRYPTODW;")
-                cursor.execute("USE SCHEMA CRYPTOS;")
-
-            elif DW == 'hive':
-                conn = hive.connect(
-                    host=os.getenv('hive_host'),
-                    port=os.getenv('hive_port'), 
-                    database=os.getenv('hive_database'))
-                cursor = conn.cursor()
-            
-            if bool(cursor):
-                print("Connected to Hive Server")
             # Perform ETL cycle
             print(f"Starting ETL cycle {counter}".center(160, '|'))
             counter += 1
-
-            # Establish connection to the MySQL database
-            mysqlConn = mysql.connector.connect(
-                host=os.getenv('SQLhost'),
-                user=os.getenv('SQLuser'),
-                password=os.getenv('SQLpassword'),
-                database=os.getenv('SQLdatabase')
-            )
-            mysqlCursor = mysqlConn.cursor()
-            perform_etl_cycle(cursor, mysqlCursor)
+            perform_etl_cycle(DWpool, mysqlPool, context, max_workers)
 
             # Check runtime
             current_runtime = datetime.now() - start_time
@@ -172,13 +288,14 @@ def main():
             # Wait before next cycle
             print(f"Waiting {cycle_interval} seconds before next ETL cycle")
             time.sleep(cycle_interval)
-            conn.commit()
 
     except KeyboardInterrupt:
         print("ETL Process manually stopped by user")
     except Exception as e:
         print("Unexpected error in main ETL loop")
     finally:
+        DWpool.close_all()
+        mysqlPool.close_all()
         print("ETL Process Terminated")
 
 if __name__ == "__main__":
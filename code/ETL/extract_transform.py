@@ -1,25 +1,35 @@
 import mysql.connector
 import pandas as pd
-import pandas_ta as ta
 from datetime import datetime, timedelta
 import mysql.connector
-import nltk
-from nltk.sentiment import SentimentIntensityAnalyzer
+from sentiment import default_scorer, label_sentiment
+
+from indicators import IndicatorEngine
 
 
 #=======================================get news and tweets========================================================
 
-# Function to get sentiment data from the last 'interval' minutes
-def get_sentiment_data(cursor, interval=4):
+# Function to get sentiment data from the last 'interval' minutes, or from an id range given by the checkpoint store
+def get_sentiment_data(cursor, interval=4, id_range=None):
 
     try:
-        # SQL query to select timestamp and content from the sentiment table for the last 'interval' minutes
-        query = f"""
-            SELECT created_at, content 
-            FROM sentiment 
-            WHERE created_at >= NOW() - INTERVAL {interval} MINUTE
-        """
-        cursor.execute(query)
+        if id_range:
+            # SQL query to select the rows between the last checkpoint and the current high-water mark
+            query = """
+                SELECT created_at, content 
+                FROM sentiment 
+                WHERE id > %s AND id <= %s
+                ORDER BY id
+            """
+            cursor.execute(query, id_range)
+        else:
+            # SQL query to select timestamp and content from the sentiment table for the last 'interval' minutes
+            query = f"""
+                SELECT created_at, content 
+                FROM sentiment 
+                WHERE created_at >= NOW() - INTERVAL {interval} MINUTE
+            """
+            cursor.execute(query)
 
         # Fetch all rows from the result
         rows = cursor.fetchall()
@@ -29,42 +39,50 @@ def get_sentiment_data(cursor, interval=4):
         else:
             print(f"Fetched {len(rows)} sentiment records from the database.")
          
-        # Close the cursor and connection
-        cursor.close()      
         print(f"Fetched {len(rows)}  sentiments records from the database")
         return rows
 
     except mysql.connector.Error as err:
-        print(f"Error fetching sentiment data from MySQL ")
-        return []  # Return empty list if an error occurs
+        print(f"Error fetching sentiment data from MySQL: {err}")
+        return None  # None, not [], so the callers do not take a failure for an empty window
 
 
 #=======================================get economic data ========================================================
 
-def get_correlation_data(cursor, days=4):
+def get_correlation_data(cursor, days=4, granularity='day', period=None):
+    """
+    Average mid prices ((open + close) / 2) of gold, interest rate and stocks per day (or per hour),
+    read from the economic_rollup table maintained by the streaming ingestor instead of joining
+    the minute bars of the three tables.
+
+    Args:
+        days (int): Number of days to read (the last 10 periods).
+        granularity (str): 'day' or 'hour'.
+        period (tuple): (start, end) of all the periods to read instead, for backfills.
+    """
     try:
-        # SQL query to select data for the last N days and calculate the average of close and open values
-        query = """
-        SELECT 
-            g.Timestamp AS time_stamp,
-            (g.Close + g.Open) / 2 AS goldprice,
-            (i.Close + i.Open) / 2 AS intersrate,
-            (s.Close + s.Open) / 2 AS stocke
+        if period:
+            period_filter, limit, params = "period_start >= %s AND period_start < %s", "", (granularity, *period)
+        else:
+            period_filter, limit, params = "period_start >= CURDATE() - INTERVAL %s DAY", "LIMIT 10", (granularity, days)
+        query = f"""
+        SELECT
+            period_start AS time_stamp,
+            gold_sum / gold_count AS goldprice,
+            interest_sum / NULLIF(interest_count, 0) AS intersrate,
+            stock_sum / NULLIF(stock_count, 0) AS stocke
         FROM
-            GoldPrice g
-        LEFT JOIN
-            InterestRate i ON DATE(g.Timestamp) = DATE(i.Timestamp)
-        LEFT JOIN
-            stocksPrices s ON DATE(g.Timestamp) = DATE(s.Timestamp)
+            economic_rollup
         WHERE
-            DATE(g.Timestamp) BETWEEN CURDATE() - INTERVAL %s DAY AND CURDATE()
-        ORDER BY 
-            g.Timestamp DESC
-        LIMIT 10;
+            granularity = %s
+            AND {period_filter}
+            AND gold_count > 0
+        ORDER BY
+            period_start DESC
+        {limit};
         """
 
-        # Execute the query with a single parameter for 'days'
-        cursor.execute(query, (days,))
+        cursor.execute(query, params)
 
         # Fetch the results
         results = cursor.fetchall()
@@ -86,8 +104,6 @@ def get_correlation_data(cursor, days=4):
 
         print(f"Fetched {len(data)} records from MySQL database.")
 
-        # Close the connection
-        cursor.close()
         return data
 
     except mysql.connector.Error as e:
@@ -98,32 +114,60 @@ def get_correlation_data(cursor, days=4):
 
 #=======================================get coins data ========================================================
 
-def get_coins_data(cursor, interval=4):
+def get_coins_data(cursor, interval=4, id_range=None):
+    """
+    Fetch the coins of the last 'interval' minutes (or of the (low_id, high_id] range given by the
+    checkpoint store) together with their 24h price and market cap changes.
+
+    The 24h baseline of every row (the first record of the same coin inside the 24 hours before it)
+    is resolved by the database in the same statement through a lateral self-join, so the whole window
+    is extracted in one round trip instead of one extra query per row.
+    """
     try:
-        # Calculate the time for the last minute
-        current_time = datetime.now()
-        past_time = current_time - timedelta(minutes=interval)
-        formatted_past_time = past_time.strftime('%Y-%m-%d %H:%M:%S')
+        # Select the extraction window either by id range or by time
+        if id_range:
+            window_filter = "w.id > %s AND w.id <= %s"
+            params = tuple(id_range)
+        else:
+            current_time = datetime.now()
+            past_time = current_time - timedelta(minutes=interval)
+            window_filter = "w.created_at >= %s"
+            params = (past_time.strftime('%Y-%m-%d %H:%M:%S'),)
 
-        # SQL query to select data for the last minute based on 'created_at'
-        query = """
+        # Window rows joined with their 24h baseline; with an index on (Coin, created_at)
+        # each baseline lookup is a single index seek
+        query = f"""
         SELECT
-            created_at AS time_stamp,
-            Coin,
-            Open,
-            High,
-            Low,
-            Close,
-            Volume,
-            Market_Cap
+            w.created_at AS time_stamp,
+            w.Coin,
+            w.Open,
+            w.High,
+            w.Low,
+            w.Close,
+            w.Volume,
+            w.Market_Cap,
+            w.Close - b.Close AS price_change,
+            CASE WHEN b.Close <> 0 THEN (w.Close - b.Close) / b.Close * 100 ELSE 0 END AS price_change_percentage,
+            w.Market_Cap - b.Market_Cap AS market_cap_change,
+            CASE WHEN b.Market_Cap <> 0 THEN (w.Market_Cap - b.Market_Cap) / b.Market_Cap * 100 ELSE 0 END AS market_cap_change_percentage
         FROM
-            crypto_data
+            crypto_data w
+        JOIN LATERAL (
+            SELECT h.Close, h.Market_Cap
+            FROM crypto_data h
+            WHERE h.Coin = w.Coin
+              AND h.created_at >= w.created_at - INTERVAL 24 HOUR
+              AND h.created_at <= w.created_at
+            ORDER BY h.created_at ASC, h.id ASC
+            LIMIT 1
+        ) b ON TRUE
         WHERE
-            created_at >= %s;
+            {window_filter}
+        ORDER BY w.created_at ASC, w.Coin ASC;
         """
 
-        # Execute the query with the calculated past time as the parameter
-        cursor.execute(query, (formatted_past_time,))
+        # Execute the query with the window bounds as parameters
+        cursor.execute(query, params)
 
         # Fetch the results
         results = cursor.fetchall()
@@ -135,79 +179,24 @@ def get_coins_data(cursor, interval=4):
         # Prepare the final output with price, market cap, and volume changes
         data = []
         for row in results:
-            # Extract current record data
-            time_stamp = row[0]
-            coin = row[1]
-            open_price = row[2]
-            high_price = row[3]
-            low_price = row[4]
-            close_price = row[5]
-            volume = row[6]
-            market_cap = row[7]
-
-            # Calculate the 24-hour window (look 24 hours back from this record's timestamp)
-            twenty_four_hours_ago = time_stamp - timedelta(hours=24)
-            formatted_24h_ago = twenty_four_hours_ago.strftime('%Y-%m-%d %H:%M:%S')
-
-            # Query to get the data for the last 24 hours (before the current record)
-            query_24h = """
-            SELECT
-                Close,
-                Market_Cap
-            FROM
-                crypto_data
-            WHERE
-                Coin = %s AND created_at >= %s AND created_at <= %s
-            ORDER BY created_at ASC;
-            """
-
-            cursor.execute(query_24h, (coin, formatted_24h_ago, time_stamp))
-
-            # Fetch 24-hour data
-            data_24h = cursor.fetchall()
-            if not data_24h:    # If no data found for the last 24 hours, skip this record
-                continue
-
-            if len(data_24h) > 0:
-                # Use the first record from 24 hours ago (if available)
-                first_record = data_24h[0]
-                first_close_price = first_record[0]
-                first_market_cap = first_record[1]
-
-                # Calculate the price change and percentage price change
-                price_change = close_price - first_close_price
-                price_change_percentage = (price_change / first_close_price) * 100 if first_close_price != 0 else 0
-
-                # Calculate the market cap change and percentage change
-                market_cap_change = market_cap - first_market_cap
-                market_cap_change_percentage = (market_cap_change / first_market_cap) * 100 if first_market_cap != 0 else 0
-            else:
-                # If no data found for 24 hours ago, set changes to zero
-                price_change = 0
-                price_change_percentage = 0
-                market_cap_change = 0
-                market_cap_change_percentage = 0
-            # Append the record with changes to the final data
             record = {
-                'time_stamp': time_stamp,
-                'coin': coin,
-                'open': open_price,
-                'close': close_price,
-                'high': high_price,
-                'low': low_price,
-                'volume': volume,
-                'price_change': price_change,
-                'price_change_percentage': price_change_percentage,
-                'market_cap': market_cap,
-                'market_cap_change': market_cap_change,
-                'market_cap_change_percentage': market_cap_change_percentage
+                'time_stamp': row[0],
+                'coin': row[1],
+                'open': row[2],
+                'high': row[3],
+                'low': row[4],
+                'close': row[5],
+                'volume': row[6],
+                'market_cap': row[7],
+                'price_change': row[8],
+                'price_change_percentage': row[9],
+                'market_cap_change': row[10],
+                'market_cap_change_percentage': row[11]
             }
             data.append(record)
 
         print(f"Fetched {len(data)} records from MySQL database.")
 
-        # Close the connection
-        cursor.close()
         return data
 
     except mysql.connector.Error as e:
@@ -221,147 +210,208 @@ def get_coins_data(cursor, interval=4):
 #=======================================get coins data and calculate indicators========================================================
 
 
-def get_technical_indicators(cursor, days=30):
+def warm_up_indicator_engine(cursor, engine, days=30, up_to_id=None, period=None):
     """
-    Function to retrieve technical indicators (RSI, EMA, SMA) for data collected every 4 minutes.
+    Rebuild the per-coin indicator state from the last 'days' of history already loaded
+    (bars before the row 'up_to_id'), without emitting any bar. Run once when the ETL process starts.
+
+    The history is read from the 1 minute bars of crypto_ohlcv_1m: the close of a 4-minute bar is the
+    close of its last minute, so the state is the same as with the raw rows, from a fraction of them.
+    The minute of the row 'up_to_id' is still open, its rows up to that one are read from crypto_data.
+
+    Args:
+        period (tuple): (start, end) datetimes of the bars to read instead of the last 'days',
+                        e.g. the hours before a backfill chunk.
     """
     try:
-        # Query to fetch data
-        query = """
-        SELECT created_at, Coin, Close, Open 
-        FROM crypto_data
-        WHERE created_at >= NOW() - INTERVAL %s DAY;
+        if period:
+            window, params = "bar_start >= %s AND bar_start < %s", tuple(period)
+        else:
+            window, params = "bar_start >= NOW() - INTERVAL %s DAY", (days,)
+        query = f"""
+        SELECT bar_start, Coin, Close
+        FROM crypto_ohlcv_1m
+        WHERE {window}
         """
-        cursor.execute(query, (days,))
+        if up_to_id is not None:
+            # The minute of that row is partial, its rows are read from crypto_data below
+            query += """ AND bar_start < (SELECT MAX(created_at) - INTERVAL SECOND(MAX(created_at)) SECOND
+                                          FROM crypto_data WHERE id = %s)"""
+            params += (up_to_id,)
+        query += " ORDER BY bar_start, Coin"
+        cursor.execute(query, params)
         results = cursor.fetchall()
 
-        print(f"Fetched {len(results)} rows from the database.")  # Debugging line
-        if not results:
-            print("No data available for the specified interval.")
-            return pd.DataFrame()
+        if up_to_id is not None:
+            # Rows of the minute of 'up_to_id' up to it, the later ones are read incrementally
+            cursor.execute("""
+            SELECT created_at, Coin, Close
+            FROM crypto_data
+            WHERE id <= %s
+            AND created_at >= (SELECT created_at - INTERVAL SECOND(created_at) SECOND
+                               FROM crypto_data WHERE id = %s)
+            ORDER BY created_at, id
+            """, (up_to_id, up_to_id))
+            results += cursor.fetchall()
+
+        engine.update(results)
+        engine.warmed = True
+        print(f"Indicator engine warmed up with {len(results)} rows for {len(engine.states)} coins.")
+        return True
 
-        # Convert results to DataFrame
-        df = pd.DataFrame(results, columns=["Timestamp", "Coin", "Close", "Open"])
-        df['Timestamp'] = pd.to_datetime(df['Timestamp'], errors='coerce')
+    except mysql.connector.Error as e:
+        print(f"MySQL error: {e}")
+        return False
 
-        # Ensure data is sorted and remove duplicates
-        df.sort_values(by="Timestamp", inplace=True)
-        df.drop_duplicates(subset='Timestamp', inplace=True)
 
-        # Resample data to 4-minute intervals
-        df.set_index("Timestamp", inplace=True)
-        df = df.resample("4min").agg({
-            "Close": "last",
-            "Coin": "first",  # Choose the first value in the interval
-        })
-        df['Close'] = df['Close'].ffill().bfill()  # Fill missing Close values
+def get_technical_indicators(cursor, engine=None, days=30, id_range=None):
+    """
+    Function to retrieve technical indicators (RSI, EMA, SMA) on 4-minute bars for each coin.
 
-        # Ensure there are no None values in 'Close'
-        if df['Close'].isnull().any():
-            print("Error: 'Close' column contains None values after resampling.")
-            return pd.DataFrame()
+    With an engine and an id range given by the checkpoint store, only the new rows are read and
+    fed to the engine's running per-coin state, and the indicators of the bars they close are returned.
+    Otherwise the indicators are recomputed from the last 'days' of history.
 
-        # Ensure enough data points for indicator calculation
-        if len(df) < 4:  # Adjust to match the look-back period (e.g., 4 for RSI)
-            print("Not enough data points to calculate technical indicators.")
-            return pd.DataFrame()
+    Returns:
+        DataFrame: The indicators of the bars closed (empty if none), None if the extract failed.
+    """
+    try:
+        if engine is not None and id_range:
+            query = """
+            SELECT created_at, Coin, Close 
+            FROM crypto_data
+            WHERE id > %s AND id <= %s
+            ORDER BY created_at, id
+            """
+            cursor.execute(query, tuple(id_range))
+        else:
+            # Full recompute on a fresh engine
+            engine = IndicatorEngine(length=4, bar_minutes=4)
+            query = """
+            SELECT bar_start, Coin, Close
+            FROM crypto_ohlcv_1m
+            WHERE bar_start >= NOW() - INTERVAL %s DAY
+            ORDER BY bar_start, Coin
+            """
+            cursor.execute(query, (days,))
+        results = cursor.fetchall()
 
-        # Calculate technical indicators with adjusted periods
-        df['RSI'] = ta.rsi(df['Close'], length=4)  # Adjusted to 4-period RSI
-        df['EMA'] = ta.ema(df['Close'], length=4)  # Adjusted to 4-period EMA
-        df['SMA'] = ta.sma(df['Close'], length=4)  # Adjusted to 4-period SMA
+        print(f"Fetched {len(results)} rows from the database.")  # Debugging line
+        if not results:
+            print("No data available for the specified interval.")
+            return pd.DataFrame()
 
-        # Drop rows with NaN values (occurs at the start due to look-back period)
-        df.dropna(inplace=True)
+        # Update the per-coin running state and collect the closed bars
+        bars = engine.update(results)
+        if not bars:
+            print("No bar closed with enough look-back to calculate technical indicators.")
+            return pd.DataFrame()
 
-        # Reset index for export
-        result = df.reset_index()[['Timestamp', 'Coin', 'RSI', 'EMA', 'SMA']]
+        result = pd.DataFrame(bars, columns=['Timestamp', 'Coin', 'RSI', 'EMA', 'SMA'])
         print(f"Technical indicators calculated for {len(result)} records.")
 
-        # Close the connection
-        cursor.close()
-
         return result
 
     except mysql.connector.Error as e:
         print(f"MySQL error: {e}")
-        return pd.DataFrame()
+        return None
     except Exception as e:
         print(f"An error occurred: {e}")
-        return pd.DataFrame()
+        return None
 
 
 #=======================================get effect table data ========================================================
-def get_crypto_info(cursor, interval_minutes=4):
+def get_crypto_info(cursor, interval_minutes=4, id_range=None):
+    """
+    Prices of the coins of the last 'interval_minutes' minutes (or of the (low_id, high_id] range given by
+    the checkpoint store) with the dominance and exchange rate observed at their time, for the fact table.
+
+    Returns:
+        list: One dict per row ([] if there is none), None if MySQL failed.
+    """
     try:
-        # Calculer le timestamp pour filtrer les dernières minutes
-        last_time = datetime.now() - timedelta(minutes=interval_minutes)
-        formatted_last_time = last_time.strftime('%Y-%m-%d %H:%M:%S')
-
-        # Requête pour extraire les données de crypto_data
-        query_crypto = """
-        SELECT created_at, Coin, Close 
-        FROM crypto_data 
-        WHERE created_at >= %s
-        """
-        cursor.execute(query_crypto, (formatted_last_time,))
-        crypto_data = cursor.fetchall()  # Fetch all results to avoid "Unread result found"
+        if id_range:
+            # Requête pour extraire les lignes de crypto_data entre le checkpoint et le high-water mark
+            query_crypto = """
+            SELECT created_at, Coin, Close 
+            FROM crypto_data 
+            WHERE id > %s AND id <= %s
+            ORDER BY id
+            """
+            cursor.execute(query_crypto, tuple(id_range))
+            crypto_data = cursor.fetchall()
+            if not crypto_data:
+                print("No data found since the last checkpoint.")
+                return []
+            # Les dominances et taux d'échange sont lus à partir du début de la fenêtre
+            formatted_last_time = min(row[0] for row in crypto_data).strftime('%Y-%m-%d %H:%M:%S')
+        else:
+            # Calculer le timestamp pour filtrer les dernières minutes
+            last_time = datetime.now() - timedelta(minutes=interval_minutes)
+            formatted_last_time = last_time.strftime('%Y-%m-%d %H:%M:%S')
+
+            # Requête pour extraire les données de crypto_data
+            query_crypto = """
+            SELECT created_at, Coin, Close 
+            FROM crypto_data 
+            WHERE created_at >= %s
+            """
+            cursor.execute(query_crypto, (formatted_last_time,))
+            crypto_data = cursor.fetchall()  # Fetch all results to avoid "Unread result found"
+
+        if not crypto_data:
+            print("No data found for the specified time range.")
+            return []
 
-        # Requête pour extraire les données de dominance
+        # Dominances et taux d'échange depuis la dernière observation précédant la fenêtre,
+        # pour que la première ligne crypto ait aussi une valeur
         query_dominance = """
-        SELECT BTC_Dominance, ETH_Dominance, Altcoin_Dominance, created_at 
+        SELECT created_at, BTC_Dominance, ETH_Dominance, Altcoin_Dominance
         FROM dominance 
-        WHERE created_at >= %s
+        WHERE created_at >= COALESCE((SELECT MAX(created_at) FROM dominance WHERE created_at <= %s), %s)
         """
-        cursor.execute(query_dominance, (formatted_last_time,))
-        dominance_data = cursor.fetchone()  # Fetch one result
-
-        # Ensure all results from previous queries are consumed
-        cursor.fetchall()  # If any results are still pending, fetch them
+        cursor.execute(query_dominance, (formatted_last_time, formatted_last_time))
+        dominance_data = cursor.fetchall()
 
-        # Requête pour extraire les données d'ExchangeRate
         query_exchange = """
         SELECT Timestamp, unit, value 
         FROM ExchangeRate 
-        WHERE Timestamp >= %s
+        WHERE Timestamp >= COALESCE((SELECT MAX(Timestamp) FROM ExchangeRate WHERE Timestamp <= %s), %s)
         """
-        cursor.execute(query_exchange, (formatted_last_time,))
-        exchange_data = cursor.fetchall()  # Fetch all results for this query
-
-        # Préparer les résultats
-        results = []
-        for timestamp, coin, close in crypto_data:
-            # Identifier la dominance associée à la crypto
-            if coin.lower() == "btc":
-                dominance = dominance_data[0]  # BTC_Dominance
-            elif coin.lower() == "eth":
-                dominance = dominance_data[1]  # ETH_Dominance
-            else:
-                dominance = dominance_data[2]  # Altcoin_Dominance
-
-            # Trouver le taux d'échange correspondant
-            exchange_rate = next((rate for ts, name, rate in exchange_data if name.lower() == coin.lower()), None)
-
-            # Ajouter les données au résultat
-            results.append({
-                "timestamp": timestamp,
-                "coin": coin,
-                "dominance": dominance,
-                "exchange_rate": exchange_rate,
-                "close_price": close
-            })
-            if results:
-                print(f"fetched {len(results)} records for the effect table.")
-            else:
-                print("No data found for the specified time range.")
-
-        # Fermer la connexion
-        cursor.close()
+        cursor.execute(query_exchange, (formatted_last_time, formatted_last_time))
+        exchange_data = cursor.fetchall()
+
+        # Jointure as-of triée : chaque ligne prend la dernière observation précédente (O(n log n))
+        crypto = pd.DataFrame(crypto_data, columns=["timestamp", "coin", "close_price"])
+        crypto["timestamp"] = pd.to_datetime(crypto["timestamp"])
+        crypto["coin_key"] = crypto["coin"].str.upper()
+        crypto = crypto.sort_values("timestamp")
+
+        dominance = pd.DataFrame(dominance_data, columns=["timestamp", "btc", "eth", "altcoin"])
+        dominance["timestamp"] = pd.to_datetime(dominance["timestamp"])
+        crypto = pd.merge_asof(crypto, dominance.sort_values("timestamp"), on="timestamp", direction="backward")
+
+        exchange = pd.DataFrame(exchange_data, columns=["timestamp", "coin_key", "exchange_rate"])
+        exchange["timestamp"] = pd.to_datetime(exchange["timestamp"])
+        exchange["coin_key"] = exchange["coin_key"].str.upper()
+        crypto = pd.merge_asof(crypto, exchange.sort_values("timestamp"), on="timestamp", by="coin_key", direction="backward")
+
+        # Identifier la dominance associée à chaque crypto
+        crypto["dominance"] = crypto["altcoin"].where(crypto["coin_key"] != "BTC", crypto["btc"])
+        crypto["dominance"] = crypto["dominance"].where(crypto["coin_key"] != "ETH", crypto["eth"])
+
+        crypto = crypto[["timestamp", "coin", "dominance", "exchange_rate", "close_price"]]
+        crypto = crypto.astype(object).where(crypto.notna(), None)
+        results = crypto.to_dict("records")
+        for record in results:
+            record["timestamp"] = record["timestamp"].to_pydatetime()
+
+        print(f"fetched {len(results)} records for the effect table.")
         return results
 
     except mysql.connector.Error as err:
         print(f"Error: {err}")
-        return []  # Return empty list in case of error
+        return None  # None, not [], so the callers do not take a failure for an empty window
 
 #==========================================crypto metadata ==================================================
 def cryptoinfo():
@@ -487,8 +537,6 @@ def get_last_timestamp(cursor):
             return None
         else:
             print("Fetched last timestamp from the database.")
-        # Close the connection
-        cursor.close()
 
         # Return the last timestamp
         return result[0] if result[0] else None
@@ -500,34 +548,30 @@ def get_last_timestamp(cursor):
 #=======================================apply sentiment analysis========================================================
 
 # Fonction pour appliquer l'analyse de sentiment sur les données extraites
-def apply_sentiment_analysis(data):
+def apply_sentiment_analysis(data, scorer=None, processes=1):
+    """
+    Score the sentiment of (timestamp, content) rows.
+
+    Args:
+        data (list): Rows fetched by get_sentiment_data.
+        scorer (SentimentScorer): Long-lived scorer (the shared one of the process by default).
+        processes (int): Worker processes used for large batches (backfills).
+
+    Returns:
+        list: One dict per row with the timestamp, the compound score and the sentiment.
+    """
     try:
-        # Initialiser le modèle d'analyse de sentiment
-        nltk.download('vader_lexicon')  # Télécharger le lexique si ce n'est pas déjà fait
-        sia = SentimentIntensityAnalyzer()
+        # Le lexique est chargé une seule fois, les textes déjà vus ne sont pas réévalués
+        scorer = scorer or default_scorer()
+        scores = scorer.score_batch([row[1] for row in data], processes=processes)
 
         result = []
-        for row in data:
-            timestamp = row[0]
-            content = row[1]
-
-            # Appliquer l'analyse de sentiment
-            sentiment_score = sia.polarity_scores(content)
-            compound_score = sentiment_score['compound']
-
-            # Déterminer le sentiment basé sur le score 'compound'
-            if compound_score >= 0.5:
-                sentiment = 'positive'
-            elif compound_score <= -0.5:
-                sentiment = 'negative'
-            else:
-                sentiment = 'neutral'
-
+        for row, compound_score in zip(data, scores):
             # Créer un dictionnaire pour chaque enregistrement
             record = {
-                'timestamp': timestamp,
+                'timestamp': row[0],
                 'score': compound_score,  # Inclure seulement le score 'compound'
-                'sentiment': sentiment
+                'sentiment': label_sentiment(compound_score)
             }
             result.append(record)
 
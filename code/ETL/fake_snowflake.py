@@ -0,0 +1,113 @@
+import csv
+import glob
+import gzip
+import os
+import re
+import shutil
+import tempfile
+
+
+class FakeSnowflakeConnection:
+    """
+    Local stand-in for a snowflake.connector connection, used to run the Snowflake bulk load offline.
+
+    Every statement is recorded in `statements`, PUT copies the files to a local folder per table stage,
+    COPY INTO reads the staged files back into `tables` (one list of row dicts per table) and DELETE of
+    a time range removes rows from them, so the batching and the file layout of a cycle can be inspected
+    without a Snowflake account.
+    """
+
+    def __init__(self, stage_dir=None):
+        self.stage_dir = stage_dir or tempfile.mkdtemp(prefix="fake_snowflake_")
+        self.statements = []
+        self.puts = []
+        self.copies = []
+        self.tables = {}
+
+    def cursor(self):
+        return FakeSnowflakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+    def staged_files(self, table):
+        """
+        Names of the files currently in the stage of a table.
+        """
+        table_stage = os.path.join(self.stage_dir, table)
+        return sorted(os.listdir(table_stage)) if os.path.isdir(table_stage) else []
+
+
+class FakeSnowflakeCursor:
+
+    PUT_PATTERN = re.compile(r"PUT\s+'?file://(?P<path>[^'\s]+)'?\s+@%(?P<table>\w+)", re.IGNORECASE)
+    COPY_PATTERN = re.compile(
+        r"COPY INTO\s+(?P<table>\w+)\s*\((?P<columns>[^)]*)\)\s+FROM\s+\(SELECT[^)]*@%\w+\)\s+FILES\s*=\s*\((?P<files>[^)]*)\)",
+        re.IGNORECASE
+    )
+    DELETE_PATTERN = re.compile(
+        r"DELETE FROM\s+(?P<table>\w+)\s+WHERE\s+(?P<column>\w+)\s*>=\s*%s\s+AND\s+(?P=column)\s*<\s*%s", re.IGNORECASE
+    )
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = 0
+
+    def execute(self, query, params=None):
+        self.connection.statements.append(query)
+        self.rowcount = 0
+
+        put = self.PUT_PATTERN.match(query.strip())
+        if put:
+            table_stage = os.path.join(self.connection.stage_dir, put.group('table'))
+            os.makedirs(table_stage, exist_ok=True)
+            file_names = []
+            for path in sorted(glob.glob(put.group('path'))):
+                shutil.copy(path, table_stage)
+                file_names.append(os.path.basename(path))
+            self.connection.puts.append((put.group('table'), file_names))
+            return self
+
+        copy = self.COPY_PATTERN.match(query.strip())
+        if copy:
+            table = copy.group('table')
+            columns = [column.strip() for column in copy.group('columns').split(',')]
+            file_names = re.findall(r"'([^']+)'", copy.group('files'))
+            table_stage = os.path.join(self.connection.stage_dir, table)
+            rows = self.connection.tables.setdefault(table, [])
+            for file_name in file_names:
+                path = os.path.join(table_stage, file_name)
+                with gzip.open(path, 'rt', encoding='utf-8', newline='') as stage_file:
+                    for values in csv.reader(stage_file):
+                        rows.append({
+                            column: (None if value == '\\N' else value)
+                            for column, value in zip(columns, values)
+                        })
+                        self.rowcount += 1
+                if 'PURGE = TRUE' in query.upper():
+                    os.remove(path)
+            self.connection.copies.append((table, file_names, self.rowcount))
+            return self
+
+        delete = self.DELETE_PATTERN.match(query.strip())
+        if delete:
+            # Time columns are compared as their 'YYYY-MM-DD HH:MM:SS' strings, as in Snowflake
+            lower, upper = params
+            column = delete.group('column')
+            rows = self.connection.tables.get(delete.group('table'), [])
+            kept = [row for row in rows if not (row.get(column) is not None and lower <= row[column] < upper)]
+            self.rowcount = len(rows) - len(kept)
+            rows[:] = kept
+        return self
+
+    def fetchone(self):
+        return None
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
@@ -0,0 +1,145 @@
+import copy
+from collections import deque
+from datetime import timedelta
+
+
+class CoinIndicatorState:
+    """
+    Running state of the indicators of one coin.
+
+    The formulas follow the ones previously computed with pandas_ta on the full history:
+        - SMA: mean of the last 'length' closes.
+        - EMA: seeded with the SMA of the first 'length' closes, then smoothed with alpha = 2 / (length + 1).
+        - RSI: gains and losses averaged with Wilder's moving average (alpha = 1 / length, adjusted weights),
+          defined once 'length' price changes are known.
+    Every value only depends on the previous state and the new close, so feeding the bars one by one
+    gives the same result as recomputing the whole series.
+    """
+
+    def __init__(self, length):
+        self.length = length
+        # Bar currently being built (start of the bucket and last close seen in it)
+        self.bar_start = None
+        self.bar_close = None
+        # Closed bars
+        self.previous_close = None
+        self.sma_window = deque(maxlen=length)
+        self.ema_seed = []
+        self.ema = None
+        self.gain_sum = 0.0
+        self.loss_sum = 0.0
+        self.change_count = 0
+
+    def close_bar(self, close):
+        """
+        Update the indicators with the close of a finished bar.
+
+        Returns:
+            tuple: (rsi, ema, sma), None for the indicators still in their look-back period.
+        """
+        # SMA ring buffer
+        self.sma_window.append(close)
+        sma = sum(self.sma_window) / self.length if len(self.sma_window) == self.length else None
+
+        # EMA seeded with the first SMA
+        if self.ema is None:
+            self.ema_seed.append(close)
+            if len(self.ema_seed) == self.length:
+                self.ema = sum(self.ema_seed) / self.length
+                self.ema_seed = []
+        else:
+            alpha = 2 / (self.length + 1)
+            self.ema = alpha * close + (1 - alpha) * self.ema
+
+        # Wilder RSI: both averages share the same weights, so only the weighted sums are kept
+        rsi = None
+        if self.previous_close is not None:
+            change = close - self.previous_close
+            decay = 1 - 1 / self.length
+            self.gain_sum = max(change, 0.0) + decay * self.gain_sum
+            self.loss_sum = max(-change, 0.0) + decay * self.loss_sum
+            self.change_count += 1
+            if self.change_count >= self.length and (self.gain_sum + self.loss_sum) > 0:
+                rsi = 100 * self.gain_sum / (self.gain_sum + self.loss_sum)
+        self.previous_close = close
+
+        return rsi, self.ema, sma
+
+
+class IndicatorEngine:
+    """
+    Incremental RSI / EMA / SMA computation on fixed-size bars, with one state per coin.
+
+    Rows are fed in time order with `update`; a bar is emitted once a row of a later bar arrives for
+    the same coin, and empty bars in between are filled with the previous close. The cost of a cycle
+    is proportional to the number of new rows instead of the whole look-back history.
+    """
+
+    def __init__(self, length=4, bar_minutes=4):
+        self.length = length
+        self.bar_minutes = bar_minutes
+        self.states = {}
+        self.warmed = False
+
+    def _bar_start(self, timestamp):
+        return timestamp - timedelta(
+            minutes=timestamp.minute % self.bar_minutes,
+            seconds=timestamp.second,
+            microseconds=timestamp.microsecond
+        )
+
+    def _emit(self, coin, state, bar_start, close, results):
+        rsi, ema, sma = state.close_bar(close)
+        if None not in (rsi, ema, sma):
+            results.append({
+                "Timestamp": bar_start,
+                "Coin": coin,
+                "RSI": rsi,
+                "EMA": ema,
+                "SMA": sma
+            })
+
+    def update(self, rows):
+        """
+        Feed new rows to the engine.
+
+        Args:
+            rows: Iterable of (timestamp, coin, close) sorted by timestamp.
+
+        Returns:
+            list: One dict (Timestamp, Coin, RSI, EMA, SMA) per bar closed by these rows,
+                  once the look-back period of the coin is over.
+        """
+        results = []
+        bar_step = timedelta(minutes=self.bar_minutes)
+        for timestamp, coin, close in rows:
+            if close is None:
+                continue
+            close = float(close)
+            bar_start = self._bar_start(timestamp)
+            state = self.states.get(coin)
+            if state is None:
+                state = self.states[coin] = CoinIndicatorState(self.length)
+
+            if state.bar_start is None or bar_start == state.bar_start:
+                state.bar_start, state.bar_close = bar_start, close
+            elif bar_start > state.bar_start:
+                # Close the current bar, then the empty bars up to the new one
+                self._emit(coin, state, state.bar_start, state.bar_close, results)
+                gap_start = state.bar_start + bar_step
+                while gap_start < bar_start:
+                    self._emit(coin, state, gap_start, state.bar_close, results)
+                    gap_start += bar_step
+                state.bar_start, state.bar_close = bar_start, close
+            # Rows older than the current bar arrive too late and are ignored
+
+        return results
+
+    def snapshot(self):
+        """
+        Copy of the engine state, to be restored if the bars emitted afterwards could not be loaded.
+        """
+        return copy.deepcopy((self.states, self.warmed))
+
+    def restore(self, snapshot):
+        self.states, self.warmed = copy.deepcopy(snapshot)
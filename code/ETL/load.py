@@ -1,55 +1,233 @@
 from pyhive import hive
 import pandas as pd
-from datetime import datetime, timedelta
+import os
+import time
+import uuid
+from datetime import datetime, date, timedelta
+
+
+#===========================================bulk load helpers================================================================================
+
+# Maximum number of rows sent in a single INSERT ... VALUES statement
+MAX_ROWS_PER_INSERT = 1000
+
+
+def _format_file_value(value):
+    """
+    Format a value for a '\\001' delimited Hive text file.
+    """
+    if value is None or (isinstance(value, float) and value != value):
+        return "\\N"
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, date):
+        return value.strftime('%Y-%m-%d')
+    # Delimiters and line breaks cannot appear inside a field
+    return str(value).replace('\x01', ' ').replace('\n', ' ').replace('\r', ' ')
+
+
+def _format_sql_value(value):
+    """
+    Format a value as a HiveQL literal.
+    """
+    if value is None or (isinstance(value, float) and value != value):
+        return "NULL"
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    if isinstance(value, datetime):
+        value = value.strftime('%Y-%m-%d %H:%M:%S')
+    elif isinstance(value, date):
+        value = value.strftime('%Y-%m-%d')
+    elif not isinstance(value, str):
+        # Decimal and numpy scalars
+        try:
+            return str(float(value))
+        except (TypeError, ValueError):
+            value = str(value)
+    escaped = value.replace('\\', '\\\\').replace("'", "\\'")
+    return f"'{escaped}'"
+
+
+def _partition_value(value):
+    """
+    Date partition (yyyy-MM-dd) of a timestamp given as datetime or 'YYYY-MM-DD HH:MM:SS' string.
+    """
+    if isinstance(value, (datetime, date)):
+        return value.strftime('%Y-%m-%d')
+    return str(value)[:10]
+
+
+def bulk_load_to_hive(cursor, table, columns, rows, partition_column=None):
+    """
+    Load all the rows of a cycle into a Hive table with a fixed number of statements.
+
+    When a load directory shared with HiveServer2 is configured, the rows are written to one delimited
+    file, moved into a new partition of the table's staging table with LOAD DATA, copied to the table
+    with a single INSERT ... SELECT and the staging partition is dropped. Otherwise they are sent in
+    multi-row INSERT ... VALUES statements of up to MAX_ROWS_PER_INSERT rows.
+
+    Args:
+        cursor: Hive cursor.
+        table (str): Target table.
+        columns (list): Target columns, in the order of the table definition (see hive.py).
+        rows (list): List of tuples of values.
+        partition_column (str): For tables partitioned by date, the timestamp column giving the 'dt' partition.
+
+    Returns:
+        int: Number of rows loaded.
+    """
+    if not rows:
+        return 0
+    start = time.perf_counter()
+    column_list = ", ".join(columns)
+
+    if partition_column:
+        # Append the date partition of each row as its last value
+        partition_index = columns.index(partition_column)
+        rows = [tuple(row) + (_partition_value(row[partition_index]),) for row in rows]
+        cursor.execute("SET hive.exec.dynamic.partition = true")
+        cursor.execute("SET hive.exec.dynamic.partition.mode = nonstrict")
+
+    # Directory where the load file is written, and the same directory as seen by HiveServer2
+    # (e.g. a volume mounted in the hive-server container)
+    load_dir = os.getenv('hive_load_dir')
+    server_load_dir = os.getenv('hive_server_load_dir') or load_dir
+
+    if load_dir:
+        batch = f"{datetime.now().strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        file_name = f"{table}_{batch}.txt"
+        local_path = os.path.join(load_dir, file_name)
+        server_path = f"{server_load_dir.rstrip('/')}/{file_name}"
+
+        with open(local_path, 'w', encoding='utf-8') as load_file:
+            for row in rows:
+                load_file.write('\x01'.join(_format_file_value(value) for value in row) + '\n')
+        try:
+            cursor.execute(
+                f"LOAD DATA LOCAL INPATH '{server_path}' INTO TABLE {table}_staging PARTITION (load_batch='{batch}')"
+            )
+            if partition_column:
+                # Each row goes to the partition of its date (dynamic partitioning)
+                cursor.execute(
+                    f"INSERT INTO TABLE {table} PARTITION (dt) "
+                    f"SELECT {column_list}, dt FROM {table}_staging WHERE load_batch = '{batch}'"
+                )
+            else:
+                cursor.execute(
+                    f"INSERT INTO TABLE {table} ({column_list}) "
+                    f"SELECT {column_list} FROM {table}_staging WHERE load_batch = '{batch}'"
+                )
+            cursor.execute(f"ALTER TABLE {table}_staging DROP IF EXISTS PARTITION (load_batch='{batch}')")
+        finally:
+            if os.path.exists(local_path):
+                os.remove(local_path)
+    else:
+        for chunk_start in range(0, len(rows), MAX_ROWS_PER_INSERT):
+            chunk = rows[chunk_start:chunk_start + MAX_ROWS_PER_INSERT]
+            values = ",\n".join(
+                "(" + ", ".join(_format_sql_value(value) for value in row) + ")" for row in chunk
+            )
+            if partition_column:
+                cursor.execute(f"INSERT INTO TABLE {table} PARTITION (dt) VALUES {values}")
+            else:
+                cursor.execute(f"INSERT INTO {table} ({column_list}) VALUES {values}")
+
+    elapsed = time.perf_counter() - start
+    rate = len(rows) / elapsed if elapsed > 0 else float('inf')
+    print(f"Loaded {len(rows)} rows into {table} in {elapsed:.2f}s ({rate:.0f} rows/sec).")
+    return len(rows)
+
+
+def _columns(cursor, table):
+    """
+    Columns of a Hive table in the order of its definition, without the partition column.
+    """
+    cursor.execute(f"DESCRIBE {table}")
+    columns = []
+    for row in cursor.fetchall():
+        name = (row[0] or "").strip()
+        # The partition columns are listed again after an empty line and '# Partition Information'
+        if not name or name.startswith("#"):
+            break
+        if name != "dt":
+            columns.append(name)
+    return columns
+
+
+def delete_time_range_from_hive(cursor, table, start, end, time_column="ts"):
+    """
+    Remove the rows of a date-partitioned table whose 'time_column' is in [start, end) (datetimes), e.g. before a
+    backfill loads that time range again. The tables are not transactional (no DELETE): the 'dt'
+    partitions of the range are rewritten without those rows.
+
+    Returns:
+        bool: False if the rows could not be removed.
+    """
+    if cursor is None:
+        print("Error: No connection to Hive.")
+        return False
+    try:
+        column_list = ", ".join(_columns(cursor, table))
+        lower, upper = _format_sql_value(start), _format_sql_value(end)
+        day, last_day = start.date(), (end - timedelta(microseconds=1)).date()
+        while day <= last_day:
+            partition = day.strftime('%Y-%m-%d')
+            cursor.execute(
+                f"INSERT OVERWRITE TABLE {table} PARTITION (dt='{partition}') "
+                f"SELECT {column_list} FROM {table} WHERE dt = '{partition}' "
+                f"AND NOT ({time_column} >= {lower} AND {time_column} < {upper})"
+            )
+            day += timedelta(days=1)
+        return True
+    except Exception as e:
+        print(f"Error while deleting {start} - {end} from {table} in Hive: {e}")
+        return False
 
 
 #===========================================load sentiment================================================================================
 def insert_sentiment_data_to_hive(sentiment_results,cursor):
     """
     Inserts sentiment analysis results into Hive.
-    :param data: List of tuples containing (timestamp, content).
+    :param data: List of dictionaries with keys: timestamp, score, sentiment.
     """
     # Connect to Hive
     if cursor is None:
         print("Error: No connection to Hive.")
-        return
+        return False
     else:
         print("Connected to Hive.")
     try:
         # Insert sentiment results into the Hive table
-        for record in sentiment_results:
-            timestamp = record['timestamp']
-            score = record['score']
-            sentiment = record['sentiment']
-            
-            query = f"""
-            INSERT INTO sentiment_dim
-            VALUES ('{timestamp}', {score}, '{sentiment}')
-            """
-            cursor.execute(query)
+        rows = [(record['timestamp'], record['score'], record['sentiment']) for record in sentiment_results]
+        bulk_load_to_hive(cursor, "sentiment_dim", ["ts", "sentiment_score", "sentiment"], rows, partition_column="ts")
         print("Sentiment data successfully inserted into Hive.")
+        return True
     except Exception as e:
         print(f"Error while inserting sentiment data into Hive")
+        return False
 
 #===========================================load correlations================================================================================
 def insert_correlation_data_to_hive(data,cursor):
-        
+
         if cursor is None:
             print("Error: No connection to Hive.")
-            return
+            return False
         else:
             print("Connected to Hive.")
         try:
-            for record in data:
-                query = f"""
-                INSERT INTO correlations_dim (ts, gold_price, interest_rate, stocks_price)
-                VALUES ('{record['time_stamp']}', {record['goldprice']}, {record['intersrate']}, {record['stocke']})
-                """
-                cursor.execute(query)
-            
+            rows = [
+                (record['time_stamp'], record['goldprice'], record['intersrate'], record['stocke'])
+                for record in data
+            ]
+            bulk_load_to_hive(
+                cursor, "correlations_dim", ["ts", "gold_price", "interest_rate", "stocks_price"], rows, partition_column="ts"
+            )
+
             print(f"Inserted {len(data)} records into Hive.")
+            return True
         except Exception as e:
             print("Error inserting correlation data into Hive")
+            return False
 
 #===========================================load coins data to cryoto dim================================================================================
 def insert_coins_data_to_hive(data,cursor):
@@ -59,27 +237,28 @@ def insert_coins_data_to_hive(data,cursor):
     """
     if cursor is None:
         print("Error: No connection to Hive.")
-        return
+        return False
     else:
         print("Connected to Hive.")
     try:
-        for record in data:
-
-            query = f"""
-            INSERT INTO crypto_dim (ts, coin, open, high, low, close, volume, 
-                                    market_cap, price_change, price_change_perc, 
-                                    market_cap_change, market_cap_change_perc)
-            VALUES (
-                '{record['time_stamp']}', '{record['coin']}', {record['open']}, {record['high']}, {record['low']},
-                {record['close']}, {record['volume']}, {record['market_cap']}, {record['price_change']},
-                {record['price_change_percentage']}, {record['market_cap_change']}, {record['market_cap_change_percentage']}
+        columns = ["ts", "coin", "open", "close", "high", "low", "volume",
+                   "market_cap", "price_change", "price_change_perc",
+                   "market_cap_change", "market_cap_change_perc"]
+        rows = [
+            (
+                record['time_stamp'], record['coin'], record['open'], record['close'], record['high'],
+                record['low'], record['volume'], record['market_cap'], record['price_change'],
+                record['price_change_percentage'], record['market_cap_change'], record['market_cap_change_percentage']
             )
-            """
-            cursor.execute(query)
+            for record in data
+        ]
+        bulk_load_to_hive(cursor, "crypto_dim", columns, rows, partition_column="ts")
         print("Data insertion into Hive completed.")
+        return True
 
     except Exception as e:
         print(f"An unexpected error occurred while inserting to Hive")
+        return False
 
 #===========================================load technicals indicator ================================================================================
 
@@ -87,28 +266,25 @@ def insert_technical_indicators_to_hive(dataframe,cursor):
 
     if cursor is None:
         print("Error: No connection to Hive.")
-        return
-    else:    
+        return False
+    else:
         print("Connected to Hive.")
     try:
-        # Counter for successful inserts
-        successful_inserts = 0
-        # Iterate over the dataframe and insert data into the table
-        for _, row in dataframe.iterrows():
-            query = f"""
-            INSERT INTO technical_indicators (ts, coin, rsi, sma, ema)
-            VALUES ('{row['Timestamp']}', '{row['Coin']}', {row['RSI']}, {row['SMA']}, {row['EMA']})
-            """
-            cursor.execute(query)
-            # Increment successful insert counter, but do not print each success
-            successful_inserts += 1
-        # Commit the transaction and close the connection
-        
+        rows = [
+            (row.Timestamp, row.Coin, float(row.RSI), float(row.SMA), float(row.EMA))
+            for row in dataframe.itertuples(index=False)
+        ]
+        successful_inserts = bulk_load_to_hive(
+            cursor, "technical_indicators", ["ts", "coin", "rsi", "sma", "ema"], rows, partition_column="ts"
+        )
+
         # Print summary of the insert process
         print(f"Successfully inserted {successful_inserts} rows into the technical_indicators table.")
-        
+        return True
+
     except Exception as e:
         print("Error while inserting to Hive")
+        return False
 
 
 
@@ -119,34 +295,25 @@ def insert_results_into_fact_table(results,cursor):
 
     if cursor is None:
         print("Error: No connection to Hive.")
-        return  
+        return False
     else:
         print("Connected to Hive.")
     try:
         # Table name
         table_name = "fact_table"
-        # Insert each row into the Hive table
-        for row in results:
-            # Ensure the keys in the dictionary match the table's schema
-            keys = ["ts", "coin", "price", "dominance", "exchangerate"]
-            
-            # Format the timestamp correctly for Hive
-            timestamp = row.get("timestamp").strftime('%Y-%m-%d %H:%M:%S') if row.get("timestamp") else None
-            values = [timestamp, row.get("coin"), row.get("close_price"), row.get("dominance"), row.get("exchange_rate")]
-            
-            # Format values for SQL query
-            formatted_values = ", ".join(
-                f"'{v}'" if isinstance(v, str) else "NULL" if v is None else str(v)
-                for v in values
-            )
-            query = f"INSERT INTO {table_name} ({', '.join(keys)}) VALUES ({formatted_values})"
-
-            cursor.execute(query)
+        # Ensure the keys in the dictionary match the table's schema
+        keys = ["ts", "coin", "price", "dominance", "exchangerate"]
+        rows = [
+            (row.get("timestamp"), row.get("coin"), row.get("close_price"), row.get("dominance"), row.get("exchange_rate"))
+            for row in results
+        ]
+        bulk_load_to_hive(cursor, table_name, keys, rows, partition_column="ts")
         print(f"Inserted {len(results)} records into the fact table.")
-        # Close the connection
+        return True
 
     except Exception as e:
         print(f"Error while inserting  to Hive")
+        return False
 
 
 
@@ -157,34 +324,24 @@ def insert_metadata_into_hive(crypto_metadata,cursor):
 
     if cursor is None:
         print("Error: No connection to Hive.")
-        return  
-    else:    
-        print("Connected to Hive.") 
+        return False
+    else:
+        print("Connected to Hive.")
     try:
-        # Prepare the insert statement
-        insert_statement = """
-            INSERT INTO crypto_info (symbol, launch_date, ath_price, ath_date, total_supply)
-            VALUES (%s, %s, %s, %s, %s)
-        """
-
-        # Loop through the data and insert each record into the table
+        rows = []
         for record in crypto_metadata:
             # Convert string date to date type
             launch_date = datetime.strptime(record['launch_date'], '%Y-%m-%d').date()
             ath_date = datetime.strptime(record['ath_date'], '%Y-%m-%d').date()
+            rows.append((record['symbol'], launch_date, record['ath_price'], ath_date, record['total_supply']))
 
-            # Execute the insert statement
-            cursor.execute(insert_statement, (
-                record['symbol'], 
-                launch_date, 
-                record['ath_price'], 
-                ath_date, 
-                record['total_supply']
-            ))
+        bulk_load_to_hive(cursor, "crypto_info", ["symbol", "launch_date", "ath_price", "ath_date", "total_supply"], rows)
         print(f"{len(crypto_metadata)} records inserted into crypto_info table in Hive.")
+        return True
 
     except Exception as e:
         print("Error inserting metadata into Hive")
+        return False
 
 #===========================================load block chain data ================================================================================
 
@@ -193,28 +350,22 @@ def insert_blockchain_info_into_hive(blockchain_info_data,cursor):
     # Connect to the Hive server
     if cursor is None:
         print("Error: No connection to Hive.")
-        return  
+        return False
     else:
         print("Connected to Hive.")
     try:
-        for row in blockchain_info_data:
-        # Prepare the insert statement
-            insert_statement = """
-                INSERT INTO blockchain_info (ts, symbol, hashrate, pts, total_trans)
-                VALUES (%s, %s, %s, %s, %s)
-            """
-
-            # Execute the insert statement using the data from blockchain_info_data
-            cursor.execute(insert_statement, (
-                row['timestamp'], 
-                row['symbol'], 
-                row['hashrate'], 
-                row['pts'], 
-                row['total_trans']
-            ))
+        rows = [
+            (row['timestamp'], row['symbol'], row['hashrate'], row['pts'], row['total_trans'])
+            for row in blockchain_info_data
+        ]
+        bulk_load_to_hive(
+            cursor, "blockchain_info", ["ts", "symbol", "hashrate", "pts", "total_trans"], rows, partition_column="ts"
+        )
         print(f"{len(blockchain_info_data)} lines inserted into blockchain_info table in hive data warehouse")
+        return True
     except:
         print("Error inserting blockchain data into Hive")
+        return False
 
 #===========================================load datetime data ================================================================================
 
@@ -227,16 +378,10 @@ def insert_date_dimensions_to_hive(date_dimensions,cursor):
     """
     if cursor is None:
         print("Error: No connection to Hive.")
-        return  
+        return False
     else:
         print("Connected to Hive.")
     try:
-        # Prepare the INSERT INTO statement
-        insert_query = """
-            INSERT INTO TABLE date_dim
-            (ts, day, month, year, hour, day_of_week, week)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-        """
         # Extract values from the date_dimensions dictionary
         values = (
             date_dimensions['timestamp'],
@@ -248,10 +393,12 @@ def insert_date_dimensions_to_hive(date_dimensions,cursor):
             date_dimensions['week']
         )
 
-        # Execute the insert query
-        cursor.execute(insert_query, values)
-        # Commit and close the connection
+        bulk_load_to_hive(
+            cursor, "date_dim", ["ts", "day", "month", "year", "hour", "day_of_week", "week"], [values], partition_column="ts"
+        )
         print("Date dimensions successfully inserted into Hive.")
+        return True
 
     except Exception as e:
         print(f"Error inserting date dimensions into Hive")
+        return False
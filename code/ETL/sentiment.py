@@ -0,0 +1,149 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import nltk
+from nltk.sentiment import SentimentIntensityAnalyzer
+
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Local directory of the NLTK data ('nltk_data_dir' in .env overrides it)
+DEFAULT_NLTK_DATA_DIR = os.path.join(current_dir, 'nltk_data')
+
+
+def load_analyzer(data_dir=None):
+    """
+    Build a VADER analyzer from the lexicon of the local NLTK data directory,
+    downloading the lexicon there only if it is missing.
+    """
+    data_dir = data_dir or os.getenv('nltk_data_dir', DEFAULT_NLTK_DATA_DIR)
+    if data_dir not in nltk.data.path:
+        nltk.data.path.insert(0, data_dir)
+    try:
+        nltk.data.find('sentiment/vader_lexicon.zip')
+    except LookupError:
+        nltk.download('vader_lexicon', download_dir=data_dir, quiet=True)
+    return SentimentIntensityAnalyzer()
+
+
+def label_sentiment(compound_score):
+    # Déterminer le sentiment basé sur le score 'compound'
+    if compound_score >= 0.5:
+        return 'positive'
+    elif compound_score <= -0.5:
+        return 'negative'
+    return 'neutral'
+
+
+#=======================================process pool workers========================================================
+
+_worker_analyzer = None
+
+
+def _init_worker(data_dir):
+    global _worker_analyzer
+    _worker_analyzer = load_analyzer(data_dir)
+
+
+def _score_chunk(texts):
+    return [_worker_analyzer.polarity_scores(text)['compound'] for text in texts]
+
+
+#=======================================scorer========================================================
+
+class SentimentScorer:
+    """
+    Long-lived sentiment scorer of the ETL.
+
+    The lexicon is loaded once, when the scorer is created, instead of every cycle; compound scores are
+    memoized by content hash in a bounded LRU so a text seen before is never scored again; and large
+    batches (backfills) can be scored across a process pool.
+    """
+
+    def __init__(self, cache_size=100000, data_dir=None):
+        """
+        Args:
+            cache_size (int): Maximum number of scores kept in memory.
+            data_dir (str): NLTK data directory holding the VADER lexicon.
+        """
+        self.data_dir = data_dir or os.getenv('nltk_data_dir', DEFAULT_NLTK_DATA_DIR)
+        self.analyzer = load_analyzer(self.data_dir)
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _key(text):
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+    def _lookup(self, key):
+        with self.lock:
+            score = self.cache.get(key)
+            if score is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.cache.move_to_end(key)
+            return score
+
+    def _store(self, key, score):
+        with self.lock:
+            self.cache[key] = score
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+    def score(self, text):
+        """
+        Compound score of one text.
+        """
+        key = self._key(text)
+        score = self._lookup(key)
+        if score is None:
+            score = self.analyzer.polarity_scores(text)['compound']
+            self._store(key, score)
+        return score
+
+    def score_batch(self, texts, processes=1, chunk_size=500):
+        """
+        Compound scores of a batch of texts, in order. The texts not in the cache are scored once
+        each, across 'processes' worker processes when there are more than 'chunk_size' of them.
+        """
+        keys = [self._key(text) for text in texts]
+        scores = [self._lookup(key) for key in keys]
+        missing = {}
+        for key, text, score in zip(keys, texts, scores):
+            if score is None and key not in missing:
+                missing[key] = text
+
+        if missing:
+            missing_texts = list(missing.values())
+            if processes > 1 and len(missing_texts) > chunk_size:
+                chunks = [missing_texts[i:i + chunk_size] for i in range(0, len(missing_texts), chunk_size)]
+                with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(self.data_dir,)) as executor:
+                    computed = [score for chunk in executor.map(_score_chunk, chunks) for score in chunk]
+            else:
+                computed = [self.analyzer.polarity_scores(text)['compound'] for text in missing_texts]
+            for key, score in zip(missing, computed):
+                self._store(key, score)
+            computed = dict(zip(missing, computed))
+            scores = [computed[key] if score is None else score for key, score in zip(keys, scores)]
+        return scores
+
+
+_default_scorer = None
+_default_scorer_lock = threading.Lock()
+
+
+def default_scorer():
+    """
+    Scorer shared by the ETL cycles of the process, created on first use.
+    """
+    global _default_scorer
+    with _default_scorer_lock:
+        if _default_scorer is None:
+            _default_scorer = SentimentScorer()
+        return _default_scorer
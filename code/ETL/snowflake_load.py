@@ -0,0 +1,195 @@
+import csv
+import gzip
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from datetime import datetime, date
+
+
+#===========================================bulk load helpers================================================================================
+
+# Maximum number of rows written to one staged file
+MAX_ROWS_PER_FILE = 100000
+
+FILE_FORMAT = "(TYPE = CSV COMPRESSION = GZIP FIELD_OPTIONALLY_ENCLOSED_BY = '\"' NULL_IF = ('\\\\N'))"
+
+
+def _format_csv_value(value):
+    """
+    Format a value for a staged CSV file, NULL values are written as \\N.
+    """
+    if value is None or (isinstance(value, float) and value != value):
+        return "\\N"
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, date):
+        return value.strftime('%Y-%m-%d')
+    return value
+
+
+def write_stage_files(directory, table, rows, batch):
+    """
+    Write the rows of a table to gzip compressed CSV files of at most MAX_ROWS_PER_FILE rows.
+
+    Returns:
+        list: Paths of the files written, named <table>_<batch>_<n>.csv.gz.
+    """
+    paths = []
+    for file_index, chunk_start in enumerate(range(0, len(rows), MAX_ROWS_PER_FILE)):
+        path = os.path.join(directory, f"{table}_{batch}_{file_index:03d}.csv.gz")
+        with gzip.open(path, 'wt', encoding='utf-8', newline='') as stage_file:
+            writer = csv.writer(stage_file)
+            for row in rows[chunk_start:chunk_start + MAX_ROWS_PER_FILE]:
+                writer.writerow([_format_csv_value(value) for value in row])
+        paths.append(path)
+    return paths
+
+
+def bulk_load_to_snowflake(cursor, table, columns, rows):
+    """
+    Load all the rows of a cycle into a Snowflake table through its table stage.
+
+    The rows are written to compressed CSV files, uploaded with one PUT to the table stage (@%table)
+    and loaded with a single COPY INTO, which also purges the staged files.
+
+    Args:
+        cursor: Snowflake cursor.
+        table (str): Target table.
+        columns (list): Target columns, in the order of the values in each row.
+        rows (list): List of tuples of values.
+
+    Returns:
+        int: Number of rows loaded.
+    """
+    if not rows:
+        return 0
+    start = time.perf_counter()
+    batch = f"{datetime.now().strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:8]}"
+    directory = tempfile.mkdtemp(prefix=f"{table}_", dir=os.getenv('snowflake_load_dir'))
+    try:
+        paths = write_stage_files(directory, table, rows, batch)
+
+        # One PUT for all the files of the batch, already compressed
+        local_pattern = os.path.join(directory, f"{table}_{batch}_*.csv.gz").replace('\\', '/')
+        cursor.execute(f"PUT 'file://{local_pattern}' @%{table} AUTO_COMPRESS = FALSE OVERWRITE = TRUE")
+
+        file_names = ", ".join(f"'{os.path.basename(path)}'" for path in paths)
+        file_columns = ", ".join(f"${position}" for position in range(1, len(columns) + 1))
+        cursor.execute(
+            f"COPY INTO {table} ({', '.join(columns)}) FROM (SELECT {file_columns} FROM @%{table}) "
+            f"FILES = ({file_names}) FILE_FORMAT = {FILE_FORMAT} PURGE = TRUE"
+        )
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    elapsed = time.perf_counter() - start
+    rate = len(rows) / elapsed if elapsed > 0 else float('inf')
+    print(f"Loaded {len(rows)} rows into {table} in {elapsed:.2f}s ({rate:.0f} rows/sec).")
+    return len(rows)
+
+
+def _load(table, columns, rows, cursor):
+    if cursor is None:
+        print("Error: No connection to Snowflake.")
+        return False
+    try:
+        bulk_load_to_snowflake(cursor, table, columns, rows)
+        return True
+    except Exception as e:
+        print(f"Error while loading {table} into Snowflake: {e}")
+        return False
+
+
+def delete_time_range_from_snowflake(cursor, table, start, end):
+    """
+    Delete the rows of a table whose time column is in [start, end) (datetimes), e.g. before a backfill
+    loads that time range again. The time columns hold 'YYYY-MM-DD HH:MM:SS' strings, compared as such.
+
+    Returns:
+        bool: False if the rows could not be deleted.
+    """
+    if cursor is None:
+        print("Error: No connection to Snowflake.")
+        return False
+    time_column = "day" if table == "correlations_dim" else "timestamp"
+    try:
+        cursor.execute(
+            f"DELETE FROM {table} WHERE {time_column} >= %s AND {time_column} < %s",
+            (_format_csv_value(start), _format_csv_value(end))
+        )
+        return True
+    except Exception as e:
+        print(f"Error while deleting {start} - {end} from {table} in Snowflake: {e}")
+        return False
+
+
+#===========================================loaders================================================================================
+# Same inputs as the Hive loaders of load.py, mapped to the Snowflake schema created by snowflake.py
+
+def insert_sentiment_data_to_snowflake(sentiment_results, cursor):
+    rows = [(record['timestamp'], record['score']) for record in sentiment_results]
+    return _load("sentiment_dim", ["timestamp", "sentiment_score"], rows, cursor)
+
+
+def insert_correlation_data_to_snowflake(data, cursor):
+    rows = [
+        (record['time_stamp'], record['goldprice'], record['intersrate'], record['stocke'])
+        for record in data
+    ]
+    return _load("correlations_dim", ["day", "gold_price", "interest_rate", "stocks_price"], rows, cursor)
+
+
+def insert_coins_data_to_snowflake(data, cursor):
+    columns = ["timestamp", "symbol", "open", "close", "high", "volum", "market_cap",
+               "price_change", "price_change_perc", "market_cap_change", "market_cap_change_perc"]
+    rows = [
+        (
+            record['time_stamp'], record['coin'], record['open'], record['close'], record['high'],
+            record['volume'], record['market_cap'], record['price_change'], record['price_change_percentage'],
+            record['market_cap_change'], record['market_cap_change_percentage']
+        )
+        for record in data
+    ]
+    return _load("crypto_dim", columns, rows, cursor)
+
+
+def insert_technical_indicators_to_snowflake(dataframe, cursor):
+    rows = [
+        (row.Timestamp, row.Coin, float(row.RSI), float(row.SMA), float(row.EMA))
+        for row in dataframe.itertuples(index=False)
+    ]
+    return _load("technical_indicators", ["timestamp", "symbol", "rsi", "sma", "ema"], rows, cursor)
+
+
+def insert_results_into_snowflake_fact_table(results, cursor):
+    rows = [
+        (row.get("timestamp"), row.get("coin"), row.get("close_price"), row.get("dominance"), row.get("exchange_rate"))
+        for row in results
+    ]
+    return _load("fact_table", ["timestamp", "symbol", "price", "dominance", "exchangerate"], rows, cursor)
+
+
+def insert_metadata_into_snowflake(crypto_metadata, cursor):
+    rows = [
+        (record['symbol'], record['launch_date'], record['ath_price'], record['ath_date'], record['total_supply'])
+        for record in crypto_metadata
+    ]
+    return _load("crypto_info", ["symbol", "launch_date", "ath_price", "ath_date", "total_supply"], rows, cursor)
+
+
+def insert_blockchain_info_into_snowflake(blockchain_info_data, cursor):
+    rows = [
+        (row['timestamp'], row['symbol'], row['hashrate'], row['pts'], row['total_trans'])
+        for row in blockchain_info_data
+    ]
+    return _load("blockchain_info", ["timestamp", "symbol", "hashrate", "pts", "total_trans"], rows, cursor)
+
+
+def insert_date_dimensions_to_snowflake(date_dimensions, cursor):
+    rows = [(
+        date_dimensions['timestamp'], date_dimensions['day'], date_dimensions['month'], date_dimensions['year'],
+        date_dimensions['hour'], date_dimensions['day_of_week'], date_dimensions['week']
+    )]
+    return _load("date_dim", ["timestamp", "day", "month", "year", "hour", "day_of_week", "week"], rows, cursor)
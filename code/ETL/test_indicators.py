@@ -0,0 +1,128 @@
+import random
+import unittest
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from indicators import IndicatorEngine
+
+
+LENGTH = 4
+BAR_MINUTES = 4
+
+
+def synthetic_rows(seed=7, minutes=600):
+    """
+    (timestamp, coin, close) rows of two coins, a few per minute, with minutes and whole bars missing.
+    """
+    generator = random.Random(seed)
+    start = datetime(2026, 1, 1)
+    prices = {"BTC": 40000.0, "ETH": 2500.0}
+    rows = []
+    for minute in range(minutes):
+        # Gaps of several bars, and single missing minutes
+        if 100 <= minute < 130 or 400 <= minute < 409 or generator.random() < 0.15:
+            continue
+        for second in sorted(generator.sample(range(60), 3)):
+            for coin in prices:
+                prices[coin] *= 1 + generator.gauss(0, 0.002)
+                rows.append((start + timedelta(minutes=minute, seconds=second), coin, prices[coin]))
+    return rows
+
+
+def minute_bars(rows):
+    # Close of each minute, as stored in crypto_ohlcv_1m
+    closes = {}
+    for timestamp, coin, close in rows:
+        closes[(timestamp.replace(second=0, microsecond=0), coin)] = close
+    return [(minute, coin, close) for (minute, coin), close in sorted(closes.items())]
+
+
+def pandas_ta_indicators(rows):
+    """
+    RSI / EMA / SMA of the 4-minute bars with the formulas of pandas_ta (rsi, ema, sma with their defaults).
+    """
+    frame = pd.DataFrame(rows, columns=["Timestamp", "Coin", "Close"])
+    indicators = []
+    for coin, coin_rows in frame.groupby("Coin"):
+        bars = coin_rows.set_index("Timestamp")["Close"].resample(f"{BAR_MINUTES}min").last().ffill()
+        # The last bar is still open
+        close = bars.iloc[:-1]
+
+        sma = close.rolling(LENGTH).mean()
+
+        ema_input = close.copy()
+        ema_input.iloc[:LENGTH - 1] = float("nan")
+        ema_input.iloc[LENGTH - 1] = close.iloc[:LENGTH].mean()
+        ema = ema_input.ewm(span=LENGTH, adjust=False).mean()
+
+        change = close.diff(1)
+        gains = change.clip(lower=0).ewm(alpha=1 / LENGTH, min_periods=LENGTH).mean()
+        losses = (-change).clip(lower=0).ewm(alpha=1 / LENGTH, min_periods=LENGTH).mean()
+        rsi = 100 * gains / (gains + losses)
+
+        coin_indicators = pd.DataFrame({"Coin": coin, "RSI": rsi, "EMA": ema, "SMA": sma}).dropna()
+        indicators.append(coin_indicators.rename_axis("Timestamp").reset_index())
+    return pd.concat(indicators)
+
+
+def sorted_frame(results):
+    frame = pd.DataFrame(results, columns=["Timestamp", "Coin", "RSI", "EMA", "SMA"])
+    frame["Timestamp"] = pd.to_datetime(frame["Timestamp"])
+    return frame.sort_values(["Coin", "Timestamp"]).reset_index(drop=True)
+
+
+class IndicatorEngineTest(unittest.TestCase):
+    """
+    Incremental indicators of indicators.py against one pass and against the pandas_ta formulas.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.rows = synthetic_rows()
+        cls.one_pass = sorted_frame(IndicatorEngine(LENGTH, BAR_MINUTES).update(cls.rows))
+
+    def test_incremental_feed_matches_one_pass(self):
+        engine = IndicatorEngine(LENGTH, BAR_MINUTES)
+        results = []
+        position = 0
+        for batch, size in enumerate([1, 7, 50, 333, 2, 1000, 90, 10 ** 6]):
+            rows = self.rows[position:position + size]
+            if batch % 2:
+                # A failed load: the engine is restored and the same rows are fed again
+                snapshot = engine.snapshot()
+                engine.update(rows)
+                engine.restore(snapshot)
+            results += engine.update(rows)
+            position += size
+
+        pd.testing.assert_frame_equal(sorted_frame(results), self.one_pass)
+
+    def test_warm_up_on_minute_bars_matches_one_pass(self):
+        # Warm-up on the 1 minute bars before a row in the middle of a minute, plus the rows of that
+        # minute up to it, then the following rows fed incrementally. The row is the last of its bar,
+        # so the bar closes on the rows of the partial minute
+        engine = IndicatorEngine(LENGTH, BAR_MINUTES)
+        split = next(
+            position for position in range(len(self.rows) // 2, len(self.rows))
+            if engine._bar_start(self.rows[position - 1][0]) != engine._bar_start(self.rows[position][0])
+        )
+        boundary_minute = self.rows[split - 1][0].replace(second=0)
+        history = [row for row in self.rows[:split] if row[0] < boundary_minute]
+        partial_minute = [row for row in self.rows[:split] if row[0] >= boundary_minute]
+        self.assertTrue(partial_minute)
+
+        warm_up_results = engine.update(minute_bars(history) + partial_minute)
+        results = engine.update(self.rows[split:])
+
+        self.assertEqual(len(warm_up_results) + len(results), len(self.one_pass))
+        pd.testing.assert_frame_equal(sorted_frame(warm_up_results + results), self.one_pass)
+
+    def test_one_pass_matches_pandas_ta_formulas(self):
+        expected = sorted_frame(pandas_ta_indicators(self.rows).to_dict("records"))
+        self.assertEqual(len(self.one_pass), len(expected))
+        pd.testing.assert_frame_equal(self.one_pass, expected, check_exact=False, rtol=1e-9)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+import snowflake_load
+from fake_snowflake import FakeSnowflakeConnection
+from snowflake_load import bulk_load_to_snowflake, delete_time_range_from_snowflake, insert_sentiment_data_to_snowflake
+
+
+class SnowflakeBulkLoadTest(unittest.TestCase):
+    """
+    Bulk load of snowflake_load.py against the offline FakeSnowflakeConnection.
+    """
+
+    def setUp(self):
+        self.stage_dir = tempfile.mkdtemp(prefix="fake_snowflake_test_")
+        self.connection = FakeSnowflakeConnection(stage_dir=self.stage_dir)
+        self.cursor = self.connection.cursor()
+
+    def tearDown(self):
+        shutil.rmtree(self.stage_dir, ignore_errors=True)
+
+    def test_one_put_and_one_copy_per_load(self):
+        rows = [(f"2026-01-01 00:{minute:02d}:00", "BTC", 100.0 + minute, None) for minute in range(25)]
+        with mock.patch.object(snowflake_load, "MAX_ROWS_PER_FILE", 10):
+            loaded = bulk_load_to_snowflake(self.cursor, "fact_table", ["timestamp", "symbol", "price", "dominance"], rows)
+
+        self.assertEqual(loaded, 25)
+        # 25 rows in files of 10 rows: 3 files, uploaded with one PUT and loaded with one COPY INTO
+        self.assertEqual(len(self.connection.statements), 2)
+        self.assertEqual(len(self.connection.puts), 1)
+        table, put_files = self.connection.puts[0]
+        self.assertEqual(table, "fact_table")
+        self.assertEqual(len(put_files), 3)
+        self.assertEqual(self.connection.copies, [("fact_table", put_files, 25)])
+        # The staged files are purged by the COPY INTO
+        self.assertEqual(self.connection.staged_files("fact_table"), [])
+
+        loaded_rows = self.connection.tables["fact_table"]
+        self.assertEqual(len(loaded_rows), 25)
+        self.assertEqual(loaded_rows[0], {"timestamp": "2026-01-01 00:00:00", "symbol": "BTC", "price": "100.0", "dominance": None})
+
+    def test_no_statement_without_rows(self):
+        self.assertEqual(bulk_load_to_snowflake(self.cursor, "fact_table", ["timestamp"], []), 0)
+        self.assertEqual(self.connection.statements, [])
+
+    def test_delete_time_range_before_loading_again(self):
+        start = datetime(2026, 1, 1)
+        records = [{"timestamp": start + timedelta(hours=hour), "score": 0.5} for hour in range(12)]
+        self.assertTrue(insert_sentiment_data_to_snowflake(records, self.cursor))
+
+        # A backfill chunk [06:00, 12:00) loaded again replaces its rows
+        self.assertTrue(delete_time_range_from_snowflake(self.cursor, "sentiment_dim", start + timedelta(hours=6), start + timedelta(hours=12)))
+        self.assertEqual(self.cursor.rowcount, 6)
+        self.assertTrue(insert_sentiment_data_to_snowflake(records[6:], self.cursor))
+
+        timestamps = sorted(row["timestamp"] for row in self.connection.tables["sentiment_dim"])
+        self.assertEqual(timestamps, [f"2026-01-01 {hour:02d}:00:00" for hour in range(12)])
+
+
+if __name__ == "__main__":
+    unittest.main()
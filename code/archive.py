@@ -0,0 +1,175 @@
+import decimal
+import os
+from datetime import datetime, time, timedelta
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from mysql.connector import FieldType
+
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Root of the Parquet archive ('staging_archive_dir' in .env overrides it)
+DEFAULT_ARCHIVE_DIR = os.path.join(current_dir, 'staging_archive')
+
+# Rows fetched from MySQL at a time and rows per Parquet row group (the unit skipped by the coin statistics)
+FETCH_SIZE = 50000
+ROW_GROUP_SIZE = 100000
+
+# Directory partitions of a table: <archive dir>/<table>/date=YYYY-MM-DD/hour=HH/
+PARTITIONING = ds.partitioning(pa.schema([("date", pa.string()), ("hour", pa.int32())]), flavor="hive")
+
+ARROW_TYPES = {
+    FieldType.DECIMAL: pa.float64(), FieldType.NEWDECIMAL: pa.float64(),
+    FieldType.FLOAT: pa.float64(), FieldType.DOUBLE: pa.float64(),
+    FieldType.TINY: pa.int64(), FieldType.SHORT: pa.int64(), FieldType.INT24: pa.int64(),
+    FieldType.LONG: pa.int64(), FieldType.LONGLONG: pa.int64(),
+    FieldType.TIMESTAMP: pa.timestamp("us"), FieldType.DATETIME: pa.timestamp("us"),
+    FieldType.DATE: pa.date32()
+}
+
+
+def archive_dir():
+    return os.getenv('staging_archive_dir') or DEFAULT_ARCHIVE_DIR
+
+
+def _schema(description):
+    # Fixed types from the MySQL columns, so every file of a table has the same schema even when
+    # a column is empty for an hour (DECIMAL is archived as float64)
+    return pa.schema([(column[0], ARROW_TYPES.get(column[1], pa.string())) for column in description])
+
+
+def _convert(value):
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode("utf-8", errors="replace")
+    return value
+
+
+#=======================================archiver========================================================
+
+def archive_hour(cursor, table, start, directory=None):
+    """
+    Write the rows of a staging table created during one hour to a zstd-compressed Parquet file,
+    sorted by coin then time so the row group statistics let the reader skip the other coins.
+    The file is replaced if it exists, so archiving the same hour again is safe.
+
+    Args:
+        cursor: MySQL cursor on the staging database.
+        table (str): Staging table.
+        start (datetime): Start of the hour.
+
+    Returns:
+        int: Number of rows archived.
+    """
+    cursor.execute(
+        "SELECT COLUMN_NAME FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+        (table,)
+    )
+    order = "Coin, created_at, id" if "Coin" in {row[0] for row in cursor.fetchall()} else "created_at, id"
+    cursor.execute(
+        f"SELECT * FROM {table} WHERE created_at >= %s AND created_at < %s ORDER BY {order}",
+        (start, start + timedelta(hours=1))
+    )
+    schema = _schema(cursor.description)
+    hour_dir = os.path.join(directory or archive_dir(), table, f"date={start:%Y-%m-%d}", f"hour={start.hour}")
+    path = os.path.join(hour_dir, "part-0.parquet")
+    # Hidden until complete: the dataset reader skips the files starting with a dot
+    temporary_path = os.path.join(hour_dir, ".part-0.parquet.tmp")
+    writer, count = None, 0
+    try:
+        while True:
+            rows = cursor.fetchmany(FETCH_SIZE)
+            if not rows:
+                break
+            if writer is None:
+                os.makedirs(hour_dir, exist_ok=True)
+                writer = pq.ParquetWriter(temporary_path, schema, compression="zstd")
+            columns = [[_convert(row[i]) for row in rows] for i in range(len(schema))]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema), row_group_size=ROW_GROUP_SIZE)
+            count += len(rows)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is not None:
+        os.replace(temporary_path, path)
+    return count
+
+
+def archive_day(cursor, table, day, directory=None):
+    """
+    Archive the 24 hours of a day of a staging table, one Parquet file per hour.
+
+    Returns:
+        int: Number of rows archived.
+    """
+    start = datetime.combine(day, time())
+    return sum(archive_hour(cursor, table, start + timedelta(hours=hour), directory) for hour in range(24))
+
+
+def expired_days(cursor, table, retention_days):
+    """
+    Days of the rows of a table older than 'retention_days' days, for tables that are not partitioned.
+    """
+    cursor.execute(
+        f"SELECT DISTINCT DATE(created_at) FROM {table} WHERE created_at < CURDATE() - INTERVAL %s DAY ORDER BY 1",
+        (retention_days,)
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def delete_day(cursor, connection, table, day, chunk_size=10000):
+    """
+    Delete the rows of a day from a table that is not partitioned, in chunks committed one by one
+    so the deletes never hold long locks on the staging tables.
+    """
+    start = datetime.combine(day, time())
+    while True:
+        cursor.execute(
+            f"DELETE FROM {table} WHERE created_at >= %s AND created_at < %s LIMIT {chunk_size}",
+            (start, start + timedelta(days=1))
+        )
+        connection.commit()
+        if cursor.rowcount < chunk_size:
+            break
+
+
+#=======================================reader========================================================
+
+def read_archive(table, start, end, coins=None, columns=None, directory=None):
+    """
+    Read the archived rows of a table created in [start, end), as a DataFrame.
+
+    Filters are pushed down: the date directories outside the range are never opened, and the
+    time and coin predicates skip the row groups whose statistics exclude them.
+
+    Args:
+        table (str): Staging table.
+        start (datetime): First creation time.
+        end (datetime): Creation time after the last row.
+        coins (list): Coins to read (tables with a Coin column), all if None.
+        columns (list): Columns to read, all if None.
+
+    Returns:
+        DataFrame: The rows sorted by created_at (empty if nothing is archived).
+    """
+    table_dir = os.path.join(directory or archive_dir(), table)
+    if not os.path.isdir(table_dir):
+        return pd.DataFrame()
+    dataset = ds.dataset(table_dir, format="parquet", partitioning=PARTITIONING)
+    last_day = end - timedelta(microseconds=1)
+    expression = (
+        (ds.field("date") >= f"{start:%Y-%m-%d}") & (ds.field("date") <= f"{last_day:%Y-%m-%d}")
+        & (ds.field("created_at") >= pa.scalar(start, pa.timestamp("us")))
+        & (ds.field("created_at") < pa.scalar(end, pa.timestamp("us")))
+    )
+    if coins and "Coin" in dataset.schema.names:
+        expression &= ds.field("Coin").isin(list(coins))
+    if columns:
+        # created_at is needed to sort, the partition columns are not stored in the files
+        columns = list(dict.fromkeys(list(columns) + ["created_at"]))
+    else:
+        columns = [name for name in dataset.schema.names if name not in ("date", "hour")]
+    result = dataset.to_table(columns=columns, filter=expression).to_pandas()
+    return result.sort_values("created_at", kind="stable").reset_index(drop=True)
@@ -3,11 +3,156 @@ import os
 from dotenv import load_dotenv
 
 load_dotenv()
+
+# Partition column added to the time-based tables, holding the date (yyyy-MM-dd) of their 'ts' column
+PARTITION_COLUMN = "dt"
+
+# Data warehouse tables: columns, whether they are partitioned by date and the column they can be bucketed by
+HIVE_TABLES = {
+    "date_dim": {
+        "columns": """
+        ts TIMESTAMP,
+        day INT,
+        month INT,
+        year INT,
+        hour INT,
+        day_of_week STRING,
+        week INT
+    """,
+        "partitioned": True,
+        "bucket_by": None
+    },
+    "crypto_info": {
+        "columns": """
+        symbol STRING,
+        launch_date DATE,
+        ath_price FLOAT,
+        ath_date DATE,
+        total_supply BIGINT
+    """,
+        "partitioned": False,
+        "bucket_by": None
+    },
+    "blockchain_info": {
+        "columns": """
+        ts TIMESTAMP,
+        symbol STRING,
+        hashrate FLOAT,
+        pts INT,
+        total_trans BIGINT
+    """,
+        "partitioned": True,
+        "bucket_by": "symbol"
+    },
+    "technical_indicators": {
+        "columns": """
+        ts TIMESTAMP,
+        coin STRING,
+        rsi FLOAT,
+        sma FLOAT,
+        ema FLOAT
+    """,
+        "partitioned": True,
+        "bucket_by": "coin"
+    },
+    "correlations_dim": {
+        "columns": """
+        tS TIMESTAMP,
+        gold_price FLOAT,
+        interest_rate FLOAT,
+        stocks_price FLOAT
+    """,
+        "partitioned": True,
+        "bucket_by": None
+    },
+    "sentiment_dim": {
+        "columns": """
+        ts TIMESTAMP,
+        sentiment_score FLOAT,
+        sentiment STRING
+    """,
+        "partitioned": True,
+        "bucket_by": None
+    },
+    "fact_table": {
+        "columns": """
+        ts TIMESTAMP,
+        coin STRING,
+        price FLOAT,
+        dominance FLOAT,
+        exchangerate FLOAT
+    """,
+        "partitioned": True,
+        "bucket_by": "coin"
+    },
+    "crypto_dim": {
+        "columns": """
+        ts TIMESTAMP,
+        coin STRING,
+        open FLOAT,
+        close FLOAT,
+        high FLOAT,
+        low FLOAT,
+        volume FLOAT,
+        market_cap FLOAT,
+        price_change FLOAT,
+        price_change_perc FLOAT,
+        market_cap_change FLOAT,
+        market_cap_change_perc FLOAT
+    """,
+        "partitioned": True,
+        "bucket_by": "coin"
+    }
+}
+
+
+def create_table_query(table, definition, buckets=0, storage_format="ORC"):
+    """
+    CREATE TABLE statement of a data warehouse table.
+
+    Time-based tables are partitioned by date so queries filtering on 'dt' only read the partitions
+    of the requested days; with 'buckets' > 0 they are also clustered by coin inside each partition.
+    """
+    query = f"""
+            CREATE TABLE IF NOT EXISTS {table} ({definition["columns"]})
+            """
+    if definition["partitioned"]:
+        query += f"            PARTITIONED BY ({PARTITION_COLUMN} STRING)\n"
+    if buckets and definition["bucket_by"]:
+        query += f"            CLUSTERED BY ({definition['bucket_by']}) INTO {buckets} BUCKETS\n"
+    query += f"            STORED AS {storage_format}\n"
+    return query
+
+
+def create_staging_table_query(table, definition):
+    """
+    CREATE TABLE statement of the text staging table used to bulk load a data warehouse table.
+    Each load goes to its own 'load_batch' partition: the file of the batch is moved in with
+    LOAD DATA, copied to the target table with one INSERT ... SELECT, then the partition is dropped.
+    The date partition of partitioned tables is carried as a regular last column.
+    """
+    columns = definition["columns"].rstrip()
+    if definition["partitioned"]:
+        columns += f",\n        {PARTITION_COLUMN} STRING\n    "
+    return f"""
+            CREATE TABLE IF NOT EXISTS {table}_staging ({columns})
+            PARTITIONED BY (load_batch STRING)
+            ROW FORMAT DELIMITED FIELDS TERMINATED BY '\\001'
+            STORED AS TEXTFILE
+            """
+
+
 # Hive Connection and Schema Creation
 def create_hive_schema():
-    host=os.getenv('hive_host'),
-    port=os.getenv('hive_port'), 
-    database=os.getenv('hive_database')
+    """
+    Create the data warehouse tables (ORC, or the format given by 'hive_storage_format') and their staging
+    tables. Set 'hive_coin_buckets' to bucket the coin tables into that number of buckets.
+    """
+    buckets = int(os.getenv('hive_coin_buckets') or 0)
+    storage_format = os.getenv('hive_storage_format') or "ORC"
+    host = os.getenv('hive_host')
+    port = os.getenv('hive_port')
+    database = os.getenv('hive_database')
     username = os.getenv('hive_username')
 
     try:
@@ -17,85 +162,9 @@ def create_hive_schema():
 
         # Define Schema Creation Queries
         schema_queries = [
-            """
-            CREATE TABLE IF NOT EXISTS date_dim (
-                ts TIMESTAMP,
-                day INT,
-                month INT,
-                year INT,
-                hour INT,
-                day_of_week STRING,
-                week INT
-            )
-            """,
-            """
-            CREATE TABLE IF NOT EXISTS crypto_info (
-                symbol STRING,
-                launch_date DATE,
-                ath_price FLOAT,
-                ath_date DATE,
-                total_supply BIGINT
-            )
-            """,
-            """
-            CREATE TABLE IF NOT EXISTS blockchain_info (
-                ts TIMESTAMP,
-                symbol STRING,
-                hashrate FLOAT,
-                pts INT,
-                total_trans BIGINT
-            )
-            """,
-            """
-            CREATE TABLE IF NOT EXISTS technical_indicators (
-                ts TIMESTAMP,
-                coin STRING,
-                rsi FLOAT,
-                sma FLOAT,
-                ema FLOAT
-            )
-            """,
-            """
-            CREATE TABLE IF NOT EXISTS correlations_dim (
-                tS TIMESTAMP,
-                gold_price FLOAT,
-                interest_rate FLOAT,
-                stocks_price FLOAT
-            )
-            """,
-            """
-            CREATE TABLE IF NOT EXISTS sentiment_dim (
-                ts TIMESTAMP,
-                sentiment_score FLOAT,
-                sentiment STRING
-            )
-            """,
-            """
-            CREATE TABLE IF NOT EXISTS fact_table (
-                ts TIMESTAMP,
-                coin STRING,
-                price FLOAT,
-                dominance FLOAT,
-                exchangerate FLOAT
-            )
-            """,
-            """ 
-            CREATE TABLE IF NOT EXISTS crypto_dim (
-                ts TIMESTAMP,
-                coin STRING,
-                open FLOAT,
-                close FLOAT,
-                high FLOAT,
-                low FLOAT,
-                volume FLOAT,
-                market_cap FLOAT,
-                price_change FLOAT,
-                price_change_perc FLOAT,
-                market_cap_change FLOAT,
-                market_cap_change_perc FLOAT
-            )
-            """
+            create_table_query(table, definition, buckets, storage_format) for table, definition in HIVE_TABLES.items()
         ]
+        schema_queries += [create_staging_table_query(table, definition) for table, definition in HIVE_TABLES.items()]
 
         # Execute each query
         for query in schema_queries:
@@ -113,4 +182,4 @@ def create_hive_schema():
         print(f"Failed to connect or execute queries on Hive: {e}")
 
 if __name__ == "__main__":
-    create_hive_schema()
\ No newline at end of file
+    create_hive_schema()
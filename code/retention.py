@@ -0,0 +1,86 @@
+import json
+import os
+from datetime import datetime
+import mysql.connector
+from dotenv import load_dotenv
+from archive import archive_day, archive_dir, delete_day, expired_days
+from staging_schema import PARTITIONED_TABLES, add_future_partitions, drop_partition, expired_partitions, partition_day
+
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CHECKPOINT_PATH = os.path.join(current_dir, 'ETL', 'etl_checkpoints.json')
+
+# Days of staging rows kept ('staging_retention_days' in .env, '<table>_retention_days' per table),
+# longer than the 30 days of history read by the technical indicators
+DEFAULT_RETENTION_DAYS = 90
+
+# Staging tables that are not partitioned, whose expired rows are archived then deleted
+ARCHIVED_TABLES = ["GoldPrice", "InterestRate", "stocksPrices", "blockchain_statistics"]
+
+
+def retention_days(table):
+    return int(os.getenv(f'{table}_retention_days') or os.getenv('staging_retention_days') or DEFAULT_RETENTION_DAYS)
+
+
+def unloaded_since(table, checkpoint_path=None):
+    """
+    Creation time of the oldest staging row of a table that an ETL checkpoint has not moved yet,
+    the retention never drops rows newer than it. None if no warehouse table is fed from it by checkpoint.
+    """
+    checkpoint_path = checkpoint_path or os.getenv('etl_checkpoint_path', DEFAULT_CHECKPOINT_PATH)
+    try:
+        with open(checkpoint_path, 'r') as checkpoint_file:
+            checkpoints = json.load(checkpoint_file)
+    except (OSError, ValueError):
+        return None
+    loaded = [
+        datetime.strptime(checkpoint['last_created_at'], '%Y-%m-%d %H:%M:%S')
+        for checkpoint in checkpoints.values()
+        if checkpoint.get('table') == table and checkpoint.get('last_created_at')
+    ]
+    return min(loaded) if loaded else None
+
+
+def run_retention(cursor, connection):
+    """
+    Daily maintenance of the staging tables: create the partitions of the coming days, then move
+    the days older than the retention of each table to the Parquet archive, one day at a time
+    (a day is only dropped once archived, so an interrupted run resumes where it stopped).
+    """
+    for table in PARTITIONED_TABLES:
+        try:
+            added = add_future_partitions(cursor, table)
+            moved = []
+            for name in expired_partitions(cursor, table, retention_days(table), keep_after=unloaded_since(table)):
+                rows = archive_day(cursor, table, partition_day(name))
+                drop_partition(cursor, table, name)
+                moved.append(f"{name}: {rows} rows")
+            print(f"{table}: {added} partitions added, {len(moved)} expired partitions archived"
+                  + (f" ({', '.join(moved)})." if moved else "."))
+        except (mysql.connector.Error, OSError) as e:
+            print(f"Error during the retention of {table}: {e}")
+
+    for table in ARCHIVED_TABLES:
+        try:
+            for day in expired_days(cursor, table, retention_days(table)):
+                rows = archive_day(cursor, table, day)
+                delete_day(cursor, connection, table, day)
+                print(f"{table}: {rows} rows of {day} archived.")
+        except (mysql.connector.Error, OSError) as e:
+            print(f"Error during the retention of {table}: {e}")
+    print(f"Staging archive: {archive_dir()}")
+
+
+if __name__ == "__main__":
+    # Run once a day, e.g. from cron: 0 3 * * * cd CODE && python retention.py
+    load_dotenv()
+    connection = mysql.connector.connect(
+        host=os.getenv('SQLhost'),
+        user=os.getenv('SQLuser'),
+        password=os.getenv('SQLpassword'),
+        database=os.getenv('SQLdatabase')
+    )
+    cursor = connection.cursor()
+    run_retention(cursor, connection)
+    cursor.close()
+    connection.close()
@@ -1,6 +1,7 @@
 import mysql.connector
 import os
 from dotenv import load_dotenv
+from staging_schema import PARTITIONED_TABLES, ensure_indexes, partition_by_day
 
 # Establish connection to the MySQL database
 load_dotenv()
@@ -15,10 +16,11 @@ cursor = connection.cursor()
 # Corrected SQL query to create the table
 cursor.execute("""
 CREATE TABLE IF NOT EXISTS sentiment (
-    id INT AUTO_INCREMENT PRIMARY KEY,  -- Unique ID for each record
+    id INT AUTO_INCREMENT,  -- Unique ID for each record
     source TEXT,                -- Source (Twitter or NewsAPI)
     content TEXT,                      -- Content of the tweet or article
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP -- Time of insertion
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP, -- Time of insertion
+    PRIMARY KEY (id, created_at) -- created_at is the partitioning column
 );
 """)
 
@@ -26,7 +28,7 @@ CREATE TABLE IF NOT EXISTS sentiment (
 
 cursor.execute("""
     CREATE TABLE IF NOT EXISTS crypto_data (
-        id INT AUTO_INCREMENT PRIMARY KEY,
+        id INT AUTO_INCREMENT,
         Coin VARCHAR(50),
         Open DECIMAL(20, 8),
         High DECIMAL(20, 8),
@@ -34,18 +36,20 @@ cursor.execute("""
         Close DECIMAL(20, 8),
         Volume DECIMAL(20, 8),
         Market_Cap DECIMAL(30,10),
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (id, created_at)
     );
 """)
 
 
 cursor.execute("""
     CREATE TABLE IF NOT EXISTS dominance (
-        id INT AUTO_INCREMENT PRIMARY KEY,
+        id INT AUTO_INCREMENT,
         BTC_Dominance DECIMAL(5,2),  -- BTC dominance in percentage
         ETH_Dominance DECIMAL(5,2),  -- ETH dominance in percentage
         Altcoin_Dominance DECIMAL(5,2),  -- Altcoin dominance in percentage
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP -- Time of insertion
+        created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP, -- Time of insertion
+        PRIMARY KEY (id, created_at)
     );
 """)
 
@@ -113,16 +117,112 @@ CREATE TABLE IF NOT EXISTS blockchain_statistics (
 # Create ExchangeRate table
 cursor.execute("""
 CREATE TABLE IF NOT EXISTS ExchangeRate (
-    id INT AUTO_INCREMENT PRIMARY KEY,
+    id INT AUTO_INCREMENT,
     Timestamp DATETIME,
     name VARCHAR(50),
     unit VARCHAR(10),
     value DECIMAL(20, 8),
     type VARCHAR(50),
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP -- Time of insertion
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP, -- Time of insertion
+    PRIMARY KEY (id, created_at)
+);
+""")
+
+# Indexes matching the predicates of the ETL extracts and of the archiving of retention.py (InnoDB appends the primary key to each of them,
+# so the created_at indexes also serve ORDER BY created_at, id)
+STAGING_INDEXES = {
+    "sentiment": {"idx_sentiment_created_at": "created_at"},
+    "crypto_data": {"idx_crypto_coin_created_at": "Coin, created_at", "idx_crypto_created_at": "created_at"},
+    "dominance": {"idx_dominance_created_at": "created_at"},
+    "ExchangeRate": {"idx_exchange_timestamp": "Timestamp", "idx_exchange_created_at": "created_at"},
+    "GoldPrice": {"idx_gold_timestamp": "Timestamp", "idx_gold_created_at": "created_at"},
+    "InterestRate": {"idx_interest_timestamp": "Timestamp", "idx_interest_created_at": "created_at"},
+    "stocksPrices": {"idx_stocks_timestamp": "Timestamp", "idx_stocks_created_at": "created_at"},
+    "blockchain_statistics": {"idx_blockchain_coin_timestamp": "Coin, Timestamp",
+                              "idx_blockchain_created_at": "created_at"}
+}
+
+for table, indexes in STAGING_INDEXES.items():
+    ensure_indexes(cursor, table, indexes)
+for table in PARTITIONED_TABLES:
+    partition_by_day(cursor, table)
+
+# Create economic_rollup table: hourly and daily sums and counts of the mid prices ((open + close) / 2)
+# of the economic tables, kept up to date by the streaming ingestor in the transaction of the bars
+cursor.execute("""
+CREATE TABLE IF NOT EXISTS economic_rollup (
+    granularity VARCHAR(4) NOT NULL, -- 'hour' or 'day'
+    period_start DATETIME NOT NULL,
+    gold_sum DECIMAL(30, 8) NOT NULL DEFAULT 0,
+    gold_count INT NOT NULL DEFAULT 0,
+    interest_sum DECIMAL(30, 8) NOT NULL DEFAULT 0,
+    interest_count INT NOT NULL DEFAULT 0,
+    stock_sum DECIMAL(30, 8) NOT NULL DEFAULT 0,
+    stock_count INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (granularity, period_start)
 );
 """)
 
+# Build the rollup from the bars already stored (the totals are replaced, so running the script again is safe)
+for table, series in (("GoldPrice", "gold"), ("InterestRate", "interest"), ("stocksPrices", "stock")):
+    for granularity, period in (("hour", "DATE_FORMAT(Timestamp, '%Y-%m-%d %H:00:00')"), ("day", "DATE(Timestamp)")):
+        cursor.execute(f"""
+        INSERT INTO economic_rollup (granularity, period_start, {series}_sum, {series}_count)
+        SELECT '{granularity}', {period}, SUM((Open + Close) / 2), COUNT(*)
+        FROM {table}
+        WHERE Timestamp IS NOT NULL
+        GROUP BY {period}
+        ON DUPLICATE KEY UPDATE {series}_sum = VALUES({series}_sum), {series}_count = VALUES({series}_count);
+        """)
+connection.commit()
+
+# Create the OHLCV bar tables of the coins (1 minute, 1 hour, 1 day), merged with every batch of crypto_data
+# by the streaming ingestor: first_at / last_at are the times of the snapshots giving the open and the close
+OHLCV_RESOLUTIONS = {
+    "crypto_ohlcv_1m": "DATE_FORMAT(created_at, '%Y-%m-%d %H:%i:00')",
+    "crypto_ohlcv_1h": "DATE_FORMAT(created_at, '%Y-%m-%d %H:00:00')",
+    "crypto_ohlcv_1d": "DATE(created_at)"
+}
+for table, bucket in OHLCV_RESOLUTIONS.items():
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS {table} (
+        Coin VARCHAR(50) NOT NULL,
+        bar_start DATETIME NOT NULL,
+        Open DECIMAL(20, 8),
+        High DECIMAL(20, 8),
+        Low DECIMAL(20, 8),
+        Close DECIMAL(20, 8),
+        Volume DECIMAL(20, 8), -- day volume at the close of the bar
+        first_at DATETIME NOT NULL,
+        last_at DATETIME NOT NULL,
+        tick_count INT NOT NULL,
+        PRIMARY KEY (Coin, bar_start),
+        INDEX idx_{table}_bar_start (bar_start)
+    );
+    """)
+    # Build the bars of the rows already stored (replaced, so running the script again is safe)
+    cursor.execute(f"""
+    INSERT INTO {table} (Coin, bar_start, Open, High, Low, Close, Volume, first_at, last_at, tick_count)
+    SELECT Coin, bar_start, MAX(first_close), MAX(Close), MIN(Close), MAX(last_close), MAX(last_volume),
+           MIN(created_at), MAX(created_at), COUNT(*)
+    FROM (
+        SELECT Coin, Close, created_at, {bucket} AS bar_start,
+               FIRST_VALUE(Close) OVER w AS first_close,
+               LAST_VALUE(Close) OVER w AS last_close,
+               LAST_VALUE(Volume) OVER w AS last_volume
+        FROM crypto_data
+        WHERE Close IS NOT NULL
+        WINDOW w AS (PARTITION BY Coin, {bucket} ORDER BY created_at, id
+                     ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING)
+    ) snapshots
+    GROUP BY Coin, bar_start
+    ON DUPLICATE KEY UPDATE Open = VALUES(Open), High = VALUES(High), Low = VALUES(Low), Close = VALUES(Close),
+                            Volume = VALUES(Volume), first_at = VALUES(first_at), last_at = VALUES(last_at),
+                            tick_count = VALUES(tick_count);
+    """)
+connection.commit()
+
 print("Tables created successfully!")
 
 # Close the connection
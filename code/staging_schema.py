@@ -0,0 +1,141 @@
+from datetime import date, datetime, timedelta
+
+
+# High-volume staging tables, range-partitioned by day of created_at (expired days are dropped by retention.py)
+PARTITIONED_TABLES = ["crypto_data", "sentiment", "dominance", "ExchangeRate"]
+
+# Daily partitions created in advance, so rows never land in the catch-all partition
+# as long as the retention job runs at least once in that period
+PARTITIONS_AHEAD = 7
+
+
+#=======================================indexes========================================================
+
+def ensure_indexes(cursor, table, indexes):
+    """
+    Add the secondary indexes missing from a table (MySQL has no CREATE INDEX IF NOT EXISTS).
+
+    Args:
+        cursor: MySQL cursor on the staging database.
+        table (str): Table name.
+        indexes (dict): {index name: indexed columns, e.g. "Coin, created_at"}
+    """
+    cursor.execute(
+        "SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+        (table,)
+    )
+    existing = {row[0] for row in cursor.fetchall()}
+    for name, columns in indexes.items():
+        if name not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD INDEX {name} ({columns})")
+            print(f"Created index {name} on {table} ({columns}).")
+
+
+#=======================================daily partitions========================================================
+
+def partition_name(day):
+    return f"p{day:%Y%m%d}"
+
+
+def partition_day(name):
+    return datetime.strptime(name[1:], "%Y%m%d").date()
+
+
+def _day_partitions(first_day, last_day):
+    # One partition per day, holding the rows created before the next midnight
+    days = (last_day - first_day).days + 1
+    return [
+        f"PARTITION {partition_name(first_day + timedelta(days=i))} "
+        f"VALUES LESS THAN (UNIX_TIMESTAMP('{first_day + timedelta(days=i + 1):%Y-%m-%d} 00:00:00'))"
+        for i in range(max(days, 0))
+    ]
+
+
+def _existing_partitions(cursor, table):
+    cursor.execute(
+        """
+        SELECT PARTITION_NAME FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL
+        ORDER BY PARTITION_ORDINAL_POSITION
+        """,
+        (table,)
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def partition_by_day(cursor, table):
+    """
+    Range-partition a staging table by day of created_at, from its oldest row to PARTITIONS_AHEAD days
+    from now, plus a catch-all partition. Tables already partitioned are left as they are.
+
+    MySQL requires the partitioning column in every unique key, so the primary key of the table
+    must be (id, created_at); the extracts filtering on created_at then only read the partitions of
+    their time window, and expired days are dropped as whole partitions instead of row deletes.
+    """
+    if _existing_partitions(cursor, table):
+        return
+    cursor.execute(
+        """
+        SELECT COLUMN_NAME FROM information_schema.KEY_COLUMN_USAGE
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND CONSTRAINT_NAME = 'PRIMARY'
+        """,
+        (table,)
+    )
+    if "created_at" not in {row[0] for row in cursor.fetchall()}:
+        # Tables created before partitioning: the auto-increment id stays first in the key
+        cursor.execute(
+            f"ALTER TABLE {table} MODIFY created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP, "
+            f"DROP PRIMARY KEY, ADD PRIMARY KEY (id, created_at)"
+        )
+    cursor.execute(f"SELECT DATE(MIN(created_at)) FROM {table}")
+    first_day = cursor.fetchone()[0] or date.today()
+    partitions = _day_partitions(first_day, date.today() + timedelta(days=PARTITIONS_AHEAD))
+    partitions.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+    print(f"Partitioning {table} by day ({len(partitions) - 1} days)...")
+    cursor.execute(f"ALTER TABLE {table} PARTITION BY RANGE (UNIX_TIMESTAMP(created_at)) ({', '.join(partitions)})")
+
+
+def add_future_partitions(cursor, table, days_ahead=PARTITIONS_AHEAD):
+    """
+    Split the catch-all partition into the daily partitions of the next 'days_ahead' days.
+
+    Returns:
+        int: Number of partitions added.
+    """
+    days = [partition_day(name) for name in _existing_partitions(cursor, table) if name != "pmax"]
+    if not days:
+        print(f"{table} is not partitioned by day, run sql.py first.")
+        return 0
+    partitions = _day_partitions(max(days) + timedelta(days=1), date.today() + timedelta(days=days_ahead))
+    if partitions:
+        partitions.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+        cursor.execute(f"ALTER TABLE {table} REORGANIZE PARTITION pmax INTO ({', '.join(partitions)})")
+    return len(partitions) - 1 if partitions else 0
+
+
+def expired_partitions(cursor, table, retention_days, keep_after=None):
+    """
+    Daily partitions whose rows are all older than 'retention_days' days, oldest first.
+
+    Args:
+        keep_after (datetime): Never return partitions holding rows created after it,
+                               e.g. rows not yet moved to the warehouse.
+
+    Returns:
+        list: Partition names.
+    """
+    cursor.execute(
+        """
+        SELECT PARTITION_NAME, FROM_UNIXTIME(PARTITION_DESCRIPTION)
+        FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME <> 'pmax'
+          AND FROM_UNIXTIME(PARTITION_DESCRIPTION) <= NOW() - INTERVAL %s DAY
+        ORDER BY PARTITION_ORDINAL_POSITION
+        """,
+        (table, retention_days)
+    )
+    return [name for name, end in cursor.fetchall() if keep_after is None or end <= keep_after]
+
+
+def drop_partition(cursor, table, name):
+    cursor.execute(f"ALTER TABLE {table} DROP PARTITION {name}")
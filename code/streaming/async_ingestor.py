@@ -0,0 +1,140 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from functools import partial
+
+from coins_data.blockchainInfo import fetch_blockchain_statistics, insert_blockchain_statistics_data
+from coins_data.dominance import fetch_realtime_dominance_data, insert_dominance_data
+from coins_data.exchangeRate import fetch_exchange_rate_data, insert_exchange_rate_data
+from coins_data.prices import fetch_realtime_crypto_data_batched, insert_crypto_data
+
+from economic_data.markets import fetch_realtime_economic_data, insert_economic_data
+
+from tweets_news.newsapi import fetch_realtime_crypto_news, insert_news_data
+from tweets_news.x import fetch_realtime_crypto_tweets, insert_tweet_data
+
+from state_store import state_store
+
+
+class Source:
+    """
+    A data source of the ingestor: its fetch function (blocking, or a coroutine function),
+    the function inserting what it returns, the seconds after which a fetch is given up,
+    and how often it is polled ('<name>_interval' in .env overrides the interval).
+
+    The fetch function of a source with 'cursors' returns (data, cursor updates): the cursors are written
+    to the state store only once the data is inserted or spooled by the writer, so data lost to a
+    timeout or a crash before its insert is fetched again.
+    """
+
+    def __init__(self, name, fetch, insert, timeout=30, interval=180, jitter=0.0, cursors=False):
+        self.name = name
+        self.fetch = fetch
+        self.insert = insert
+        self.timeout = timeout
+        self.cursors = cursors
+        self.interval = float(os.getenv(f"{name}_interval") or interval)
+        self.jitter = jitter
+
+
+COIN_SOURCES = [
+    Source("blockchain_statistics", fetch_blockchain_statistics, insert_blockchain_statistics_data, timeout=20, interval=180, jitter=10),
+    Source("dominance", fetch_realtime_dominance_data, insert_dominance_data, timeout=20, interval=30, jitter=3),
+    Source("exchange_rate", fetch_exchange_rate_data, insert_exchange_rate_data, timeout=20, interval=180, jitter=10),
+    Source("prices", fetch_realtime_crypto_data_batched, insert_crypto_data, timeout=20, interval=30, jitter=3)
+]
+
+ECONOMIC_SOURCES = [
+    # Gold, interest rate and S&P 500 in one batched download
+    Source("economic", fetch_realtime_economic_data, insert_economic_data, timeout=30, interval=180, jitter=10, cursors=True)
+]
+
+NEWS_SOURCES = [
+    Source("news", fetch_realtime_crypto_news, insert_news_data, timeout=30, interval=960, jitter=30, cursors=True),
+    Source("tweets", fetch_realtime_crypto_tweets, insert_tweet_data, timeout=30, interval=960, jitter=30, cursors=True)
+]
+
+SOURCES = COIN_SOURCES + ECONOMIC_SOURCES + NEWS_SOURCES
+
+# Threads of the blocking fetchers. Unlike the default executor of asyncio.run, it is not joined
+# when a round ends, so a fetch past its timeout does not hold the round back.
+FETCH_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix="fetch")
+
+
+async def fetch_source(source):
+    """
+    Fetch one source without blocking the event loop, within its timeout.
+
+    Returns:
+        tuple: (data or None, seconds spent)
+    """
+    start = time.perf_counter()
+    try:
+        if asyncio.iscoroutinefunction(source.fetch):
+            data = await asyncio.wait_for(source.fetch(), source.timeout)
+        else:
+            # Blocking fetchers (requests, yfinance, tweepy) run in worker threads
+            loop = asyncio.get_running_loop()
+            data = await asyncio.wait_for(loop.run_in_executor(FETCH_EXECUTOR, source.fetch), source.timeout)
+    except asyncio.TimeoutError:
+        print(f"Timeout: {source.name} took more than {source.timeout}s.")
+        data = None
+    except Exception as e:
+        print(f"Error while fetching {source.name}: {e}")
+        data = None
+    return data, time.perf_counter() - start
+
+
+async def fetch_all(sources):
+    """
+    Fetch all the sources concurrently, in one round (used by the stub server to measure a round).
+
+    Returns:
+        list: One (data, seconds) tuple per source, in the order of 'sources'.
+    """
+    return await asyncio.gather(*(fetch_source(source) for source in sources))
+
+
+def submit(source, data, writer):
+    """
+    Hand what a source fetched to the writer; the cursors of the source are written once the data is stored.
+    """
+    cursors = None
+    if source.cursors and data is not None:
+        data, cursors = data
+    writer.submit(source.insert, data, on_stored=partial(state_store.update, cursors) if cursors else None)
+
+
+def fetch_source_blocking(source):
+    """
+    Fetch one source from the calling thread, within its timeout. The scheduler already runs every
+    source on its own thread, so no event loop is started: the fetch runs on a fetch thread only to be
+    given up after its timeout without holding the scheduler thread.
+
+    Returns:
+        tuple: (data or None, seconds spent)
+    """
+    start = time.perf_counter()
+    try:
+        if asyncio.iscoroutinefunction(source.fetch):
+            future = FETCH_EXECUTOR.submit(asyncio.run, source.fetch())
+        else:
+            future = FETCH_EXECUTOR.submit(source.fetch)
+        data = future.result(timeout=source.timeout)
+    except FutureTimeoutError:
+        print(f"Timeout: {source.name} took more than {source.timeout}s.")
+        data = None
+    except Exception as e:
+        print(f"Error while fetching {source.name}: {e}")
+        data = None
+    return data, time.perf_counter() - start
+
+
+def ingest_source(source, writer):
+    """
+    Fetch one source within its timeout and hand what it returned to the writer (one scheduler job).
+    """
+    data, seconds = fetch_source_blocking(source)
+    submit(source, data, writer)
+    print(f"Fetched {source.name} in {seconds:.2f}s.")
@@ -0,0 +1,89 @@
+from collections import Counter
+
+
+# Rows sent in one multi-row INSERT
+MAX_ROWS_PER_INSERT = 1000
+
+
+def validate_rows(rows, columns, required=(), nonzero=(), positive=(), non_negative=()):
+    """
+    Keep the rows passing the rules of their table, checked column by column.
+
+    Args:
+        rows (list): Tuples in the order of 'columns'.
+        columns (list): Column names of the table.
+        required (list): Columns that must not be None.
+        nonzero (list): Columns that must not be 0.
+        positive (list): Columns that must be > 0.
+        non_negative (list): Columns that must be >= 0.
+
+    Returns:
+        tuple: (valid rows, Counter of the rejection reasons)
+    """
+    rules = (
+        [(columns.index(c), lambda v: v is not None, f"missing {c}") for c in required]
+        + [(columns.index(c), lambda v: v is None or v != 0, f"{c} is zero") for c in nonzero]
+        + [(columns.index(c), lambda v: v is None or v > 0, f"{c} is not positive") for c in positive]
+        + [(columns.index(c), lambda v: v is None or v >= 0, f"{c} is negative") for c in non_negative]
+    )
+    valid_rows = []
+    rejected = Counter()
+    for row in rows:
+        reason = next((message for index, check, message in rules if not check(row[index])), None)
+        if reason is None:
+            valid_rows.append(row)
+        else:
+            rejected[reason] += 1
+    return valid_rows, rejected
+
+
+def print_rejected(table, rejected):
+    for reason, count in rejected.items():
+        print(f"Skipped {count} invalid {table} rows: {reason}.")
+
+
+def write_rows(cursor, connection, table, columns, rows, commit=True):
+    """
+    Insert rows with multi-row INSERT statements (executemany is rewritten into
+    INSERT ... VALUES (...), (...) by the MySQL connector) and one commit, unless 'commit'
+    is False to write several tables in one transaction.
+    Raises the error of the database so the caller can keep the rows.
+
+    Returns:
+        int: Number of rows inserted.
+    """
+    if not rows:
+        return 0
+    insert_query = f"""
+        INSERT INTO {table} ({', '.join(columns)})
+        VALUES ({', '.join(['%s'] * len(columns))})
+    """
+    for start in range(0, len(rows), MAX_ROWS_PER_INSERT):
+        cursor.executemany(insert_query, rows[start:start + MAX_ROWS_PER_INSERT])
+    if commit:
+        connection.commit()
+    return len(rows)
+
+
+def insert_batch(cursor, connection, table, columns, rows, **rules):
+    """
+    Validate the rows of one round and insert the valid ones in a single batch.
+
+    Args:
+        rules: Validation rules, see validate_rows.
+
+    Returns:
+        bool: False if the database rejected the batch.
+    """
+    if not rows:
+        print(f"No data available to insert into {table}.")
+        return True
+    valid_rows, rejected = validate_rows(rows, columns, **rules)
+    print_rejected(table, rejected)
+    try:
+        inserted = write_rows(cursor, connection, table, columns, valid_rows)
+        print(f"Inserted {inserted} rows into {table} table.")
+        return True
+    except Exception as e:
+        print(f"Error while inserting data into {table}: {e}")
+        return False
@@ -1,14 +1,19 @@
 import time
-from requests import Request, Session
+import http_client
 from requests.exceptions import ConnectionError, Timeout, TooManyRedirects
 from datetime import datetime
 import os
 from dotenv import load_dotenv
+from batch_writer import insert_batch
 
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 env_path = os.path.join(current_dir, '../../../.env')
 load_dotenv(env_path)
+
+# Host of the API, can be pointed to a local stub server
+API_URL = os.getenv('coinmarketcap_url', 'https://sandbox-api.coinmarketcap.com')
+
 def fetch_blockchain_statistics(coins=['BTC', 'ETH', 'BNB', 'ADA', 'SOL', 'XRP']):
     """
     Fetch real-time blockchain statistics for the specified coins from CoinMarketCap API.
@@ -19,17 +24,15 @@ def fetch_blockchain_statistics(coins=['BTC', 'ETH', 'BNB', 'ADA', 'SOL', 'XRP']
     Returns:
         list: A list of tuples containing blockchain statistics.
     """
-    url = 'https://sandbox-api.coinmarketcap.com/v1/blockchain/statistics/latest'
+    url = f'{API_URL}/v1/blockchain/statistics/latest'
     headers = {
         'Accepts': 'application/json',
         'X-CMC_PRO_API_KEY': os.getenv('blockchainAPI'),
     }
-    session = Session()
-    session.headers.update(headers)
 
     try:
         # Fetch data from the API
-        response = session.get(url, params={'symbol': ','.join(coins)})
+        response = http_client.get(url, params={'symbol': ','.join(coins)}, headers=headers)
         data = response.json()
 
         # Prepare the data for the specified coins
@@ -90,7 +93,7 @@ def fetch_blockchain_statistics(coins=['BTC', 'ETH', 'BNB', 'ADA', 'SOL', 'XRP']
 
 def insert_blockchain_statistics_data(data, cursor, connection):
     """
-    Insert real-time blockchain statistics data into the database.
+    Insert real-time blockchain statistics data into the database, in one batch.
 
     Args:
         data: A list of tuples containing the blockchain statistics data.
@@ -98,54 +101,16 @@ def insert_blockchain_statistics_data(data, cursor, connection):
         connection: The database connection to commit the transaction.
     
     Returns:
-        None: Data is inserted into the database.
+        bool: False if the database rejected the batch.
     """
-    try:
-        # Prepare the insert query
-        insert_query = """
-            INSERT INTO blockchain_statistics (
-                Timestamp, Coin, Block_Reward_Static, Consensus_Mechanism, Difficulty,
-                Hashrate_24h, Pending_Transactions, Reduction_Rate, Total_Blocks, 
-                Total_Transactions, Tps_24h, First_Block_Timestamp
-            )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,%s)
-        """
-
-        # Ensure data is in the correct format
-        if data:
-            for record in data:
-                timestamp, coin, block_reward_static, consensus_mechanism, difficulty, \
-                hashrate_24h, pending_transactions, reduction_rate, total_blocks, \
-                total_transactions, tps_24h, first_block_timestamp = record
-
-                # Validate the data before inserting
-                if None in [block_reward_static, consensus_mechanism, difficulty, hashrate_24h, 
-                            pending_transactions, reduction_rate, total_blocks, total_transactions, 
-                            tps_24h]:
-                    print(f"Invalid data for {coin} at {timestamp}: Missing required fields.")
-                    continue  # Skip this record
-                
-                if block_reward_static == 0 or tps_24h == 0:
-                    print(f"Invalid data for {coin} at {timestamp}: Values for block_reward_static or tps_24h cannot be zero.")
-                    continue  # Skip this record
-                
-                if pending_transactions < 0 or total_blocks < 0:
-                    print(f"Invalid data for {coin} at {timestamp}: Negative values for transactions or blocks are not allowed.")
-                    continue  # Skip this record
-                
-                # Execute the insert query
-                cursor.execute(insert_query, (
-                    timestamp, coin, block_reward_static, consensus_mechanism, difficulty,
-                    hashrate_24h, pending_transactions, reduction_rate, total_blocks,
-                    total_transactions, tps_24h, first_block_timestamp
-                ))
-
-            # Commit the transaction
-            connection.commit()
-            print(f"Inserted blockchain statistics data into database.")
-
-        else:
-            print("No valid data to insert into the database.")
-
-    except Exception as e:
-        print(f"Error while inserting blockchain statistics data into the database: {e}")
+    return insert_batch(
+        cursor, connection, "blockchain_statistics",
+        ["Timestamp", "Coin", "Block_Reward_Static", "Consensus_Mechanism", "Difficulty",
+         "Hashrate_24h", "Pending_Transactions", "Reduction_Rate", "Total_Blocks",
+         "Total_Transactions", "Tps_24h", "First_Block_Timestamp"],
+        data,
+        required=["Block_Reward_Static", "Consensus_Mechanism", "Difficulty", "Hashrate_24h",
+                  "Pending_Transactions", "Reduction_Rate", "Total_Blocks", "Total_Transactions", "Tps_24h"],
+        nonzero=["Block_Reward_Static", "Tps_24h"],
+        non_negative=["Pending_Transactions", "Total_Blocks"]
+    )
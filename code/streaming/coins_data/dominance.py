@@ -1,9 +1,11 @@
 import time
-import requests
+import http_client
+import os
 from datetime import datetime
+from batch_writer import insert_batch
 
-# Binance API endpoint for real-time price data
-BINANCE_API_URL = "https://api.binance.com/api/v1/ticker/24hr"
+# Binance API endpoint for real-time price data (the host can be pointed to a local stub server)
+BINANCE_API_URL = os.getenv('binance_url', 'https://api.binance.com') + "/api/v1/ticker/24hr"
 
 def fetch_realtime_data(symbol):
     """
@@ -19,7 +21,7 @@ def fetch_realtime_data(symbol):
     params = {'symbol': symbol}
 
     try:
-        response = requests.get(url, params=params)
+        response = http_client.get(url, params=params)
         data = response.json()
 
         if response.status_code == 200:
@@ -89,31 +91,10 @@ def insert_dominance_data(data, cursor, connection):
         connection: The database connection for committing changes.
     
     Returns:
-        None: Data is inserted into the database.
+        bool: False if the database rejected the row.
     """
-    try:
-        # Prepare the insert query
-        insert_query = """
-            INSERT INTO dominance (BTC_Dominance, ETH_Dominance, Altcoin_Dominance, created_at)
-            VALUES (%s, %s, %s, %s)
-        """
-        
-        # Ensure data is in the correct format
-        if data:
-            timestamp, btc_dominance, eth_dominance, altcoin_dominance = data
-
-            # Validate the data before inserting
-            if None in [btc_dominance, eth_dominance, altcoin_dominance]:
-                print(f"Invalid data for dominance at {timestamp}: Missing required fields.")
-                return
-            
-            # Insert the data into the table
-            cursor.execute(insert_query, (btc_dominance, eth_dominance, altcoin_dominance, timestamp))
-            connection.commit()
-            print(f"Inserted dominance data: BTC: {btc_dominance}%, ETH: {eth_dominance}%, Altcoin: {altcoin_dominance}% at {timestamp}")
-
-        else:
-            print("No valid data to insert into the database.")
-
-    except Exception as e:
-        print(f"Error while inserting dominance data into the database: {e}")
+    return insert_batch(
+        cursor, connection, "dominance", ["created_at", "BTC_Dominance", "ETH_Dominance", "Altcoin_Dominance"],
+        [data] if data else data,
+        required=["BTC_Dominance", "ETH_Dominance", "Altcoin_Dominance"]
+    )
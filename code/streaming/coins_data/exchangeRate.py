@@ -1,14 +1,18 @@
 import time
-import requests
+import http_client
 from datetime import datetime
 import os
 from dotenv import load_dotenv
+from batch_writer import insert_batch
 
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 env_path = os.path.join(current_dir, '../../../.env')
 load_dotenv(env_path)
 
+# Host of the API, can be pointed to a local stub server
+API_URL = os.getenv('coingecko_url', 'https://api.coingecko.com')
+
 def fetch_exchange_rate_data(coins=['BTC', 'ETH', 'BNB', 'XRP']):
     """
     Fetch real-time exchange rate data for the specified coins from CoinGecko API.
@@ -19,14 +23,14 @@ def fetch_exchange_rate_data(coins=['BTC', 'ETH', 'BNB', 'XRP']):
     Returns:
         list: A list of tuples containing exchange rate data.
     """
-    url = "https://api.coingecko.com/api/v3/exchange_rates"
+    url = f"{API_URL}/api/v3/exchange_rates"
     headers = {
         "accept": "application/json",
         "x-cg-pro-api-key": os.getenv('exchange_rateAPI')
     }
     try:
         # Fetch data from API
-        response = requests.get(url, headers=headers)
+        response = http_client.get(url, headers=headers)
         data = response.json()
 
         # Prepare the data for the specified coins
@@ -63,38 +67,20 @@ def fetch_exchange_rate_data(coins=['BTC', 'ETH', 'BNB', 'XRP']):
 
 def insert_exchange_rate_data(data, cursor, connection):
     """
-    Insert real-time exchange rate data into the database.
+    Insert real-time exchange rate data into the database, in one batch.
 
     Args:
         data: A list of tuples containing (timestamp, name, unit, value, rate_type)
         cursor: The database cursor to execute queries
         connection: The database connection for committing changes
-    """
-    try:
-        # Prepare insert query
-        insert_query = """
-            INSERT INTO ExchangeRate (Timestamp, name, unit, value, type)
-            VALUES (%s, %s, %s, %s, %s)
-        """
-
-        for record in data:
-            timestamp, name, unit, value, rate_type = record
-
-            # Validate the data before inserting
-            if None in [name, unit, value, rate_type]:
-                print(f"Invalid data at {timestamp}: Missing required fields.")
-                continue  # Skip this record
-            
-            if value == 0:
-                print(f"Invalid data at {timestamp}: Value cannot be zero.")
-                continue  # Skip this record
-
-            # Execute the insert query
-            cursor.execute(insert_query, (timestamp, name, unit, value, rate_type))
-        
-        # Commit the transaction to save changes
-        connection.commit()
-        print(f"Inserted data into ExchangeRate table.")
 
-    except Exception as e:
-        print(f"Error while inserting data into database: {e}")
+    Returns:
+        bool: False if the database rejected the batch.
+    """
+    return insert_batch(
+        cursor, connection, "ExchangeRate",
+        ["Timestamp", "name", "unit", "value", "type"],
+        data,
+        required=["name", "unit", "value", "type"],
+        nonzero=["value"]
+    )
@@ -1,8 +1,9 @@
-import time
-import requests
+import http_client
 from datetime import datetime
 import os
 from dotenv import load_dotenv
+from batch_writer import validate_rows, write_rows, print_rejected
+from ohlcv import update_bars
 
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -10,117 +11,129 @@ env_path = os.path.join(current_dir, '../../../.env')
 load_dotenv(env_path)
 
 API_KEY = os.getenv('crypto_pricesAPI')
-url = f'https://min-api.cryptocompare.com/data/v2/histoday'
+# Host of the API, can be pointed to a local stub server
+API_URL = os.getenv('cryptocompare_url', 'https://min-api.cryptocompare.com')
 
-# List of coins you want to track
-coins = ['BTC', 'ETH', 'BNB', 'ADA', 'SOL', 'XRP']
+# List of coins you want to track ('crypto_coins' in .env, comma separated, overrides it)
+coins = [coin.strip() for coin in os.getenv('crypto_coins', 'BTC,ETH,BNB,ADA,SOL,XRP').split(',') if coin.strip()]
 
-def fetch_realtime_crypto_data(coins=coins):
+# pricemultifull accepts at most 300 characters of comma separated symbols per request
+MAX_FSYMS_LENGTH = 300
+
+
+def chunk_symbols(symbols, max_length=MAX_FSYMS_LENGTH):
+    """
+    Split symbols into groups whose comma separated list fits in 'max_length' characters.
     """
-    Fetch and prepare real-time cryptocurrency data for insertion into the database.
+    chunks = []
+    chunk, length = [], 0
+    for symbol in symbols:
+        added = len(symbol) + (1 if chunk else 0)
+        if chunk and length + added > max_length:
+            chunks.append(chunk)
+            chunk, length = [], 0
+            added = len(symbol)
+        chunk.append(symbol)
+        length += added
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def fetch_realtime_crypto_data_batched(coins=coins):
+    """
+    Fetch the OHLCV data of the day for all the coins with the multi-symbol pricemultifull endpoint,
+    one request per group of symbols instead of one request per coin.
 
     Args:
-        coins: List of coins to track (default is the list provided).
-    
+        coins: List of coins to track.
+
     Returns:
-        tuple: A tuple containing the latest data (timestamp, coin, open, high, low, close, volume, market_cap)
+        list: A list of tuples containing the latest data (coin, open, high, low, close, volume, market_cap, fetched_at)
     """
-    try:
-        all_coin_data = []
-
-        for coin in coins:
-            # Get the current Unix timestamp
-            current_time = int(time.time())
-
-            # Define parameters for the request
-            params = {
-                'fsym': coin,  # Coin symbol
-                'tsym': 'USD',  # Fiat currency (USD)
-                'limit': 1,  # Only get the latest data (1 data point)
-                'toTs': current_time,  # Request the data until the current time
-                'apiKey': API_KEY
-            }
-
-            # Make the request
-            response = requests.get(url, params=params)
-            if response.status_code == 200:
-                data = response.json()
-
-                if data['Response'] == 'Success':
-                    coin_data = data['Data']['Data'][0]
-
-                    # Extract relevant data
-                    open_price = coin_data.get("open", None)
-                    high_price = coin_data.get("high", None)
-                    low_price = coin_data.get("low", None)
-                    close_price = coin_data.get("close", None)
-                    volume = coin_data.get("volumefrom", None)
-                    market_cap = coin_data.get("volumeto", None)  # Assuming volumeto can be considered as market cap
-
-                    # Add the data to the list
-                    all_coin_data.append((
-                        coin,
-                        open_price,
-                        high_price,
-                        low_price,
-                        close_price,
-                        volume,
-                        market_cap
-                    ))
-
-                else:
-                    print(f"Error fetching data for {coin}: {data.get('Message', 'Unknown error')}")
-            else:
-                print(f"Failed to fetch data for {coin}. Status code: {response.status_code}")
-
-        # Return all the processed data
-        return all_coin_data
-
-    except Exception as e:
-        print(f"Error while fetching real-time cryptocurrency data: {e}")
-        return None
+    all_coin_data = []
+    for symbols in chunk_symbols(coins):
+        # Time of the snapshot, kept by the row whenever it is written (after a merge or a spool replay)
+        fetched_at = datetime.now().replace(microsecond=0)
+        try:
+            response = http_client.get(
+                f"{API_URL}/data/pricemultifull",
+                params={'fsyms': ','.join(symbols), 'tsyms': 'USD', 'apiKey': API_KEY}
+            )
+            if response.status_code != 200:
+                print(f"Failed to fetch data for {len(symbols)} coins. Status code: {response.status_code}")
+                continue
+            data = response.json()
+            if 'RAW' not in data:
+                print(f"Error fetching data for {len(symbols)} coins: {data.get('Message', 'Unknown error')}")
+                continue
+
+            for coin in symbols:
+                coin_data = data['RAW'].get(coin, {}).get('USD')
+                if coin_data is None:
+                    print(f"Coin {coin} not found in API response.")
+                    continue
+                all_coin_data.append((
+                    coin,
+                    coin_data.get("OPENDAY"),
+                    coin_data.get("HIGHDAY"),
+                    coin_data.get("LOWDAY"),
+                    coin_data.get("PRICE"),
+                    coin_data.get("VOLUMEDAY"),
+                    coin_data.get("MKTCAP"),
+                    fetched_at
+                ))
+        except Exception as e:
+            print(f"Error while fetching real-time cryptocurrency data: {e}")
+    return all_coin_data or None
 
 
 # Function to insert data into the database
 def insert_crypto_data(data,cursor,connection):
     """
-    Insert real-time cryptocurrency data into the database.
+    Insert real-time cryptocurrency data into the database, in one batch, and merge it into the
+    1 minute, 1 hour and 1 day bars of the coins in the same transaction (a batch replayed after
+    a failure is never counted twice). The rows are created at the time they were fetched.
 
     Args:
-        data: A list of tuples containing (timestamp, coin, open, high, low, close, volume, market_cap)
+        data: A list of tuples containing (coin, open, high, low, close, volume, market_cap, fetched_at),
+              fetched_at as a datetime or, from the spool, as a string
+
+    Returns:
+        bool: False if the database rejected the batch.
     """
+    if not data:
+        print("No data available to insert into crypto_data.")
+        return True
+    columns = ["Coin", "Open", "High", "Low", "Close", "Volume", "Market_Cap", "created_at"]
+    valid_rows, rejected = validate_rows(
+        data, columns,
+        required=["Open", "High", "Low", "Close", "Volume", "Market_Cap", "created_at"],
+        nonzero=["Open", "High", "Low", "Close"],
+        positive=["Volume", "Market_Cap"]
+    )
+    print_rejected("crypto_data", rejected)
+    if not valid_rows:
+        return True
+    # Merged batches and replayed ones hold several fetch times, the bars are built in time order
+    valid_rows = sorted(
+        (tuple(row[:7]) + (row[7] if isinstance(row[7], datetime) else datetime.fromisoformat(row[7]),)
+         for row in valid_rows),
+        key=lambda row: row[7]
+    )
     try:
-        # Prepare insert query
-        insert_query = """
-            INSERT INTO crypto_data ( Coin, Open, High, Low, Close, Volume, Market_Cap)
-            VALUES ( %s, %s, %s, %s, %s, %s, %s)
-        """
-        
-        for record in data:
-            coin, open_price, high_price, low_price, close_price, volume, market_cap = record
-            
-            # Validate the data before inserting
-            if None in [open_price, high_price, low_price, close_price, volume, market_cap]:
-                print(f"Invalid data for {coin} : Missing required fields.")
-                continue  # Skip this record
-            
-            if open_price == 0 or high_price == 0 or low_price == 0 or close_price == 0:
-                print(f"Invalid data for {coin} : Prices cannot be zero.")
-                continue  # Skip this record
-            
-            if volume <= 0 or market_cap <= 0:
-                print(f"Invalid data for {coin} : Volume or market cap cannot be zero or negative.")
-                continue  # Skip this record
-            
-            # Execute the insert
-            cursor.execute(insert_query, ( coin, open_price, high_price, low_price, close_price, volume, market_cap))
-        
-        # Commit the transaction
+        write_rows(cursor, connection, "crypto_data", columns, valid_rows, commit=False)
+        update_bars(cursor, [(row[7], row[0], row[4], row[5]) for row in valid_rows])
         connection.commit()
-        print(f"Inserted data into crypto_data table.")
-
+        print(f"Inserted {len(valid_rows)} rows into crypto_data table.")
+        return True
     except Exception as e:
-        print(f"Error while inserting data into database: {e}")
+        print(f"Error while inserting data into crypto_data: {e}")
+        try:
+            connection.rollback()
+        except Exception:
+            pass
+        return False
 
 
 
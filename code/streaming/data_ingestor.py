@@ -1,33 +1,11 @@
-
-from requests import Request, Session
-from requests.exceptions import ConnectionError, Timeout, TooManyRedirects
-from datetime import datetime
-
-import time
-import requests
-
-import time
-import yfinance as yf
-from datetime import datetime, timedelta
-
-import tweepy
-
 import mysql.connector
 
 
 
-from coins_data.blockchainInfo import fetch_blockchain_statistics , insert_blockchain_statistics_data
-from coins_data.dominance import fetch_realtime_dominance_data ,insert_dominance_data
-from coins_data.exchangeRate import fetch_exchange_rate_data,insert_exchange_rate_data
-from coins_data.prices import fetch_realtime_crypto_data,insert_crypto_data
-
-from economic_data.Gold import fetch_realtime_gold_data ,insert_gold_data
-from economic_data.InterestRate import fetch_realtime_interest_rate_data, insert_interest_rate_data
-from economic_data.stock import fetch_realtime_stock_data , insert_stock_data
-
-
-from tweets_news.newsapi import fetch_realtime_crypto_news , insert_news_data
-from tweets_news.x import fetch_realtime_crypto_tweets , insert_tweet_data
+from async_ingestor import SOURCES, ingest_source
+from scheduler import Scheduler
+from writer import RecordWriter
+from functools import partial
 import os
 from dotenv import load_dotenv
 
@@ -35,71 +13,30 @@ from dotenv import load_dotenv
 current_dir = os.path.dirname(os.path.abspath(__file__))
 env_path = os.path.join(current_dir, '../../.env')
 load_dotenv(env_path)
-connection = mysql.connector.connect(
-    host=os.getenv('SQLhost'),
-    user=os.getenv('SQLuser'),
-    password=os.getenv('SQLpassword'),
-    database=os.getenv('SQLdatabase')
-)
-cursor = connection.cursor()
-
-
-
-# Initialize the last insertion times
-last_news_tweets_insertion_time = None
-last_coins_data_insertion_time = None
-last_economic_data_insertion_time = None
-
-# Main loop
-while True:
-    current_time = datetime.now()
-
-    # Insert coins data every 3 minutes
-    if last_coins_data_insertion_time is None or (current_time - last_coins_data_insertion_time >= timedelta(minutes=3)):
-        print("=============================== coins data ===================================")
-        data_blockchain = fetch_blockchain_statistics()
-        insert_blockchain_statistics_data(data=data_blockchain, cursor=cursor, connection=connection)
-
-        data_dominance = fetch_realtime_dominance_data()
-        insert_dominance_data(data=data_dominance, cursor=cursor, connection=connection)
-
-        data_exchange = fetch_exchange_rate_data()
-        insert_exchange_rate_data(data=data_exchange, cursor=cursor, connection=connection)
-
-        data_crypto = fetch_realtime_crypto_data()
-        insert_crypto_data(data=data_crypto, cursor=cursor, connection=connection)
-
-        # Update the last coins data insertion time
-        last_coins_data_insertion_time = current_time
-
-    # Insert economic data every 3 minutes
-    if last_economic_data_insertion_time is None or (current_time - last_economic_data_insertion_time >= timedelta(minutes=3)):
-        print("=============================== economic data ===================================")
-        data_gold = fetch_realtime_gold_data()
-        insert_gold_data(data=data_gold, cursor=cursor, connection=connection)
-
-        data_interest_rate = fetch_realtime_interest_rate_data()
-        insert_interest_rate_data(data=data_interest_rate, cursor=cursor, connection=connection)
-
-        data_stock = fetch_realtime_stock_data()
-        insert_stock_data(data=data_stock, cursor=cursor, connection=connection)
-
-        # Update the last economic data insertion time
-        last_economic_data_insertion_time = current_time
-
-    # Insert news and tweets every 30 minutes
-    if last_news_tweets_insertion_time is None or (current_time - last_news_tweets_insertion_time >= timedelta(minutes=16)):
-        print("=============================== news and tweets ===================================")
-        data_news = fetch_realtime_crypto_news()
-        insert_news_data(data=data_news, cursor=cursor, connection=connection)
-
-        data_tweets = fetch_realtime_crypto_tweets()
-        insert_tweet_data(data=data_tweets, cursor=cursor, connection=connection)
-
-        # Update the last news and tweets insertion time
-        last_news_tweets_insertion_time = current_time
-
-    # Sleep for 3 minutes before the next iteration
-    time.sleep(180)
-
-    
+def connect_mysql():
+    return mysql.connector.connect(
+        host=os.getenv('SQLhost'),
+        user=os.getenv('SQLuser'),
+        password=os.getenv('SQLpassword'),
+        database=os.getenv('SQLdatabase')
+    )
+
+# The fetches only queue their data, a dedicated thread writes it to MySQL (or spools it while MySQL is down)
+writer = RecordWriter(connect_mysql, [source.insert for source in SOURCES]).start()
+
+# Every source is polled on its own timer ('<source>_interval' in .env to change it):
+# prices and dominance every 30s, blockchain, exchange rate and economic data every 3 minutes,
+# news and tweets every 16 minutes
+scheduler = Scheduler(max_workers=len(SOURCES))
+for source in SOURCES:
+    scheduler.add(source.name, partial(ingest_source, source, writer), source.interval, source.jitter)
+
+try:
+    scheduler.run()
+except KeyboardInterrupt:
+    print("Stopping the ingestion.")
+finally:
+    scheduler.stop()
+    scheduler.print_report()
+    # Write what is still queued before exiting
+    writer.stop()
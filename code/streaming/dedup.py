@@ -0,0 +1,204 @@
+import hashlib
+import math
+import os
+import re
+import struct
+import threading
+from batch_writer import insert_batch
+
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DEDUP_PATH = os.path.join(current_dir, 'sentiment_dedup.bloom')
+
+FILE_MAGIC = b"BLOOM1"
+
+
+def normalize_content(text):
+    """
+    Normalize a headline or tweet so that retweets, links, case, punctuation and spacing
+    do not make the same text look new.
+    """
+    text = text.lower()
+    text = re.sub(r"^rt @\w+:\s*", "", text)
+    text = re.sub(r"https?://\S+", "", text)
+    text = re.sub(r"[^\w\s]", "", text)
+    return " ".join(text.split())
+
+
+def content_hash(text):
+    return hashlib.blake2b(normalize_content(text).encode("utf-8"), digest_size=16).digest()
+
+
+class BloomFilter:
+    """
+    Bit array answering "probably seen" or "never seen" for 'capacity' keys with an 'error_rate'
+    false positive rate, in a fixed amount of memory (capped at 'max_bytes').
+    """
+
+    def __init__(self, capacity, error_rate, max_bytes=None):
+        bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        if max_bytes:
+            # Over the memory budget the filter keeps its size and accepts a higher false positive rate
+            bits = min(bits, max_bytes * 8)
+        self.size = bits
+        self.hash_count = max(1, round(bits / capacity * math.log(2)))
+        self.capacity = capacity
+        self.count = 0
+        self.bits = bytearray(math.ceil(bits / 8))
+
+    def _positions(self, key):
+        # Double hashing: the k positions are derived from the two halves of the 128-bit key
+        first, second = struct.unpack("<QQ", key)
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def expected_error_rate(self):
+        return (1 - math.exp(-self.hash_count * self.count / self.size)) ** self.hash_count
+
+    def write(self, file):
+        file.write(struct.pack("<QQQQ", self.size, self.hash_count, self.capacity, self.count))
+        file.write(self.bits)
+
+    @classmethod
+    def read(cls, file):
+        bloom = cls.__new__(cls)
+        bloom.size, bloom.hash_count, bloom.capacity, bloom.count = struct.unpack("<QQQQ", file.read(32))
+        bloom.bits = bytearray(file.read(math.ceil(bloom.size / 8)))
+        return bloom
+
+
+class ContentDeduplicator:
+    """
+    Persistent filter of the contents already inserted, keyed by the hash of their normalized text.
+
+    It keeps two generations of Bloom filters: when the current one holds 'capacity' contents it becomes
+    the previous one and a new one starts, so memory stays bounded on an endless stream while the recent
+    contents are always remembered. A false positive drops a new text with probability 'error_rate'.
+    """
+
+    def __init__(self, path=None, capacity=None, error_rate=None, max_bytes=None):
+        """
+        Args:
+            path (str): File the filters are saved to ('dedup_path' in .env, default sentiment_dedup.bloom).
+            capacity (int): Contents per generation ('dedup_capacity', default 1,000,000).
+            error_rate (float): False positive rate of a full generation ('dedup_error_rate', default 0.001).
+            max_bytes (int): Memory budget of the two generations ('dedup_max_bytes', default 4 MB).
+        """
+        self.path = path or os.getenv('dedup_path', DEFAULT_DEDUP_PATH)
+        self.capacity = capacity or int(os.getenv('dedup_capacity') or 1000000)
+        self.error_rate = error_rate or float(os.getenv('dedup_error_rate') or 0.001)
+        self.max_bytes = max_bytes or int(os.getenv('dedup_max_bytes') or 4 * 1024 * 1024)
+        self.lock = threading.Lock()
+        self.current, self.previous = self._read()
+
+    def _new_filter(self):
+        return BloomFilter(self.capacity, self.error_rate, self.max_bytes // 2)
+
+    def _read(self):
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'rb') as dedup_file:
+                    if dedup_file.read(len(FILE_MAGIC)) == FILE_MAGIC:
+                        current = BloomFilter.read(dedup_file)
+                        previous = BloomFilter.read(dedup_file) if dedup_file.read(1) == b"\x01" else None
+                        return current, previous
+                print(f"Ignoring {self.path}: not a dedup filter file.")
+            except (OSError, struct.error) as e:
+                print(f"Error reading the dedup filter {self.path}: {e}")
+        return self._new_filter(), None
+
+    def save(self):
+        """
+        Write the filters to disk (through a temporary file, so a crash never truncates them).
+        """
+        with self.lock:
+            temporary_path = f"{self.path}.tmp"
+            try:
+                with open(temporary_path, 'wb') as dedup_file:
+                    dedup_file.write(FILE_MAGIC)
+                    self.current.write(dedup_file)
+                    if self.previous is not None:
+                        dedup_file.write(b"\x01")
+                        self.previous.write(dedup_file)
+                    else:
+                        dedup_file.write(b"\x00")
+                os.replace(temporary_path, self.path)
+            except OSError as e:
+                print(f"Error writing the dedup filter {self.path}: {e}")
+
+    def seen(self, key):
+        with self.lock:
+            return key in self.current or (self.previous is not None and key in self.previous)
+
+    def add(self, keys):
+        with self.lock:
+            for key in keys:
+                if self.current.count >= self.capacity:
+                    self.previous, self.current = self.current, self._new_filter()
+                self.current.add(key)
+
+    def filter_new(self, rows, content_index):
+        """
+        Keep the rows whose content was never added, dropping duplicates inside 'rows' too.
+
+        Returns:
+            tuple: (new rows, their content hashes to `add` once the rows are stored)
+        """
+        new_rows, keys, batch_keys = [], [], set()
+        for row in rows:
+            if not row[content_index]:
+                continue
+            key = content_hash(row[content_index])
+            if key in batch_keys or self.seen(key):
+                continue
+            batch_keys.add(key)
+            new_rows.append(row)
+            keys.append(key)
+        return new_rows, keys
+
+
+_deduplicator = None
+_deduplicator_lock = threading.Lock()
+
+
+def sentiment_deduplicator():
+    """
+    Filter shared by the news and tweets inserted in the sentiment table, loaded on first use.
+    """
+    global _deduplicator
+    with _deduplicator_lock:
+        if _deduplicator is None:
+            _deduplicator = ContentDeduplicator()
+        return _deduplicator
+
+
+def insert_new_sentiment_data(data, cursor, connection, label):
+    """
+    Insert into the sentiment table the (source, content) rows whose content was never inserted,
+    so a repeated headline or retweet costs no insert, no sentiment score and no warehouse row.
+
+    Returns:
+        bool: False if the database rejected the batch.
+    """
+    if not data:
+        print(f"No {label} data available to insert.")
+        return True
+    deduplicator = sentiment_deduplicator()
+    new_rows, keys = deduplicator.filter_new(data, content_index=1)
+    if len(new_rows) < len(data):
+        print(f"Skipped {len(data) - len(new_rows)} {label} already inserted or without content.")
+    if not new_rows:
+        return True
+    written = insert_batch(cursor, connection, "sentiment", ["source", "content"], new_rows, required=["content"])
+    if written:
+        # Only remembered once stored: a batch spooled after a failure is not dropped on replay
+        deduplicator.add(keys)
+        deduplicator.save()
+    return written
@@ -0,0 +1,133 @@
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+
+NEW_YORK = ZoneInfo("America/New_York")
+
+# Trading sessions in New York time: days of the week (0 = Monday), opening hours and holiday calendar.
+# Gold futures trade on CME Globex from Sunday 18:00 to Friday 17:00 with a daily break from 17:00 to 18:00.
+SESSIONS = {
+    "^GSPC": {"days": range(0, 5), "open": time(9, 30), "close": time(16, 0), "calendar": "nyse"},
+    "^TNX": {"days": range(0, 5), "open": time(8, 0), "close": time(17, 0), "calendar": "nyse"},
+    "GC=F": {"days": range(0, 5), "open": time(18, 0), "close": time(17, 0), "overnight": True, "calendar": "cme"}
+}
+
+# Time the CME Globex metals halt on the US holidays they do not close for
+CME_EARLY_CLOSE = time(13, 30)
+
+# Polling goes on for a few minutes after the close to get the last bar of the session
+CLOSE_GRACE = timedelta(minutes=5)
+
+
+def _nth_weekday(year, month, weekday, n):
+    """
+    Date of the n-th given weekday of a month (n = -1 for the last one).
+    """
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year, month + 1, 1) - timedelta(days=1) if month < 12 else date(year, 12, 31)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _easter(year):
+    # Anonymous Gregorian algorithm
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month = (h + l - 7 * m + 114) // 31
+    day = (h + l - 7 * m + 114) % 31 + 1
+    return date(year, month, day)
+
+
+def _observed(day):
+    # Holidays falling on a weekend are observed on the closest weekday, except New Year's Day on a
+    # Saturday: the Friday before ends the year and is a trading day (None, no observed holiday)
+    if day.weekday() == 5:
+        return None if (day.month, day.day) == (1, 1) else day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+def us_market_holidays(year):
+    """
+    Full-day holidays of the US exchanges (NYSE calendar), applied to the S&P 500 and the yield index.
+    """
+    holidays = {
+        _observed(date(year, 1, 1)),
+        _nth_weekday(year, 1, 0, 3),   # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),   # Washington's Birthday
+        _easter(year) - timedelta(days=2),  # Good Friday
+        _nth_weekday(year, 5, 0, -1),  # Memorial Day
+        _observed(date(year, 6, 19)),
+        _observed(date(year, 7, 4)),
+        _nth_weekday(year, 9, 0, 1),   # Labor Day
+        _nth_weekday(year, 11, 3, 4),  # Thanksgiving
+        _observed(date(year, 12, 25))
+    }
+    holidays.discard(None)
+    return holidays
+
+
+def cme_metals_holidays(year):
+    """
+    Holidays of the gold futures on CME Globex: closed on New Year's Day, Good Friday and Christmas,
+    halted at CME_EARLY_CLOSE on the other US holidays. CME publishes its schedule every year and
+    sometimes departs from it, these fixed rules are an approximation.
+
+    Returns:
+        dict: {trading day: None if closed all day, else the time trading halts}
+    """
+    holidays = {day: CME_EARLY_CLOSE for day in (
+        _nth_weekday(year, 1, 0, 3),   # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),   # Washington's Birthday
+        _nth_weekday(year, 5, 0, -1),  # Memorial Day
+        _observed(date(year, 6, 19)),
+        _observed(date(year, 7, 4)),
+        _nth_weekday(year, 9, 0, 1),   # Labor Day
+        _nth_weekday(year, 11, 3, 4)   # Thanksgiving
+    )}
+    for day in (_observed(date(year, 1, 1)), _easter(year) - timedelta(days=2), _observed(date(year, 12, 25))):
+        holidays[day] = None
+    holidays.pop(None, None)
+    return holidays
+
+
+def _in_session(ticker, moment):
+    session = SESSIONS[ticker]
+    trading_day = moment.date()
+    if session.get("overnight"):
+        # A session opening in the evening belongs to the next day
+        if moment.time() >= session["open"]:
+            trading_day += timedelta(days=1)
+        elif moment.time() >= session["close"]:
+            return False
+    elif not session["open"] <= moment.time() < session["close"]:
+        return False
+    if trading_day.weekday() not in session["days"]:
+        return False
+    if session["calendar"] == "cme":
+        holidays = cme_metals_holidays(trading_day.year)
+        if trading_day not in holidays:
+            return True
+        # Closed all day, or open until the early halt of the holiday itself
+        halt = holidays[trading_day]
+        return halt is not None and (moment.date() != trading_day or moment.time() < halt)
+    return trading_day not in us_market_holidays(trading_day.year)
+
+
+def is_market_open(ticker, now=None):
+    """
+    Whether new bars can be expected for a ticker: its market is in session, or closed for less
+    than CLOSE_GRACE. Tickers without a known session are always polled.
+    """
+    if ticker not in SESSIONS:
+        return True
+    now = (now or datetime.now(timezone.utc)).astimezone(NEW_YORK)
+    return _in_session(ticker, now) or _in_session(ticker, now - CLOSE_GRACE)
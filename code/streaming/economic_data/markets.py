@@ -0,0 +1,181 @@
+from datetime import datetime, timedelta, timezone
+import pandas as pd
+import yfinance as yf
+from batch_writer import validate_rows, write_rows, print_rejected
+from state_store import state_store
+from economic_data.market_hours import is_market_open
+
+
+# Economic tickers: staging table, its columns (after the timestamp), whether the volume is stored
+# and the prefix of their columns in the economic_rollup table
+ECONOMIC_TICKERS = {
+    "GC=F": {"table": "GoldPrice", "columns": ["Open", "High", "Low", "Close"], "volume": False, "rollup": "gold"},
+    "^TNX": {"table": "InterestRate", "columns": ["open", "high", "low", "close"], "volume": False, "rollup": "interest"},
+    "^GSPC": {"table": "stocksPrices", "columns": ["Open", "High", "Low", "Close", "Volume"], "volume": True, "rollup": "stock"}
+}
+
+# Periods of the rollup: granularity and the length of the timestamp prefix identifying the period
+ROLLUP_PERIODS = {"hour": (13, ":00:00"), "day": (10, " 00:00:00")}
+
+# Yahoo Finance only serves 1 minute bars of the last days
+MAX_HISTORY = timedelta(days=6)
+
+
+def _last_bar_key(ticker):
+    return f"last_bar:{ticker}"
+
+
+def fetch_realtime_economic_data(tickers=tuple(ECONOMIC_TICKERS)):
+    """
+    Fetch the new 1 minute bars of all the economic tickers in one batched download.
+
+    Only the tickers whose market is open are requested (nights, weekends and holidays cost no call),
+    and only the bars after the last one fetched for each ticker are requested and kept; the first
+    time a ticker is fetched only its latest bar is kept.
+
+    Args:
+        tickers: Yahoo Finance tickers to fetch.
+
+    Returns:
+        tuple: (list of (ticker, timestamp, open, high, low, close, volume) tuples or None if no new bar,
+               last bar of each ticker). The last bars are written by the ingestor once the bars are
+               stored, so bars lost to a timeout or a crash before their insert are fetched again; None on error.
+    """
+    try:
+        tickers = [ticker for ticker in tickers if is_market_open(ticker)]
+        if not tickers:
+            print("Markets closed, no economic data to fetch.")
+            return None, {}
+        last_bars = {ticker: state_store.get(_last_bar_key(ticker)) for ticker in tickers}
+        if all(last_bars.values()):
+            # Incremental pull: from the oldest last bar of the tickers, within the history Yahoo serves
+            start = min(pd.Timestamp(last_bar) for last_bar in last_bars.values())
+            start = max(start.tz_convert(timezone.utc).to_pydatetime(), datetime.now(timezone.utc) - MAX_HISTORY)
+            history = yf.download(list(tickers), start=start, interval="1m", group_by="ticker",
+                                  auto_adjust=False, progress=False, threads=True)
+        else:
+            history = yf.download(list(tickers), period="1d", interval="1m", group_by="ticker",
+                                  auto_adjust=False, progress=False, threads=True)
+
+        rows = []
+        cursors = {}
+        for ticker in tickers:
+            if history.empty or ticker not in history.columns.get_level_values(0):
+                print(f"No data fetched for {ticker}.")
+                continue
+            # Tickers trade on different sessions, the minutes of the others are empty
+            bars = history[ticker].dropna(subset=["Close"])
+            if last_bars[ticker]:
+                # Last-bar dedup: the final bar of a session is returned again until the next one opens
+                bars = bars[bars.index > pd.Timestamp(last_bars[ticker])]
+            else:
+                bars = bars.tail(1)
+            if bars.empty:
+                continue
+
+            for timestamp, bar in bars.iterrows():
+                rows.append((
+                    ticker,
+                    timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+                    float(bar["Open"]),
+                    float(bar["High"]),
+                    float(bar["Low"]),
+                    float(bar["Close"]),
+                    float(bar["Volume"]) if pd.notna(bar["Volume"]) else None
+                ))
+            cursors[_last_bar_key(ticker)] = bars.index[-1].isoformat()
+
+        if not rows:
+            print("No new economic bars.")
+        return rows or None, cursors
+
+    except Exception as e:
+        print(f"Error while fetching real-time economic data: {e}")
+        return None
+
+
+def rollup_economic_rows(ticker, rows):
+    """
+    Sum and count of the mid prices ((open + close) / 2) of bars per hour and per day.
+
+    Args:
+        ticker: Ticker of the bars.
+        rows: Tuples (timestamp, open, high, low, close, ...).
+
+    Returns:
+        dict: {(granularity, period start, series): [sum, count]}
+    """
+    rollup = {}
+    series = ECONOMIC_TICKERS[ticker]["rollup"]
+    for row in rows:
+        timestamp, mid = str(row[0]), (row[1] + row[4]) / 2
+        for granularity, (length, suffix) in ROLLUP_PERIODS.items():
+            totals = rollup.setdefault((granularity, timestamp[:length] + suffix, series), [0.0, 0])
+            totals[0] += mid
+            totals[1] += 1
+    return rollup
+
+
+def update_economic_rollup(cursor, rollup):
+    """
+    Add the sums and counts of new bars to the hourly and daily rows of economic_rollup.
+    """
+    upsert_query = """
+        INSERT INTO economic_rollup (granularity, period_start, {series}_sum, {series}_count)
+        VALUES (%s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE {series}_sum = {series}_sum + VALUES({series}_sum),
+                                {series}_count = {series}_count + VALUES({series}_count)
+    """
+    for series in {definition["rollup"] for definition in ECONOMIC_TICKERS.values()}:
+        rows = [(granularity, period, total, count)
+                for (granularity, period, row_series), (total, count) in rollup.items() if row_series == series]
+        if rows:
+            cursor.executemany(upsert_query.format(series=series), rows)
+
+
+def insert_economic_data(data, cursor, connection):
+    """
+    Insert the bars of the economic tickers into their staging tables, one batch per table, and add
+    them to the hourly and daily economic rollup, all in one transaction (a batch replayed after a
+    failure is never counted twice).
+
+    Args:
+        data: A list of tuples (ticker, timestamp, open, high, low, close, volume).
+        cursor: Database cursor for executing SQL queries.
+        connection: Database connection object.
+
+    Returns:
+        bool: False if the database rejected the data.
+    """
+    if not data:
+        print("No economic data available to insert.")
+        return True
+    # Replayed and merged batches may hold the same bar twice
+    data = list({(row[0], row[1]): row for row in data}.values())
+    try:
+        rollup = {}
+        for ticker, definition in ECONOMIC_TICKERS.items():
+            rows = [row[1:] if definition["volume"] else row[1:6] for row in data if row[0] == ticker]
+            if not rows:
+                continue
+            columns = ["Timestamp"] + definition["columns"]
+            valid_rows, rejected = validate_rows(
+                rows, columns,
+                required=definition["columns"],
+                nonzero=definition["columns"][:4],
+                non_negative=definition["columns"][4:]
+            )
+            print_rejected(definition["table"], rejected)
+            write_rows(cursor, connection, definition["table"], columns, valid_rows, commit=False)
+            rollup.update(rollup_economic_rows(ticker, valid_rows))
+            print(f"Inserted {len(valid_rows)} rows into {definition['table']} table.")
+        update_economic_rollup(cursor, rollup)
+        connection.commit()
+        return True
+    except Exception as e:
+        print(f"Error while inserting economic data into database: {e}")
+        try:
+            connection.rollback()
+        except Exception:
+            pass
+        return False
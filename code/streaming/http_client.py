@@ -0,0 +1,123 @@
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# Requests per second and burst allowed per API host (hosts not listed use DEFAULT_RATE_LIMIT)
+RATE_LIMITS = {
+    'min-api.cryptocompare.com': (20, 20),
+    'api.coingecko.com': (0.5, 5),
+    'sandbox-api.coinmarketcap.com': (0.5, 5),
+    'pro-api.coinmarketcap.com': (0.5, 5),
+    'api.binance.com': (10, 20),
+    'newsapi.org': (1, 5)
+}
+DEFAULT_RATE_LIMIT = (5, 10)
+
+# Status codes worth retrying: rate limited or temporary server errors
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Rate limiter allowing 'rate' requests per second on average and bursts of 'capacity' requests.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Take one token, waiting until one is available.
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+_sessions = {}
+_buckets = {}
+_lock = threading.Lock()
+
+
+def _host_state(host):
+    """
+    Keep-alive session and rate limiter of an API host, created on first use.
+    """
+    with _lock:
+        if host not in _sessions:
+            session = requests.Session()
+            # Connections are kept open and reused, also by the threads of the concurrent ingestion
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=16)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _sessions[host] = session
+            _buckets[host] = TokenBucket(*RATE_LIMITS.get(host, DEFAULT_RATE_LIMIT))
+        return _sessions[host], _buckets[host]
+
+
+def get(url, params=None, headers=None, timeout=10, retries=3, backoff=0.5):
+    """
+    GET request through the shared session of the API host, within its rate limit.
+
+    Rate limited (429) and temporary server errors (5xx) or connection failures are retried up to
+    'retries' times, waiting backoff * 2^attempt seconds (with jitter) or the Retry-After of the API.
+
+    Args:
+        url (str): URL of the request.
+        params (dict): Query parameters.
+        headers (dict): Headers of the request.
+        timeout (float): Seconds to wait for the API.
+        retries (int): Number of retries after the first attempt.
+        backoff (float): Base delay between retries, in seconds.
+
+    Returns:
+        requests.Response: The last response received; the connection error is raised if none was.
+    """
+    host = urlparse(url).netloc
+    session, bucket = _host_state(host)
+
+    for attempt in range(retries + 1):
+        bucket.acquire()
+        try:
+            response = session.get(url, params=params, headers=headers, timeout=timeout)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt == retries:
+                raise
+            delay = backoff * 2 ** attempt
+            print(f"Request to {host} failed ({e}), retrying in {delay:.1f}s.")
+        else:
+            if response.status_code not in RETRY_STATUS or attempt == retries:
+                return response
+            delay = backoff * 2 ** attempt
+            retry_after = response.headers.get('Retry-After')
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, int(retry_after))
+            print(f"{host} answered {response.status_code}, retrying in {delay:.1f}s.")
+        time.sleep(delay + random.uniform(0, delay / 2))
+
+
+def close_sessions():
+    """
+    Close the connections of every API host.
+    """
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+        _buckets.clear()
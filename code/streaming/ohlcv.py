@@ -0,0 +1,66 @@
+# Bar tables and the truncation of a timestamp to the start of its bar
+RESOLUTIONS = {
+    "crypto_ohlcv_1m": lambda moment: moment.replace(second=0, microsecond=0),
+    "crypto_ohlcv_1h": lambda moment: moment.replace(minute=0, second=0, microsecond=0),
+    "crypto_ohlcv_1d": lambda moment: moment.replace(hour=0, minute=0, second=0, microsecond=0)
+}
+
+BAR_COLUMNS = ["Coin", "bar_start", "Open", "High", "Low", "Close", "Volume", "first_at", "last_at", "tick_count"]
+
+
+def build_bars(rows, truncate):
+    """
+    Aggregate price snapshots into OHLCV bars: open and close are the first and last prices in time order,
+    high and low the max and min prices.
+
+    The rows of crypto_data hold the rolling volume of the day, summing them would count the same trades
+    again on every snapshot: a bar keeps the day volume at its close instead (the day volume of a 1d bar).
+
+    Args:
+        rows: Tuples (timestamp, coin, price, day volume) in time order.
+        truncate: Function mapping a timestamp to the start of its bar.
+
+    Returns:
+        list: Tuples in the order of BAR_COLUMNS.
+    """
+    bars = {}
+    for timestamp, coin, price, volume in rows:
+        key = (coin, truncate(timestamp))
+        bar = bars.get(key)
+        if bar is None:
+            bars[key] = [price, price, price, price, volume, timestamp, timestamp, 1]
+        else:
+            bar[1] = max(bar[1], price)
+            bar[2] = min(bar[2], price)
+            bar[3], bar[4], bar[6] = price, volume, timestamp
+            bar[7] += 1
+    return [(coin, bar_start, *bar) for (coin, bar_start), bar in bars.items()]
+
+
+def update_bars(cursor, rows):
+    """
+    Merge new price snapshots into the 1 minute, 1 hour and 1 day bars of their coins. The bars of
+    a batch are merged with the stored ones in SQL, so batches arriving late or out of order still
+    give the open and close of the earliest and latest snapshots. Does not commit.
+
+    Args:
+        rows: Tuples (timestamp, coin, price, day volume) in time order.
+    """
+    for table, truncate in RESOLUTIONS.items():
+        bars = build_bars(rows, truncate)
+        if not bars:
+            continue
+        # Assignments are applied left to right: open and close are compared with the stored times first
+        cursor.executemany(f"""
+            INSERT INTO {table} ({', '.join(BAR_COLUMNS)})
+            VALUES ({', '.join(['%s'] * len(BAR_COLUMNS))})
+            ON DUPLICATE KEY UPDATE
+                Open = IF(VALUES(first_at) < first_at, VALUES(Open), Open),
+                first_at = LEAST(first_at, VALUES(first_at)),
+                Close = IF(VALUES(last_at) >= last_at, VALUES(Close), Close),
+                Volume = IF(VALUES(last_at) >= last_at, VALUES(Volume), Volume),
+                last_at = GREATEST(last_at, VALUES(last_at)),
+                High = GREATEST(High, VALUES(High)),
+                Low = LEAST(Low, VALUES(Low)),
+                tick_count = tick_count + VALUES(tick_count)
+        """, bars)
@@ -0,0 +1,115 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Job:
+    """
+    A function run every 'interval' seconds, delayed by up to 'jitter' seconds at each run.
+    """
+
+    def __init__(self, name, function, interval, jitter=0.0):
+        self.name = name
+        self.function = function
+        self.interval = interval
+        self.jitter = jitter
+        self.running = False
+        self.runs = 0
+        self.overruns = 0
+        self.total_seconds = 0.0
+
+
+class Scheduler:
+    """
+    Runs every job on its own timer, on a monotonic clock.
+
+    Runs are planned from the previous planned time (not from the end of the previous run), so a job
+    does not drift by its own duration, and each run executes on a worker thread so a slow source never
+    delays the others. A job still running when its next run is due is an overrun: the run is skipped
+    and reported instead of piling up behind it.
+    """
+
+    def __init__(self, max_workers=8):
+        self.jobs = []
+        self.timers = []  # heap of (due time, sequence, job, planned time)
+        self.sequence = itertools.count()
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+
+    def add(self, name, function, interval, jitter=0.0):
+        """
+        Register a job, first run as soon as the scheduler starts (plus jitter).
+        """
+        job = Job(name, function, interval, jitter)
+        self.jobs.append(job)
+        self._plan(job, time.monotonic())
+        return job
+
+    def _plan(self, job, planned):
+        # Jitter spreads the requests of jobs sharing an interval, it is not carried over to the next runs
+        due = planned + random.uniform(0, job.jitter)
+        heapq.heappush(self.timers, (due, next(self.sequence), job, planned))
+
+    def _run_job(self, job):
+        start = time.monotonic()
+        try:
+            job.function()
+        except Exception as e:
+            print(f"Job {job.name} failed: {e}")
+        finally:
+            seconds = time.monotonic() - start
+            with self.lock:
+                job.running = False
+                job.runs += 1
+                job.total_seconds += seconds
+            if seconds > job.interval:
+                print(f"Overrun: {job.name} took {seconds:.1f}s, more than its {job.interval}s interval.")
+
+    def run(self):
+        """
+        Run the jobs until `stop` is called.
+        """
+        while not self.stopping.is_set():
+            due, _, job, planned = self.timers[0]
+            delay = due - time.monotonic()
+            if delay > 0 and self.stopping.wait(min(delay, 1.0)):
+                break
+            if delay > 1.0:
+                # Woke up early to check for stop, the timer is still ahead
+                continue
+            heapq.heappop(self.timers)
+
+            with self.lock:
+                overrun = job.running
+                if overrun:
+                    job.overruns += 1
+                else:
+                    job.running = True
+            if overrun:
+                print(f"Overrun: {job.name} is still running, skipping this run.")
+            else:
+                self.executor.submit(self._run_job, job)
+
+            next_run = planned + job.interval
+            now = time.monotonic()
+            if next_run < now:
+                # Fell behind by more than one interval: skip the missed runs instead of running them back to back
+                next_run = now + job.interval
+            self._plan(job, next_run)
+
+    def stop(self, wait=True):
+        self.stopping.set()
+        self.executor.shutdown(wait=wait)
+
+    def print_report(self):
+        """
+        Print the runs, overruns and average duration of every job.
+        """
+        print("scheduler report".center(160, '-'))
+        for job in self.jobs:
+            average = job.total_seconds / job.runs if job.runs else 0.0
+            print(f"{job.name:<25} every {job.interval:>6}s  runs {job.runs:>5}  overruns {job.overruns:>4}  average {average:6.2f}s")
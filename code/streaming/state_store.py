@@ -0,0 +1,63 @@
+import json
+import os
+import threading
+
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_STATE_PATH = os.path.join(current_dir, 'streaming_state.json')
+
+
+class StateStore:
+    """
+    Small persistent key/value store of the producers (last bar fetched per ticker, API cursors ...),
+    so a restarted ingestor resumes where it stopped instead of fetching everything again.
+    """
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path (str): JSON file holding the state (default: streaming_state.json next to this module,
+                'streaming_state_path' in .env overrides it).
+        """
+        self.path = path or os.getenv('streaming_state_path', DEFAULT_STATE_PATH)
+        # Producers run on several scheduler threads
+        self.lock = threading.Lock()
+        self.state = self._read()
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r') as state_file:
+                return json.load(state_file)
+        except (OSError, ValueError) as e:
+            print(f"Error reading the streaming state from {self.path}: {e}")
+            return {}
+
+    def get(self, key, default=None):
+        with self.lock:
+            return self.state.get(key, default)
+
+    def set(self, key, value):
+        """
+        Store a value and write the state file (through a temporary file, so a crash never truncates it).
+        """
+        self.update({key: value})
+
+    def update(self, values):
+        """
+        Store several values at once, in one write of the state file.
+        """
+        with self.lock:
+            self.state.update(values)
+            temporary_path = f"{self.path}.tmp"
+            try:
+                with open(temporary_path, 'w') as state_file:
+                    json.dump(self.state, state_file, indent=2, default=str)
+                os.replace(temporary_path, self.path)
+            except OSError as e:
+                print(f"Error writing the streaming state to {self.path}: {e}")
+
+
+# Shared by all the producers of the process
+state_store = StateStore()
@@ -0,0 +1,162 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+#=======================================canned responses========================================================
+
+def pricemultifull_response(query):
+    symbols = query.get('fsyms', ['BTC'])[0].split(',')
+    return {"RAW": {
+        symbol: {"USD": {
+            "OPENDAY": 100.0, "HIGHDAY": 110.0, "LOWDAY": 95.0, "PRICE": 105.0,
+            "VOLUMEDAY": 1000.0, "MKTCAP": 1000000.0
+        }} for symbol in symbols
+    }}
+
+
+def blockchain_statistics_response(query):
+    symbols = query.get('symbol', ['BTC'])[0].split(',')
+    return {"data": {
+        symbol: {
+            "block_reward_static": 3.125, "consensus_mechanism": "proof-of-work", "difficulty": "1",
+            "hashrate_24h": "1", "pending_transactions": 10, "reduction_rate": "50%", "total_blocks": 1,
+            "total_transactions": "1", "tps_24h": 1.0, "first_block_timestamp": "2009-01-09T02:54:25.000Z"
+        } for symbol in symbols
+    }}
+
+
+def exchange_rates_response(query):
+    return {"rates": {
+        "btc": {"name": "Bitcoin", "unit": "BTC", "value": 1.0, "type": "crypto"},
+        "eth": {"name": "Ether", "unit": "ETH", "value": 30.0, "type": "crypto"},
+        "bnb": {"name": "Binance Coin", "unit": "BNB", "value": 150.0, "type": "crypto"},
+        "xrp": {"name": "XRP", "unit": "XRP", "value": 40000.0, "type": "crypto"}
+    }}
+
+
+def ticker_response(query):
+    return {"symbol": query.get('symbol', ['BTCUSDT'])[0], "lastPrice": "100.0", "volume": "1000.0"}
+
+
+def everything_response(query):
+    return {"status": "ok", "articles": [
+        {"source": {"name": "Stub News"}, "title": f"Stub article {i}", "publishedAt": datetime.now().isoformat()}
+        for i in range(5)
+    ]}
+
+
+ROUTES = {
+    "/data/pricemultifull": pricemultifull_response,
+    "/v1/blockchain/statistics/latest": blockchain_statistics_response,
+    "/api/v3/exchange_rates": exchange_rates_response,
+    "/api/v1/ticker/24hr": ticker_response,
+    "/v2/everything": everything_response
+}
+
+# Environment variables pointing each fetcher to the stub server
+URL_VARIABLES = ['cryptocompare_url', 'coinmarketcap_url', 'coingecko_url', 'binance_url', 'newsapi_url']
+
+
+#=======================================server========================================================
+
+class StubServer:
+    """
+    Local HTTP server answering the API endpoints used by the fetchers with canned JSON after
+    'latency' seconds, to exercise the ingestion without network access or API keys.
+    """
+
+    def __init__(self, latency=0.5, port=0):
+        """
+        Args:
+            latency (float): Seconds every request waits before it is answered.
+            port (int): Port to listen on (0 picks a free one).
+        """
+        self.latency = latency
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                route = ROUTES.get(url.path)
+                time.sleep(server.latency)
+                if route is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                body = json.dumps(route(parse_qs(url.query))).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+#=======================================sequential vs concurrent round========================================================
+
+if __name__ == "__main__":
+    stub = StubServer(latency=float(os.getenv('stub_latency', 0.5))).start()
+    # The fetchers read their API host at import time
+    for variable in URL_VARIABLES:
+        os.environ[variable] = stub.url
+
+    import asyncio
+    from async_ingestor import Source, fetch_all
+    from coins_data.blockchainInfo import fetch_blockchain_statistics
+    from coins_data.dominance import fetch_realtime_dominance_data
+    from coins_data.exchangeRate import fetch_exchange_rate_data
+    from coins_data.prices import fetch_realtime_crypto_data_batched
+    from tweets_news.newsapi import fetch_realtime_crypto_news
+
+    print(f"Stub server on {stub.url}, {stub.latency}s per request.")
+
+    start = time.perf_counter()
+    sequential = [
+        fetch_blockchain_statistics(),
+        fetch_realtime_dominance_data(),
+        fetch_exchange_rate_data(),
+        fetch_realtime_crypto_data_batched(),
+        fetch_realtime_crypto_news()
+    ]
+    sequential_seconds = time.perf_counter() - start
+
+    sources = [
+        Source("blockchain statistics", fetch_blockchain_statistics, None, timeout=10),
+        Source("dominance", fetch_realtime_dominance_data, None, timeout=10),
+        Source("exchange rate", fetch_exchange_rate_data, None, timeout=10),
+        Source("prices", fetch_realtime_crypto_data_batched, None, timeout=10),
+        Source("news", fetch_realtime_crypto_news, None, timeout=10)
+    ]
+    start = time.perf_counter()
+    concurrent = asyncio.run(fetch_all(sources))
+    concurrent_seconds = time.perf_counter() - start
+
+    for source, result, (data, seconds) in zip(sources, sequential, concurrent):
+        # Both rounds must have fetched every source
+        print(f"{source.name:<25} {seconds:6.2f}s  sequential: {result is not None}, concurrent: {data is not None}")
+    print(f"sequential round: {sequential_seconds:.2f}s, concurrent round: {concurrent_seconds:.2f}s "
+          f"({sequential_seconds / concurrent_seconds:.1f}x)")
+    stub.stop()
@@ -0,0 +1,92 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from urllib.request import urlopen
+
+from stub_server import StubServer, URL_VARIABLES
+
+
+LATENCY = 0.3
+
+
+class StubServerTest(unittest.TestCase):
+    """
+    The local stub of the APIs, and a concurrent ingestion round against it.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.stub = StubServer(latency=LATENCY).start()
+        cls.state_dir = tempfile.mkdtemp(prefix="stub_server_test_")
+        # The fetchers read their API host at import time, the news cursor goes to a temporary state file
+        cls.environment = {variable: cls.stub.url for variable in URL_VARIABLES}
+        cls.environment['streaming_state_path'] = os.path.join(cls.state_dir, 'streaming_state.json')
+        cls.previous_environment = {variable: os.environ.get(variable) for variable in cls.environment}
+        os.environ.update(cls.environment)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.stub.stop()
+        shutil.rmtree(cls.state_dir, ignore_errors=True)
+        for variable, value in cls.previous_environment.items():
+            if value is None:
+                os.environ.pop(variable, None)
+            else:
+                os.environ[variable] = value
+
+    def test_requests_are_answered_concurrently(self):
+        def get(path):
+            with urlopen(f"{self.stub.url}{path}", timeout=10) as response:
+                return json.load(response)
+
+        paths = ["/data/pricemultifull?fsyms=BTC,ETH", "/api/v3/exchange_rates", "/v2/everything", "/api/v1/ticker/24hr"] * 2
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(paths)) as executor:
+            responses = list(executor.map(get, paths))
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(set(responses[0]["RAW"]), {"BTC", "ETH"})
+        self.assertEqual(responses[2]["status"], "ok")
+        # Every request waits LATENCY seconds, in parallel
+        self.assertLess(elapsed, LATENCY * len(paths) / 2)
+
+    def test_concurrent_round(self):
+        try:
+            from async_ingestor import Source, fetch_all
+            from coins_data.blockchainInfo import fetch_blockchain_statistics
+            from coins_data.dominance import fetch_realtime_dominance_data
+            from coins_data.exchangeRate import fetch_exchange_rate_data
+            from coins_data.prices import fetch_realtime_crypto_data_batched
+            from tweets_news.newsapi import fetch_realtime_crypto_news
+        except ImportError as e:
+            self.skipTest(f"dependencies of the fetchers not installed (requirements.txt): {e}")
+
+        sources = [
+            Source("blockchain statistics", fetch_blockchain_statistics, None, timeout=10),
+            Source("dominance", fetch_realtime_dominance_data, None, timeout=10),
+            Source("exchange rate", fetch_exchange_rate_data, None, timeout=10),
+            Source("prices", fetch_realtime_crypto_data_batched, None, timeout=10),
+            Source("news", fetch_realtime_crypto_news, None, timeout=10, cursors=True)
+        ]
+        start = time.perf_counter()
+        results = asyncio.run(fetch_all(sources))
+        elapsed = time.perf_counter() - start
+
+        for source, (data, seconds) in zip(sources, results):
+            self.assertIsNotNone(data, f"{source.name} fetched nothing")
+        news_rows, news_cursors = results[-1][0]
+        self.assertEqual(len(news_rows), 5)
+        self.assertIn("newsapi:from", news_cursors)
+        # The round takes about as long as its slowest source, not the sum of all of them
+        fetch_seconds = [seconds for _, seconds in results]
+        self.assertLess(elapsed, max(fetch_seconds) + LATENCY)
+        self.assertLess(elapsed, sum(fetch_seconds))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,51 +1,119 @@
 import time
-import requests
+import http_client
 from datetime import datetime
 import os
 from dotenv import load_dotenv
+from dedup import insert_new_sentiment_data
+from state_store import state_store
 
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 env_path = os.path.join(current_dir, '../../../.env')
 load_dotenv(env_path)
 
+# Host of the API, can be pointed to a local stub server
+API_URL = os.getenv('newsapi_url', 'https://newsapi.org')
+
+# Pages of articles read per round at most ('newsapi_max_pages' in .env), each request counts
+# against the daily quota of the API key
+MAX_PAGES = int(os.getenv('newsapi_max_pages') or 5)
+PAGE_SIZE = 100
+
+# Publication time of the newest article fetched (articles after it are new)
+CURSOR_KEY = "newsapi:from"
+# Backlog of a round cut by the page cap: the articles between the cursor and 'newsapi:to' (the oldest
+# article fetched) are still to read, 'newsapi:newest' is the cursor once they are
+BACKLOG_KEY = "newsapi:to"
+NEWEST_KEY = "newsapi:newest"
+
+
 def fetch_realtime_crypto_news(keywords=["cryptocurrency", "bitcoin", "ethereum", "blockchain"]):
     """
-    Fetch and prepare real-time cryptocurrency news data for insertion.
+    Fetch and prepare the cryptocurrency news published since the last round.
+
+    The publication time of the newest article fetched is kept as a cursor: the next round asks for
+    the articles published from then on and reads their pages, newest first. When MAX_PAGES pages (or
+    the 100 results of a developer plan) do not reach the cursor, the cursor stays and the next rounds
+    read the older articles left, up to the oldest one fetched, before moving it: no article is missed
+    between two rounds. The first round reads the latest 30 articles.
 
     Args:
         keywords: A list of keywords to search for in the news articles.
     
     Returns:
-        list: A list of tuples containing source, title, and URL for each article.
+        tuple: (list of (source, title) tuples of the new articles or None, cursor updates). The cursors are
+               written by the ingestor once the articles are stored, so a fetch whose data is lost
+               (timeout, crash before the insert) is read again; None on error.
     """
     try:
         API_KEY = os.getenv('newsAPI')
         query = " OR ".join(keywords)  
-        url = f"https://newsapi.org/v2/everything?q={query}&language=en&sortBy=publishedAt&apiKey={API_KEY}"
-
-        # Make the API request
-        response = requests.get(url)
-        data = response.json()
+        cursor = state_store.get(CURSOR_KEY)
+        backlog = state_store.get(BACKLOG_KEY)
+        params = {
+            'q': query,
+            'language': 'en',
+            'sortBy': 'publishedAt',
+            'pageSize': PAGE_SIZE if cursor else 30,
+            'apiKey': API_KEY
+        }
+        if cursor:
+            params['from'] = cursor
+        if backlog:
+            params['to'] = backlog
 
-        # Prepare the news data
         news_data = []
-        if "articles" in data and data["articles"]:
-            counter = 0
-            for article in data["articles"]:
-                source = article.get('source', {}).get('name', 'Unknown Source')
+        newest = state_store.get(NEWEST_KEY) or cursor
+        oldest = None
+        # The first round only wants the latest articles
+        complete = not cursor
+        for page in range(1, (MAX_PAGES if cursor else 1) + 1):
+            params['page'] = page
+            # Make the API request
+            response = http_client.get(f"{API_URL}/v2/everything", params=params)
+            data = response.json()
+            if data.get("status") == "error":
+                if page == 1:
+                    raise RuntimeError(f"{data.get('code')}: {data.get('message')}")
+                # e.g. maximumResultsReached: the older articles are read by the next rounds
+                print(f"NewsAPI stopped at page {page} ({data.get('code')}).")
+                break
+            articles = data.get("articles") or []
+
+            for article in articles:
+                published_at = article.get('publishedAt')
+                # 'from' is inclusive, skip the articles of the previous rounds ('to' is inclusive too,
+                # the articles read again at the end of a backlog are dropped by the dedup filter)
+                if cursor and published_at and published_at <= cursor:
+                    continue
+                source = (article.get('source') or {}).get('name', 'Unknown Source')
                 title = article.get('title', 'No Title')
 
                 # Add to the news data list
                 news_data.append((source, title))
-                counter += 1
-                if counter >= 30:
-                    break
+                if published_at and (newest is None or published_at > newest):
+                    newest = published_at
+                if published_at and (oldest is None or published_at < oldest):
+                    oldest = published_at
 
-            return news_data
-        else:
-            print("No articles found in the API response.")
-            return None
+            if len(articles) < params['pageSize'] or page * params['pageSize'] >= data.get("totalResults", 0):
+                complete = True
+                break
+
+        cursors = {}
+        if complete:
+            # Everything up to the newest article fetched is read
+            if newest != cursor:
+                cursors[CURSOR_KEY] = newest
+            if backlog:
+                cursors.update({BACKLOG_KEY: None, NEWEST_KEY: None})
+        elif oldest:
+            print(f"{MAX_PAGES} pages of news read, the articles before {oldest} are read next round.")
+            cursors.update({BACKLOG_KEY: oldest, NEWEST_KEY: newest})
+
+        if not news_data:
+            print("No new articles found in the API response.")
+        return news_data or None, cursors
 
     except Exception as e:
         print(f"Error while fetching real-time news: {e}")
@@ -53,40 +121,17 @@ def fetch_realtime_crypto_news(keywords=["cryptocurrency", "bitcoin", "ethereum"
 
 def insert_news_data(data, cursor, connection):
     """
-    Insert real-time news data into the sentiment table.
+    Insert real-time news data into the sentiment table, in one batch.
 
     Args:
-        news_data: A list of tuples containing (source, title) for each article.
+        data: A list of tuples containing (source, title) for each article.
         cursor: Database cursor for executing SQL queries.
         connection: Database connection object.
+
+    Returns:
+        bool: False if the database rejected the batch.
     """
-    try:
-        if data:
-            # Prepare the insert query
-            insert_query = """
-                INSERT INTO sentiment (source, content)
-                VALUES (%s, %s)
-            """
-            
-            for record in data:
-                source, title = record
-                
-                # Validate the data before inserting
-                if not title:
-                    print(f"Skipping record with missing title: {record}")
-                    continue  # Skip this record if title or URL is missing
-                
-                # Execute the insert query
-                cursor.execute(insert_query, (source, title))
-            
-            # Commit the transaction
-            connection.commit()
-            print(f"Inserted {len(data)} news records into sentiment table.")
-        
-        else:
-            print("No news data available to insert.")
-            
-    except Exception as e:
-        print(f"Error while inserting news data into database: {e}")
+    # Articles without a title or already inserted are skipped
+    return insert_new_sentiment_data(data, cursor, connection, "news")
 
 
@@ -3,20 +3,42 @@ import tweepy
 from datetime import datetime
 import os
 from dotenv import load_dotenv
+from dedup import insert_new_sentiment_data
+from state_store import state_store
 
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 env_path = os.path.join(current_dir, '../../../.env')
 load_dotenv(env_path)
+# Tweets per page (10 to 100, 'x_page_size' in .env) and pages read per round at most ('x_max_pages'):
+# every tweet read counts against the monthly read quota of the API plan, a round reads up to
+# x_page_size * x_max_pages tweets and the rest is read by the next rounds
+PAGE_SIZE = int(os.getenv('x_page_size') or 100)
+MAX_PAGES = int(os.getenv('x_max_pages') or 1)
+
+# Id of the newest tweet fetched (tweets after it are new)
+CURSOR_KEY = "x:since_id"
+# Backlog of a round cut by the page cap: the tweets between the cursor and 'x:until_id' (the oldest
+# tweet fetched) are still to read, 'x:newest_id' is the cursor once they are
+BACKLOG_KEY = "x:until_id"
+NEWEST_KEY = "x:newest_id"
+
+
 def fetch_realtime_crypto_tweets(bearer_token=os.getenv('XTOKEN')):
     """
-    Fetch and prepare real-time cryptocurrency tweets for insertion.
+    Fetch and prepare the cryptocurrency tweets posted since the last round.
+
+    The id of the newest tweet fetched is kept as a cursor (since_id): the next round reads the pages
+    of tweets posted after it, newest first. When MAX_PAGES pages do not reach the cursor, the cursor
+    stays and the next rounds read the older tweets left (until_id the oldest one fetched) before
+    moving it, so no tweet is fetched twice or missed. The first round reads the 10 most recent tweets.
 
     Args:
         bearer_token: The Twitter API Bearer Token.
     
     Returns:
-        list: A list of tuples containing source (username), content (tweet text), and URL.
+        tuple: (list of (username, tweet text) tuples or None, cursor updates). The cursors are written
+               by the ingestor once the tweets are stored; None on error.
     """
     try:
         # Initialize the Tweepy client
@@ -24,35 +46,62 @@ def fetch_realtime_crypto_tweets(bearer_token=os.getenv('XTOKEN')):
 
         # Define the query and search parameters
         query = "crypto OR cryptocurrency OR bitcoin"
-
-        # Fetch recent tweets
-        response = client.search_recent_tweets(
-            query=query,
-            max_results=10,
-            expansions="author_id",  # Request author details
-            user_fields=["username"]  # Include username in user details
-        )
+        since_id = state_store.get(CURSOR_KEY)
+        until_id = state_store.get(BACKLOG_KEY)
 
         results = []
+        newest_id = state_store.get(NEWEST_KEY) or since_id
+        oldest_id = None
+        next_token = None
+        # The first round only wants the latest tweets
+        complete = not since_id
+        for _ in range(MAX_PAGES if since_id else 1):
+            # Fetch recent tweets
+            response = client.search_recent_tweets(
+                query=query,
+                max_results=PAGE_SIZE if since_id else 10,
+                since_id=since_id,
+                until_id=until_id,
+                next_token=next_token,
+                expansions="author_id",  # Request author details
+                user_fields=["username"]  # Include username in user details
+            )
+            if not response.data:
+                complete = True
+                break
 
-        # Check if the response contains data
-        if response.data:
             # Create a mapping of user IDs to usernames
-            users = {user["id"]: user["username"] for user in response.includes["users"]}
+            users = {user["id"]: user["username"] for user in response.includes.get("users", [])}
 
             # Process the tweets
             for tweet in response.data:
                 username = users.get(tweet.author_id, "Unknown")  # Get username by author_id
-                source = username
-                content = tweet.text
+                results.append((username, tweet.text))
 
-                # Add to the results list
-                results.append((source, content))
+            meta = response.meta or {}
+            # The first page of the round holds its newest tweets, the last page its oldest
+            if newest_id == since_id and meta.get("newest_id"):
+                newest_id = meta["newest_id"]
+            oldest_id = meta.get("oldest_id") or oldest_id
+            next_token = meta.get("next_token")
+            if not next_token:
+                complete = True
+                break
 
-            return results
-        else:
-            print("No tweets found for the query.")
-            return None
+        cursors = {}
+        if complete:
+            # Everything up to the newest tweet fetched is read
+            if newest_id != since_id:
+                cursors[CURSOR_KEY] = newest_id
+            if until_id:
+                cursors.update({BACKLOG_KEY: None, NEWEST_KEY: None})
+        elif oldest_id:
+            print(f"{MAX_PAGES} pages of tweets read, the tweets before {oldest_id} are read next round.")
+            cursors.update({BACKLOG_KEY: oldest_id, NEWEST_KEY: newest_id})
+
+        if not results:
+            print("No new tweets found for the query.")
+        return results or None, cursors
 
     except Exception as e:
         print(f"Error while fetching real-time tweets: {e}")
@@ -62,40 +111,15 @@ def fetch_realtime_crypto_tweets(bearer_token=os.getenv('XTOKEN')):
 
 def insert_tweet_data(data, cursor, connection):
     """
-    Insert real-time cryptocurrency tweet data into the sentiment table.
+    Insert real-time cryptocurrency tweet data into the sentiment table, in one batch.
 
     Args:
-        tweet_data: A list of tuples containing (source, content) for each tweet.
+        data: A list of tuples containing (source, content) for each tweet.
         cursor: Database cursor for executing SQL queries.
         connection: Database connection object.
+
+    Returns:
+        bool: False if the database rejected the batch.
     """
-    try:
-        if data:
-            # Prepare the insert query
-            insert_query = """
-                INSERT INTO sentiment (source, content)
-                VALUES (%s, %s)
-            """
-            counter = 0
-            for record in data:
-                source, content = record
-                
-                # Validate the data before inserting
-                if not content:
-                    print(f"Skipping record with missing content: {record}")
-                    continue  # Skip this record if content or URL is missing
-                
-                # Execute the insert query
-                cursor.execute(insert_query, (source, content))
-                counter += 1
-                if counter ==20:
-                    break
-            # Commit the transaction
-            connection.commit()
-            print(f"Inserted {len(data)} tweets into sentiment table.")
-        
-        else:
-            print("No tweet data available to insert.")
-            
-    except Exception as e:
-        print(f"Error while inserting tweet data into database: {e}")
+    # Tweets without content or already inserted (retweets ...) are skipped
+    return insert_new_sentiment_data(data, cursor, connection, "tweets")
@@ -0,0 +1,296 @@
+import json
+import os
+import queue
+import threading
+import time
+
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SPOOL_PATH = os.path.join(current_dir, 'spool.jsonl')
+
+
+class RecordWriter:
+    """
+    Dedicated writer thread between the API producers and MySQL.
+
+    Producers `submit` what they fetched to a bounded queue and go back to fetching; when the queue is
+    full `submit` blocks, slowing the producers down to the write throughput. The writer drains the queue
+    in batches (up to 'batch_size' records or 'flush_interval' seconds), merges the lists of rows going
+    to the same insert function and inserts each of them at once. While MySQL is unreachable the batches
+    are appended to a local spool file, replayed in bulk as soon as the database is back.
+
+    A producer can pass an 'on_stored' function to `submit`, called once its data is inserted or spooled
+    (e.g. to move its API cursor only when what it fetched is safe).
+    """
+
+    def __init__(self, connect, inserters, max_queue=1000, batch_size=100, flush_interval=5, spool_path=None):
+        """
+        Args:
+            connect: Function opening a MySQL connection.
+            inserters (list): Insert functions records can be submitted to; called with (data, cursor, connection)
+                they return False when the database rejected the data.
+            max_queue (int): Records waiting in the queue before `submit` blocks.
+            batch_size (int): Maximum number of records written in one batch.
+            flush_interval (float): Maximum seconds a record waits for its batch to be complete.
+            spool_path (str): Append-only file keeping the records while MySQL is down.
+        """
+        self.connect = connect
+        self.inserters = {inserter.__name__: inserter for inserter in inserters}
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spool_path = spool_path or os.getenv('streaming_spool_path', DEFAULT_SPOOL_PATH)
+        # Spool being replayed, left behind if the process stopped during a replay
+        self.replay_path = f"{self.spool_path}.replay"
+        self.connection = None
+        # The spool is appended to by the writer and by producers finding the queue full
+        self.spool_lock = threading.Lock()
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="record-writer", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self, timeout=30):
+        """
+        Write (or spool) the records still queued, then stop the writer thread.
+        """
+        self.stopping.set()
+        self.thread.join(timeout)
+        if not self.thread.is_alive():
+            # Records still queued if the thread stopped before writing them are kept in the spool
+            leftover = []
+            while not self.queue.empty():
+                leftover.append(self.queue.get_nowait())
+            if leftover:
+                self._spool(leftover)
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception:
+                pass
+
+    def submit(self, insert, data, timeout=None, on_stored=None):
+        """
+        Queue the data fetched by a producer for its insert function, blocking while the queue is full.
+
+        Args:
+            insert: Insert function of the data, one of the writer's inserters.
+            data: Rows (list) or row (tuple) to insert.
+            timeout (float): Seconds to wait for room in the queue before spooling the data.
+            on_stored: Function called without arguments once the data is inserted or spooled
+                (not if the database rejected it).
+
+        Returns:
+            bool: False if the queue stayed full for 'timeout' seconds and the data was spooled instead.
+        """
+        callbacks = [on_stored] if on_stored else []
+        if data is None:
+            print(f"No data to queue for {insert.__name__}.")
+            self._stored(callbacks)
+            return True
+        if insert.__name__ not in self.inserters:
+            raise ValueError(f"{insert.__name__} is not an insert function of the writer")
+        try:
+            self.queue.put((insert.__name__, data, callbacks), timeout=timeout)
+            return True
+        except queue.Full:
+            print(f"Writer queue full, spooling the data of {insert.__name__}.")
+            self._spool([(insert.__name__, data, callbacks)])
+            return False
+
+    @staticmethod
+    def _stored(callbacks):
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error after storing a record: {e}")
+
+    #=======================================writer thread========================================================
+
+    def _run(self):
+        while not (self.stopping.is_set() and self.queue.empty()):
+            batch = self._next_batch()
+            try:
+                if batch:
+                    self._write(batch)
+                elif self._spooled() and self._connected():
+                    self._replay_spool()
+            except Exception as e:
+                # The thread must survive anything, or the producers block on a full queue
+                print(f"Error in the writer thread: {e}")
+                if batch:
+                    self._spool(batch)
+
+    def _next_batch(self):
+        """
+        Wait for the first record, then collect records until the batch is full or 'flush_interval' elapsed.
+        """
+        try:
+            batch = [self.queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _alive(self):
+        if self.connection is None:
+            return False
+        try:
+            self.connection.ping(reconnect=False)
+            return True
+        except Exception:
+            print("MySQL connection lost.")
+            self._drop_connection()
+            return False
+
+    def _connected(self):
+        """
+        Make sure the writer has a live connection, reconnecting if needed.
+        """
+        if self._alive():
+            return True
+        try:
+            self.connection = self.connect()
+            print("Writer connected to MySQL.")
+            return True
+        except Exception as e:
+            print(f"MySQL unreachable: {e}")
+            return False
+
+    def _drop_connection(self):
+        try:
+            self.connection.close()
+        except Exception:
+            pass
+        self.connection = None
+
+    @staticmethod
+    def _merge(records):
+        """
+        Merge the records of the same insert function: lists of rows are concatenated (with the
+        callbacks of their records), single-row records (tuples) stay separate.
+        """
+        merged = {}
+        singles = []
+        for name, data, callbacks in records:
+            if isinstance(data, list):
+                rows, merged_callbacks = merged.setdefault(name, ([], []))
+                rows.extend(data)
+                merged_callbacks.extend(callbacks)
+            else:
+                singles.append((name, data, callbacks))
+        return [(name, rows, callbacks) for name, (rows, callbacks) in merged.items()] + singles
+
+    def _write(self, records, replay=True):
+        """
+        Insert a batch; what cannot be written because MySQL is down or because its insert function
+        raised goes to the spool.
+
+        Args:
+            replay (bool): Replay the spool first, so older records are written first.
+
+        Returns:
+            bool: False if records could not be written nor spooled.
+        """
+        if replay and self._spooled() and self._connected():
+            self._replay_spool()
+
+        failed = []
+        connected = self._connected()
+        for name, data, callbacks in self._merge(records):
+            if not connected:
+                failed.append((name, data, callbacks))
+                continue
+            cursor = None
+            try:
+                cursor = self.connection.cursor()
+                written = self.inserters[name](data=data, cursor=cursor, connection=self.connection)
+            except Exception as e:
+                print(f"Error while writing the records of {name}, spooling them: {e}")
+                failed.append((name, data, callbacks))
+                connected = self._connected()
+                continue
+            finally:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+            if written is not False:
+                self._stored(callbacks)
+            elif not self._alive():
+                # Rejected because the database went away, not because of the data
+                failed.append((name, data, callbacks))
+                connected = self._connected()
+        if failed:
+            return self._spool(failed)
+        return True
+
+    #=======================================spool========================================================
+
+    def _spool(self, records):
+        """
+        Append records to the spool file, one JSON line each (dates are written as strings,
+        which MySQL converts back on insert; the fetch time of the prices is parsed back by
+        insert_crypto_data), then call their callbacks.
+
+        Returns:
+            bool: False if the spool could not be written.
+        """
+        try:
+            with self.spool_lock, open(self.spool_path, 'a') as spool_file:
+                for name, data, _ in records:
+                    spool_file.write(json.dumps(
+                        {"insert": name, "single": isinstance(data, tuple), "data": data}, default=str
+                    ) + "\n")
+            print(f"Spooled {len(records)} records to {self.spool_path}.")
+        except OSError as e:
+            print(f"Error writing to the spool {self.spool_path}, {len(records)} records lost: {e}")
+            return False
+        for _, _, callbacks in records:
+            self._stored(callbacks)
+        return True
+
+    def _spooled(self):
+        return os.path.exists(self.spool_path) or os.path.exists(self.replay_path)
+
+    def _replay_spool(self):
+        """
+        Insert the spooled records in bulk and clear the spool; records failing again are spooled back.
+
+        A replay file left by a previous run is replayed first. The replay file is only removed once
+        all its records are written or spooled again, so a crash during a replay loses nothing
+        (records already inserted may be inserted again).
+        """
+        if not os.path.exists(self.replay_path):
+            # Records spooled while replaying go to a new spool file
+            with self.spool_lock:
+                os.replace(self.spool_path, self.replay_path)
+        records = []
+        try:
+            with open(self.replay_path, 'r') as spool_file:
+                for line in spool_file:
+                    try:
+                        record = json.loads(line)
+                        data = tuple(record["data"]) if record["single"] else [tuple(row) for row in record["data"]]
+                    except (ValueError, KeyError, TypeError):
+                        # Line cut by a crash while spooling
+                        continue
+                    # The callbacks of spooled records were called when they were spooled
+                    records.append((record["insert"], data, []))
+        except OSError as e:
+            print(f"Error reading the spool {self.replay_path}: {e}")
+            return
+        print(f"Replaying {len(records)} spooled records.")
+        if self._write(records, replay=False):
+            os.remove(self.replay_path)